@@ -0,0 +1,823 @@
+"""yt-mp3 오프라인 벤치마크.
+
+네트워크 없이 로컬 HTTP 서버(합성 오디오, 대역폭/지연 조절)와 스텁 info dict로
+다운로드 엔진을 돌리고, 결과를 JSON으로 남겨 실행 간에 비교할 수 있게 한다.
+
+    python bench/bench.py --ffmpeg /path/to/ffmpeg/dir -o results.json
+    python bench/bench.py --quick --scenario single_latency --compare old.json
+"""
+
+import argparse
+import array
+import http.server
+import json
+import math
+import os
+import platform
+import queue
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yt_mp3  # noqa: E402
+
+SAMPLE_RATE = 44100
+WAV_HEADER_SIZE = 44
+
+_wav_cache = {}
+_wav_lock = threading.Lock()
+
+
+def wav_bytes(seconds):
+    """seconds초짜리 440Hz 16비트 모노 WAV (길이별로 한 번만 만든다)."""
+    with _wav_lock:
+        data = _wav_cache.get(seconds)
+        if data is not None:
+            return data
+        second = array.array(
+            "h",
+            (int(12000 * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)) for i in range(SAMPLE_RATE)),
+        )
+        if sys.byteorder != "little":
+            second.byteswap()
+        pcm = second.tobytes() * seconds
+        header = b"".join((
+            b"RIFF", (36 + len(pcm)).to_bytes(4, "little"), b"WAVE",
+            b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"),
+            (1).to_bytes(2, "little"), SAMPLE_RATE.to_bytes(4, "little"),
+            (SAMPLE_RATE * 2).to_bytes(4, "little"), (2).to_bytes(2, "little"),
+            (16).to_bytes(2, "little"), b"data", len(pcm).to_bytes(4, "little"),
+        ))
+        data = _wav_cache[seconds] = header + pcm
+        return data
+
+
+class MediaServer:
+    """합성 오디오를 내보내는 로컬 HTTP 서버.
+
+    /audio/<id>.wav?sec=N 은 N초짜리 WAV를 돌려준다. bandwidth(바이트/초, 연결마다)와
+    latency(첫 바이트까지 초)로 실제 서버와 비슷한 조건을 만든다. Range 요청을 지원한다.
+    """
+
+    CHUNK = 16 * 1024
+
+    def __init__(self, bandwidth=0, latency=0.0):
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                server._serve(self, body=False)
+
+            def do_GET(self):
+                server._serve(self, body=True)
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _serve(self, handler, body):
+        self.requests += 1
+        parts = urlsplit(handler.path)
+        if not parts.path.startswith("/audio/"):
+            handler.send_error(404)
+            return
+        seconds = int(parse_qs(parts.query).get("sec", ["1"])[0])
+        data = wav_bytes(seconds)
+        start = 0
+        match = re.match(r"bytes=(\d+)-", handler.headers.get("Range", ""))
+        if match and int(match.group(1)) < len(data):
+            start = int(match.group(1))
+            handler.send_response(206)
+            handler.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            handler.send_response(200)
+        handler.send_header("Content-Type", "audio/wav")
+        handler.send_header("Accept-Ranges", "bytes")
+        handler.send_header("Content-Length", str(len(data) - start))
+        handler.end_headers()
+        if not body:
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        began = time.monotonic()
+        sent = 0
+        try:
+            for offset in range(start, len(data), self.CHUNK):
+                chunk = data[offset:offset + self.CHUNK]
+                handler.wfile.write(chunk)
+                sent += len(chunk)
+                if self.bandwidth:
+                    ahead = sent / self.bandwidth - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def stub_info(base_url, video_id, seconds):
+    """yt-dlp가 추출 없이 process_ie_result로 받을 수 있는 영상 info dict."""
+    page = f"{base_url}/watch/{video_id}"
+    return {
+        "id": video_id,
+        "title": f"bench {video_id}",
+        "extractor": "generic",
+        "extractor_key": "Generic",
+        "webpage_url": page,
+        "original_url": page,
+        "duration": seconds,
+        "formats": [{
+            "format_id": "wav",
+            "url": f"{base_url}/audio/{video_id}.wav?sec={seconds}",
+            "ext": "wav",
+            "acodec": "pcm_s16le",
+            "vcodec": "none",
+            "asr": SAMPLE_RATE,
+            "audio_channels": 1,
+            "filesize": WAV_HEADER_SIZE + SAMPLE_RATE * 2 * seconds,
+            "protocol": "http",
+        }],
+    }
+
+
+def stub_playlist(base_url, infos):
+    """평면 추출 결과와 같은 모양의 재생목록 info dict."""
+    return {
+        "_type": "playlist",
+        "id": "bench",
+        "title": "bench playlist",
+        "extractor": "generic",
+        "extractor_key": "Generic",
+        "webpage_url": f"{base_url}/playlist/bench",
+        "playlist_count": len(infos),
+        "entries": [
+            {
+                "_type": "url",
+                "id": info["id"],
+                "title": info["title"],
+                "url": info["webpage_url"],
+                "ie_key": "Generic",
+                "duration": info["duration"],
+            }
+            for info in infos
+        ],
+    }
+
+
+def isolate(config_dir):
+    """엔진의 색인/캐시 파일을 벤치마크용 폴더로 돌린다 (사용자 설정을 건드리지 않는다)."""
+    yt_mp3.CONFIG_DIR = config_dir
+    yt_mp3.ARCHIVE_FILE = os.path.join(config_dir, "archive.sqlite3")
+    yt_mp3.EXTRACT_CACHE_FILE = os.path.join(config_dir, "extract_cache.sqlite3")
+    yt_mp3.TAG_CACHE_FILE = os.path.join(config_dir, "tag_cache.sqlite3")
+    yt_mp3.JOB_QUEUE_FILE = os.path.join(config_dir, "jobs.sqlite3")
+    yt_mp3.THUMB_CACHE_DIR = os.path.join(config_dir, "thumbs")
+    yt_mp3.FFMPEG_PROBE_FILE = os.path.join(config_dir, "ffmpeg_probe.json")
+    yt_mp3.LOUDNESS_CACHE_FILE = os.path.join(config_dir, "loudness.sqlite3")
+    yt_mp3.FINGERPRINT_INDEX_FILE = os.path.join(config_dir, "fingerprints.sqlite3")
+
+
+class EventLog:
+    """엔진 이벤트를 받은 시각과 함께 모은다."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event["event"] in ("progress", "status"):
+            return
+        with self._lock:
+            self.events.append((time.perf_counter(), event))
+
+    def times(self, kind):
+        return [t for t, e in self.events if e["event"] == kind]
+
+
+def _summary(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        "min": round(values[0], 4),
+        "median": round(statistics.median(values), 4),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 4),
+        "max": round(values[-1], 4),
+    }
+
+
+def run_pipeline(workdir, infos, fmt_key, ffmpeg_loc, jobs, playlist=False):
+    """스텁 info를 추출 캐시에 넣고 실제 엔진으로 받는다. 시간 측정 결과를 반환한다."""
+    isolate(os.path.join(workdir, "config"))
+    dest = os.path.join(workdir, "out")
+    os.makedirs(dest, exist_ok=True)
+    log = EventLog()
+    engine = yt_mp3.DownloadEngine(log, lang="en")
+    try:
+        for info in infos:
+            engine.extract_cache.put(info["webpage_url"], info)
+        fmt = engine.FORMATS[fmt_key]
+        start = time.perf_counter()
+        if playlist:
+            base = urlsplit(infos[0]["webpage_url"])
+            listing = stub_playlist(f"{base.scheme}://{base.netloc}", infos)
+            engine.extract_cache.put(listing["webpage_url"], listing)
+            failed = yt_mp3._run_urls(
+                engine, [listing["webpage_url"]], dest, fmt, ffmpeg_loc, jobs
+            )
+        else:
+            counts = engine.download(
+                [{"url": info["webpage_url"]} for info in infos], dest, fmt, ffmpeg_loc, jobs=jobs
+            )
+            failed = counts["failed"]
+        wall = time.perf_counter() - start
+    finally:
+        engine.close()
+
+    converted = [t - start for t in log.times("converted")]
+    downloaded = [t - start for t in log.times("converting")]
+    total_bytes = sum(f["filesize"] for info in infos for f in info["formats"])
+    return {
+        "items": len(infos),
+        "failed": failed,
+        "wall_s": round(wall, 4),
+        "items_per_s": round(len(converted) / wall, 3) if wall else None,
+        "download_mb_per_s": round(total_bytes / wall / 1e6, 3) if wall else None,
+        "first_download_s": round(min(downloaded), 4) if downloaded else None,
+        "first_converted_s": round(min(converted), 4) if converted else None,
+    }
+
+
+# ---- scenarios ----
+
+
+def scenario_single_latency(ctx):
+    """영상 하나: 요청부터 변환 완료까지의 지연 (엔진/프로세스 풀 시작 비용 포함)."""
+    repeats = 2 if ctx.quick else 5
+    server = MediaServer(bandwidth=4 * 1024 * 1024, latency=0.05).start()
+    try:
+        runs = []
+        for n in range(repeats):
+            info = stub_info(server.base_url, f"single{n}", 5)
+            runs.append(run_pipeline(
+                ctx.workdir(f"single{n}"), [info], "mp3", ctx.ffmpeg_loc, jobs=1
+            ))
+    finally:
+        server.stop()
+    return {
+        "repeats": repeats,
+        "wall_s": _summary([r["wall_s"] for r in runs]),
+        "first_download_s": _summary([r["first_download_s"] for r in runs if r["first_download_s"]]),
+        "failed": sum(r["failed"] for r in runs),
+    }
+
+
+def scenario_playlist_throughput(ctx):
+    """짧은 영상 여러 개짜리 재생목록: 평면 목록 → 다운로드 → 태그 처리까지의 처리량."""
+    count = 50 if ctx.quick else 500
+    server = MediaServer(bandwidth=2 * 1024 * 1024, latency=0.02).start()
+    try:
+        infos = [stub_info(server.base_url, f"pl{i:04d}", 2) for i in range(count)]
+        result = run_pipeline(
+            ctx.workdir("playlist"), infos, "opus", ctx.ffmpeg_loc, jobs=ctx.jobs, playlist=True
+        )
+        result["http_requests"] = server.requests
+    finally:
+        server.stop()
+    result["jobs"] = ctx.jobs
+    return result
+
+
+def scenario_transcode_bound(ctx):
+    """긴 오디오를 MP3로 변환: 네트워크는 빠르고 ffmpeg가 병목인 경우."""
+    count = 4 if ctx.quick else 24
+    server = MediaServer().start()
+    try:
+        infos = [stub_info(server.base_url, f"tc{i:03d}", 60) for i in range(count)]
+        result = run_pipeline(
+            ctx.workdir("transcode"), infos, "mp3", ctx.ffmpeg_loc, jobs=ctx.jobs
+        )
+    finally:
+        server.stop()
+    result["jobs"] = ctx.jobs
+    result["pp_workers"] = yt_mp3.DEFAULT_PP_WORKERS
+    return result
+
+
+def _make_library(ctx, count):
+    """태그가 들어 있는 짧은 MP3를 count개 만든다 (ffmpeg로 하나 만들어 복사)."""
+    scan_dir = ctx.workdir("library")
+    wav = os.path.join(scan_dir, "seed.wav")
+    seed = os.path.join(scan_dir, "seed.mp3")
+    with open(wav, "wb") as f:
+        f.write(wav_bytes(1))
+    ffmpeg = os.path.join(ctx.ffmpeg_loc, "ffmpeg") if ctx.ffmpeg_loc else "ffmpeg"
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-i", wav, "-b:a", "64k", seed], check=True
+    )
+    os.remove(wav)
+    yt_mp3.MetadataWindow._save_tags(
+        seed, {"artist": "bench", "album": "bench", "title": "seed", "track": "1"}
+    )
+    with open(seed, "rb") as f:
+        data = f.read()
+    os.remove(seed)
+    for i in range(count):
+        with open(os.path.join(scan_dir, f"track{i:05d}.mp3"), "wb") as f:
+            f.write(data)
+    return scan_dir
+
+
+def _scan(scan_dir, tag_cache):
+    """MetadataWindow의 스캔 스레드 코드를 창 없이 실행한다."""
+    win = yt_mp3.MetadataWindow.__new__(yt_mp3.MetadataWindow)
+    win.scan_dir = scan_dir
+    win.tag_cache = tag_cache
+    win.closed = False
+    win._scan_q = queue.Queue()
+    start = time.perf_counter()
+    win._scan_files()
+    elapsed = time.perf_counter() - start
+    tags = 0
+    while not win._scan_q.empty():
+        tags += win._scan_q.get_nowait()[0] == "tags"
+    return elapsed, tags
+
+
+def scenario_metadata(ctx):
+    """MetadataWindow: 태그 캐시 없이/있을 때의 스캔과 바뀐 필드만 병렬 저장."""
+    count = 500 if ctx.quick else 10000
+    scan_dir = _make_library(ctx, count)
+    isolate(os.path.join(ctx.workdir("metadata"), "config"))
+    tag_cache = yt_mp3.TagCache(yt_mp3.TAG_CACHE_FILE)
+    try:
+        cold, cold_tags = _scan(scan_dir, tag_cache)
+        warm, warm_tags = _scan(scan_dir, tag_cache)
+
+        # _save_all과 같은 방식: 앨범만 바꾼 파일을 스레드 풀에서 저장한다
+        paths = [p for p, _, _ in yt_mp3.MetadataWindow.scan_audio_files(scan_dir)]
+        meta = {"artist": "bench", "album": "renamed", "title": "seed", "track": "1"}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=yt_mp3.MetadataWindow.SCAN_WORKERS) as pool:
+            list(pool.map(lambda p: yt_mp3.MetadataWindow._save_tags(p, meta, {"album"}), paths))
+        save = time.perf_counter() - start
+    finally:
+        tag_cache.close()
+    return {
+        "files": count,
+        "scan_cold_s": round(cold, 4),
+        "scan_warm_s": round(warm, 4),
+        "tags_cold": cold_tags,
+        "tags_warm": warm_tags,
+        "save_s": round(save, 4),
+        "save_files_per_s": round(count / save, 1) if save else None,
+    }
+
+
+def scenario_replaygain(ctx):
+    """MetadataWindow의 음량 분석: 처음 / 바뀌지 않은 파일 / 다른 폴더로 옮긴 파일."""
+    count = 16 if ctx.quick else 200
+    scan_dir = ctx.workdir("replaygain")
+    wav = os.path.join(scan_dir, "seed.wav")
+    seed = os.path.join(scan_dir, "seed.mp3")
+    with open(wav, "wb") as f:
+        f.write(wav_bytes(30))
+    ffmpeg = os.path.join(ctx.ffmpeg_loc, "ffmpeg") if ctx.ffmpeg_loc else "ffmpeg"
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-i", wav, "-b:a", "128k", seed], check=True
+    )
+    os.remove(wav)
+    paths = []
+    for i in range(count):
+        # 제목이 달라 파일마다 내용 해시가 다르다 (오디오는 같다)
+        path = os.path.join(scan_dir, f"track{i:04d}.mp3")
+        shutil.copyfile(seed, path)
+        yt_mp3.MetadataWindow._save_tags(path, {"title": f"track {i}"}, {"title"})
+        paths.append(path)
+    os.remove(seed)
+    isolate(os.path.join(ctx.workdir("replaygain_config"), "config"))
+    cache = yt_mp3.LoudnessCache(yt_mp3.LOUDNESS_CACHE_FILE)
+    results = []
+
+    def run(targets):
+        results.clear()
+        start = time.perf_counter()
+        yt_mp3.replaygain_library(
+            targets, ctx.ffmpeg_loc, cache, lambda *r: results.append(r)
+        )
+        return time.perf_counter() - start
+
+    try:
+        cold = run(paths)
+        analyzed = sum(1 for _, r, e in results if e is None and r["analyzed"])
+        failed = sum(1 for _, _, e in results if e is not None)
+        loudness = next((r["loudness"] for _, r, e in results if e is None), {})
+        warm = run(paths)
+        moved_dir = ctx.workdir("replaygain_moved")
+        moved = [shutil.copy(p, moved_dir) for p in paths]
+        copied = run(moved)
+        reanalyzed = sum(1 for _, r, e in results if e is None and r["analyzed"])
+    finally:
+        cache.close()
+    return {
+        "files": count,
+        "seconds_per_file": 30,
+        "method": loudness.get("method"),
+        "lufs": round(loudness["lufs"], 2) if loudness.get("lufs") is not None else None,
+        "cold_s": round(cold, 4),
+        "cold_files_per_s": round(count / cold, 1) if cold else None,
+        "analyzed": analyzed,
+        "failed": failed,
+        "unchanged_s": round(warm, 4),
+        "moved_s": round(copied, 4),
+        "moved_reanalyzed": reanalyzed,
+        "pp_workers": yt_mp3.DEFAULT_PP_WORKERS,
+    }
+
+
+def scenario_duplicates(ctx):
+    """음향 지문 색인: 처음 만들기 / 바뀐 파일이 없을 때 / 재인코딩한 곡과 새 곡 찾기."""
+    count = 8 if ctx.quick else 100
+    lib = ctx.workdir("duplicates")
+    probes = ctx.workdir("duplicates_probe")
+    ffmpeg = os.path.join(ctx.ffmpeg_loc, "ffmpeg") if ctx.ffmpeg_loc else "ffmpeg"
+
+    def synth(seed, out, *args):
+        # 곡마다 다른 음 진행 + 잡음 (순수 사인파는 지문 비트가 거의 무작위라 쓸 수 없다)
+        melody = (
+            f"0.3*sin(2*PI*{180 + seed * 7}*pow(2,mod(floor(t*{2 + seed % 4})*{5 + seed % 7},12)/12)*t)"
+        )
+        subprocess.run(
+            [ffmpeg, "-loglevel", "error", "-y",
+             "-f", "lavfi", "-i", f"aevalsrc='{melody}':s=22050:d=30",
+             "-f", "lavfi", "-i", f"anoisesrc=d=30:c=pink:a=0.05:r=22050:seed={seed}",
+             "-filter_complex", "amix=inputs=2", *args, out],
+            check=True,
+        )
+
+    for i in range(count):
+        synth(i, os.path.join(lib, f"track{i:04d}.mp3"), "-b:a", "128k")
+    # 같은 곡을 다른 코덱으로 앞 2초를 잘라 다시 받은 경우 / 없는 곡
+    same = os.path.join(probes, "reupload.m4a")
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-ss", "2", "-i",
+         os.path.join(lib, "track0000.mp3"), "-c:a", "aac", "-b:a", "96k", same],
+        check=True,
+    )
+    other = os.path.join(probes, "new.mp3")
+    synth(count + 1, other, "-b:a", "128k")
+
+    isolate(os.path.join(ctx.workdir("duplicates_config"), "config"))
+    index = yt_mp3.FingerprintIndex(yt_mp3.FINGERPRINT_INDEX_FILE)
+    try:
+        start = time.perf_counter()
+        built = index.update(lib, ctx.ffmpeg_loc)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        index.update(lib, ctx.ffmpeg_loc)
+        warm = time.perf_counter() - start
+        lookups = []
+        found = {}
+        for name, path in (("reupload", same), ("new", other)):
+            fingerprint = yt_mp3.fingerprint_audio(path, ctx.ffmpeg_loc)
+            start = time.perf_counter()
+            found[name] = index.match(fingerprint)
+            lookups.append(time.perf_counter() - start)
+    finally:
+        index.close()
+    size = os.path.getsize(yt_mp3.FINGERPRINT_INDEX_FILE)
+    return {
+        "files": count,
+        "seconds_per_file": 30,
+        "build_s": round(cold, 4),
+        "build_files_per_s": round(count / cold, 1) if cold else None,
+        "failed": built["failed"],
+        "unchanged_s": round(warm, 4),
+        "match_s": _summary(lookups),
+        "reupload_found": bool(found["reupload"])
+        and os.path.basename(found["reupload"]["path"]) == "track0000.mp3",
+        "reupload_ber": found["reupload"]["ber"] if found["reupload"] else None,
+        "new_found": found["new"] is not None,
+        "index_bytes": size,
+        "pp_workers": yt_mp3.DEFAULT_PP_WORKERS,
+    }
+
+
+def flat_entries(count):
+    """YouTube 채널 평면 추출과 같은 모양의 항목을 하나씩 만든다 (썸네일 목록, 설명 등 포함)."""
+    for i in range(count):
+        video_id = f"v{i:010d}"
+        yield {
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": video_id,
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "title": f"bench channel upload number {i}",
+            "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+            "duration": 180 + i % 600,
+            "channel_id": "UCbenchbenchbenchbench00",
+            "channel": "bench channel",
+            "channel_url": "https://www.youtube.com/channel/UCbenchbenchbenchbench00",
+            "uploader": "bench channel",
+            "uploader_id": "@bench",
+            "uploader_url": "https://www.youtube.com/@bench",
+            "thumbnails": [
+                {
+                    "url": f"https://i.ytimg.com/vi/{video_id}/{name}.jpg?sqp=bench{i}",
+                    "height": height,
+                    "width": height * 16 // 9,
+                }
+                for name, height in (("hqdefault", 94), ("hqdefault", 110), ("hqdefault", 138), ("hqdefault", 188))
+            ],
+            "timestamp": 1700000000 + i * 86400,
+            "release_timestamp": None,
+            "availability": None,
+            "view_count": 1000 + i * 37,
+            "live_status": None,
+            "channel_is_verified": None,
+        }
+
+
+class _RetainingSink:
+    """PlaylistWindow처럼 받은 항목을 모두 들고 있는 수신자."""
+
+    closed = False
+
+    def __init__(self):
+        self.entries = []
+
+    def add_entries(self, entries, archived=()):
+        self.entries.extend(entries)
+
+    def finish_loading(self):
+        pass
+
+
+def scenario_playlist_memory(ctx):
+    """큰 채널을 평면 추출해 재생목록 창에 넘길 때의 최대/잔류 메모리 (tracemalloc)."""
+    import tracemalloc
+
+    count = 500 if ctx.quick else 5000
+    isolate(os.path.join(ctx.workdir("playlist_memory"), "config"))
+    engine = yt_mp3.DownloadEngine(lambda event: None, lang="en")
+    fmt = engine.FORMATS["mp3"]
+    info = {
+        "_type": "playlist",
+        "id": "bench",
+        "title": "bench channel",
+        "webpage_url": "https://www.youtube.com/@bench/videos",
+        "playlist_count": count,
+        "entries": flat_entries(count),
+    }
+    sink = _RetainingSink()
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        # 캐시에 쓰지 않는 경로(cached=True)로 재생목록 창이 들고 있는 항목만 잰다
+        engine._stream_playlist(info["webpage_url"], info, fmt, lambda _: sink, cached=True)
+        wall = time.perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        engine.close()
+    return {
+        "entries": len(sink.entries),
+        "wall_s": round(wall, 4),
+        "peak_mb": round(peak / 1e6, 3),
+        "retained_mb": round(retained / 1e6, 3),
+        "bytes_per_entry": round(retained / max(1, len(sink.entries))),
+    }
+
+
+def scenario_playlist_window(ctx):
+    """PlaylistWindow에 항목을 묶음으로 채우는 시간 (Tk 디스플레이가 있을 때만)."""
+    if yt_mp3.tk is None:
+        return {"skipped": "tkinter not available"}
+    try:
+        root = yt_mp3.tk.Tk()
+    except yt_mp3.tk.TclError as e:
+        return {"skipped": f"no display: {e}"}
+    count = 500 if ctx.quick else 5000
+    batch = yt_mp3.DownloadEngine.PLAYLIST_BATCH
+    entries = [
+        {"id": f"pw{i}", "title": f"bench entry {i}", "ie_key": "Generic", "duration": 200 + i % 400}
+        for i in range(count)
+    ]
+    try:
+        root.withdraw()
+        start = time.perf_counter()
+        win = yt_mp3.PlaylistWindow(
+            root, "bench", [], lambda _: None, lang="en", loading=True, expected=count
+        )
+        root.update()
+        opened = time.perf_counter() - start
+        batches = []
+        for i in range(0, count, batch):
+            t = time.perf_counter()
+            win.add_entries(entries[i:i + batch])
+            root.update()
+            batches.append(time.perf_counter() - t)
+        win.finish_loading()
+        root.update()
+        total = time.perf_counter() - start
+        win._close()
+    finally:
+        root.destroy()
+    return {
+        "entries": count,
+        "open_s": round(opened, 4),
+        "total_s": round(total, 4),
+        "batch_s": _summary(batches),
+    }
+
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import yt_mp3
+imported = time.perf_counter()
+yt_mp3.warm_up()
+print(json.dumps({"import_s": imported - start, "warm_up_s": time.perf_counter() - imported}))
+"""
+
+
+def scenario_startup(ctx):
+    """새 인터프리터에서 yt_mp3 import / 지연 모듈 warm-up / 첫 창까지 걸리는 시간."""
+    runs = 3 if ctx.quick else 10
+    imports, warm_ups, processes, windows = [], [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        processes.append(time.perf_counter() - start)
+        probe = json.loads(out)
+        imports.append(probe["import_s"])
+        warm_ups.append(probe["warm_up_s"])
+    result = {
+        "runs": runs,
+        "import_s": _summary(imports),
+        "warm_up_s": _summary(warm_ups),
+        "process_s": _summary(processes),
+    }
+    # 첫 창까지의 시간은 디스플레이가 있을 때만 잰다
+    for _ in range(runs):
+        try:
+            out = subprocess.run(
+                [sys.executable, os.path.join(ROOT, "yt_mp3.py"), "--startup-time"],
+                capture_output=True, text=True, check=True, timeout=60,
+            ).stdout
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            result["window"] = {"skipped": f"no display: {type(e).__name__}"}
+            break
+        windows.append(json.loads(out.strip().splitlines()[-1])["first_window_s"])
+    if windows:
+        result["first_window_s"] = _summary(windows)
+    return result
+
+
+SCENARIOS = {
+    "startup": scenario_startup,
+    "single_latency": scenario_single_latency,
+    "playlist_throughput": scenario_playlist_throughput,
+    "transcode_bound": scenario_transcode_bound,
+    "metadata": scenario_metadata,
+    "replaygain": scenario_replaygain,
+    "duplicates": scenario_duplicates,
+    "playlist_memory": scenario_playlist_memory,
+    "playlist_window": scenario_playlist_window,
+}
+
+
+class Context:
+    def __init__(self, root, quick, jobs, ffmpeg_loc):
+        self.root = root
+        self.quick = quick
+        self.jobs = jobs
+        self.ffmpeg_loc = ffmpeg_loc
+
+    def workdir(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+def _environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "yt_dlp": yt_mp3.yt_dlp.version.__version__,
+    }
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+    return out
+
+
+def compare(old, new):
+    """두 결과 파일의 수치 지표를 나란히 출력한다 (stderr)."""
+    before = _flatten("", old.get("scenarios", {}), {})
+    after = _flatten("", new.get("scenarios", {}), {})
+    for key in sorted(set(before) & set(after)):
+        a, b = before[key], after[key]
+        ratio = f"{b / a:6.2f}x" if a else "     -"
+        print(f"{key:50s} {a:>12} -> {b:>12} {ratio}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="offline yt-mp3 benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a smoke run")
+    parser.add_argument("--jobs", type=int, default=yt_mp3.DEFAULT_JOBS)
+    parser.add_argument("--ffmpeg", metavar="DIR", help="folder containing ffmpeg")
+    parser.add_argument("-o", "--output", metavar="FILE", help="write JSON results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="previous results to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary work folder")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="yt-mp3-bench-")
+    isolate(os.path.join(root, "config"))
+    ffmpeg_loc = yt_mp3.find_ffmpeg(args.ffmpeg or "")
+    if ffmpeg_loc is None:
+        shutil.rmtree(root, ignore_errors=True)
+        parser.error("ffmpeg not found; pass --ffmpeg DIR")
+
+    ctx = Context(root, args.quick, args.jobs, ffmpeg_loc)
+    results = {
+        "version": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "quick": args.quick,
+        "environment": _environment(),
+        "scenarios": {},
+    }
+    try:
+        for name in args.scenario or SCENARIOS:
+            print(f"running {name}...", file=sys.stderr)
+            start = time.perf_counter()
+            try:
+                result = SCENARIOS[name](ctx)
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+            result["scenario_s"] = round(time.perf_counter() - start, 3)
+            results["scenarios"][name] = result
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,4 +6,4 @@ if [ -z "$VIRTUAL_ENV" ]; then
     source venv/bin/activate
 fi
 
-python yt_mp3.py
+python yt_mp3.py "$@"
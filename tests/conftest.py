@@ -0,0 +1,5 @@
+import os
+import sys
+
+# yt_mp3.py는 패키지가 아닌 단일 모듈이므로 저장소 루트를 import 경로에 넣는다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
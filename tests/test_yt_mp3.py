@@ -0,0 +1,728 @@
+"""네트워크 없이 돌아가는 순수 구성 요소 단위 테스트."""
+
+import concurrent.futures
+import io
+import json
+import os
+import ssl
+import threading
+import time
+
+import pytest
+import yt_dlp
+
+import yt_mp3
+from yt_mp3 import (
+    DownloadArchive,
+    DownloadEngine,
+    ExtractCache,
+    HostLimiter,
+    JobQueue,
+    JsonLinesWriter,
+    LoudnessCache,
+    PlaylistEntry,
+    TagCache,
+    TokenBucket,
+    UiUpdateBuffer,
+)
+
+
+def http_error(status, headers=None):
+    response = yt_dlp.networking.Response(
+        io.BytesIO(b""), "https://example.com/x", headers or {}, status=status
+    )
+    return yt_dlp.networking.exceptions.HTTPError(response)
+
+
+def wrapped(error):
+    """YoutubeDL.download가 던지는 것처럼 DownloadError로 감싼다."""
+    return yt_dlp.utils.DownloadError(str(error), exc_info=(type(error), error, None))
+
+
+# ---- 재시도 분류 / 백오프 ----
+
+@pytest.mark.parametrize("status, kind", [
+    (429, "throttle"),
+    (503, "transient"),
+    (500, "transient"),
+    (403, "transient"),
+    (408, "transient"),
+    (404, "permanent"),
+    (410, "permanent"),
+])
+def test_classify_http_status(status, kind):
+    assert yt_mp3.classify_error(http_error(status)) == kind
+    assert yt_mp3.classify_error(wrapped(http_error(status))) == kind
+
+
+@pytest.mark.parametrize("error, kind", [
+    (ConnectionResetError(104, "Connection reset by peer"), "transient"),
+    (TimeoutError("read timed out"), "transient"),
+    (yt_dlp.utils.DownloadError("ERROR: HTTP Error 429: Too Many Requests"), "throttle"),
+    (yt_dlp.utils.DownloadError("ERROR: [youtube] abc: Private video"), "permanent"),
+    (yt_dlp.utils.DownloadError("ERROR: Unable to download webpage: timed out"), "transient"),
+])
+def test_classify_other_errors(error, kind):
+    assert yt_mp3.classify_error(error) == kind
+
+
+def test_classify_tls_errors_as_permanent():
+    cert = yt_dlp.networking.exceptions.CertificateVerifyError(
+        "[SSL: CERTIFICATE_VERIFY_FAILED] certificate verify failed"
+    )
+    assert yt_mp3.classify_error(cert) == "permanent"
+    assert yt_mp3.classify_error(wrapped(cert)) == "permanent"
+    handshake = yt_dlp.networking.exceptions.SSLError("[SSL] handshake failure")
+    assert yt_mp3.classify_error(handshake) == "permanent"
+    assert yt_mp3.classify_error(ssl.SSLCertVerificationError(1, "verify failed")) == "permanent"
+    text = yt_dlp.utils.DownloadError(
+        "ERROR: Unable to download webpage: <urlopen error [SSL: CERTIFICATE_VERIFY_FAILED]"
+        " certificate verify failed: self-signed certificate (_ssl.c:1006)>"
+    )
+    assert yt_mp3.classify_error(text) == "permanent"
+    # 핸드셰이크 도중 끊긴 연결은 다시 시도한다
+    eof = yt_dlp.networking.exceptions.SSLError(cause=ssl.SSLEOFError(8, "EOF occurred"))
+    assert yt_mp3.classify_error(eof) == "transient"
+
+
+def test_retry_after_header():
+    assert yt_mp3._retry_after(wrapped(http_error(429, {"Retry-After": "120"}))) == 120.0
+    assert yt_mp3._retry_after(http_error(429)) is None
+    # HTTP 날짜 형식은 따르지 않는다
+    assert yt_mp3._retry_after(http_error(429, {"Retry-After": "Wed, 21 Oct 2015"})) is None
+    assert yt_mp3._retry_after(ValueError("x")) is None
+
+
+def test_retry_delay_bounds(monkeypatch):
+    base = DownloadEngine.RETRY_BASE["transient"]
+    monkeypatch.setattr(yt_mp3.random, "uniform", lambda a, b: b)
+    assert DownloadEngine.retry_delay("transient", 0) == base
+    assert DownloadEngine.retry_delay("transient", 3) == base * 8
+    assert DownloadEngine.retry_delay("transient", 30) == DownloadEngine.RETRY_CAP
+    monkeypatch.setattr(yt_mp3.random, "uniform", lambda a, b: a)
+    assert DownloadEngine.retry_delay("transient", 3) == base * 4
+
+
+def test_retry_delay_honours_longer_retry_after(monkeypatch):
+    monkeypatch.setattr(yt_mp3.random, "uniform", lambda a, b: b)
+    error = http_error(429, {"Retry-After": "900"})
+    assert DownloadEngine.retry_delay("throttle", 0, error) == 900.0
+    short = http_error(429, {"Retry-After": "1"})
+    assert DownloadEngine.retry_delay("throttle", 0, short) == (
+        DownloadEngine.RETRY_BASE["throttle"]
+    )
+
+
+# ---- 대역폭 / 호스트 제한 ----
+
+def test_token_bucket_unlimited_does_not_block():
+    bucket = TokenBucket(0)
+    start = time.monotonic()
+    bucket.consume(10 * 1024 * 1024)
+    assert time.monotonic() - start < 0.1
+
+
+def test_token_bucket_waits_for_debt():
+    bucket = TokenBucket(200_000)
+    bucket.consume(200_000)  # 모아 둔 1초 분량을 다 쓴다
+    start = time.monotonic()
+    bucket.consume(50_000)
+    assert 0.15 <= time.monotonic() - start < 1.0
+
+
+def test_token_bucket_set_rate_wakes_waiters():
+    bucket = TokenBucket(64 * 1024)
+    worker = threading.Thread(target=bucket.consume, args=(100 * 1024 * 1024,))
+    worker.start()
+    time.sleep(0.05)
+    bucket.set_rate(0)
+    worker.join(1.0)
+    assert not worker.is_alive()
+
+
+@pytest.mark.parametrize("url, host", [
+    ("https://rr3---sn-ab.googlevideo.com/videoplayback", "rr3---sn-ab.googlevideo.com"),
+    ("https://WWW.YouTube.com/watch?v=a", "www.youtube.com"),
+    ("https://a.cdn.io/x.m4a", "a.cdn.io"),
+    ("https://foo.bar.io/x.m4a", "foo.bar.io"),
+    ("http://127.0.0.1:8765/a.wav", "127.0.0.1:8765"),
+    ("not a url", ""),
+])
+def test_host_of(url, host):
+    assert HostLimiter.host_of(url) == host
+
+
+def test_media_url_prefers_chosen_format():
+    info = {
+        "webpage_url": "https://www.youtube.com/watch?v=a",
+        "url": "https://rr1.googlevideo.com/single",
+        "requested_formats": [{"url": "https://rr2.googlevideo.com/audio"}],
+    }
+    assert HostLimiter.media_url(info) == "https://rr2.googlevideo.com/audio"
+    del info["requested_formats"]
+    assert HostLimiter.media_url(info) == "https://rr1.googlevideo.com/single"
+    del info["url"]
+    assert HostLimiter.media_url(info) == "https://www.youtube.com/watch?v=a"
+
+
+def test_host_limiter_blocks_per_host():
+    limiter = HostLimiter(1)
+    limiter.acquire("a.com")
+    limiter.acquire("b.com")  # 다른 호스트는 따로 센다
+    entered = threading.Event()
+
+    def second():
+        limiter.acquire("a.com")
+        entered.set()
+        limiter.release("a.com")
+
+    worker = threading.Thread(target=second)
+    worker.start()
+    assert not entered.wait(0.1)
+    limiter.release("a.com")
+    assert entered.wait(1.0)
+    worker.join(1.0)
+
+
+def test_host_limiter_set_limit_releases_waiters():
+    limiter = HostLimiter(1)
+    limiter.acquire("a.com")
+    worker = threading.Thread(target=limiter.acquire, args=("a.com",))
+    worker.start()
+    time.sleep(0.05)
+    limiter.set_limit(0)
+    worker.join(1.0)
+    assert not worker.is_alive()
+
+
+# ---- 재생목록 항목 ----
+
+def test_playlist_entry_keeps_only_entry_keys():
+    entry = PlaylistEntry({
+        "id": "abc",
+        "title": "Song",
+        "url": "https://www.youtube.com/watch?v=abc",
+        "ie_key": "Youtube",
+        "duration": None,
+        "thumbnails": [{"url": "x"}] * 10,
+        "description": "long",
+    })
+    assert entry["title"] == "Song"
+    assert entry.get("thumbnails") is None
+    assert entry.get("duration", 0) == 0
+    assert "description" not in entry
+    assert "duration" not in entry
+    with pytest.raises(KeyError):
+        entry["channel"]
+    assert dict(entry) == {
+        "id": "abc",
+        "title": "Song",
+        "url": "https://www.youtube.com/watch?v=abc",
+        "ie_key": "Youtube",
+    }
+    assert DownloadArchive.key_for(entry) == "youtube abc"
+    assert yt_mp3._entry_url(entry) == "https://www.youtube.com/watch?v=abc"
+
+
+# ---- SQLite 저장소 ----
+
+def test_archive_lookup_by_codec_and_existing_file(tmp_path):
+    out = tmp_path / "song.mp3"
+    out.write_bytes(b"x" * 10)
+    archive = DownloadArchive(str(tmp_path / "db" / "archive.sqlite3"))
+    try:
+        key = DownloadArchive.key_for({"id": "abc", "extractor_key": "Youtube"})
+        assert key == "youtube abc"
+        assert DownloadArchive.key_for({"id": "abc"}) is None
+        archive.add(key, str(out), "mp3")
+        assert archive.lookup([key, "youtube other", None], "mp3") == {key}
+        assert archive.lookup([key], "aac") == set()
+        out.unlink()
+        assert archive.lookup([key], "mp3") == set()
+    finally:
+        archive.close()
+
+
+def test_entry_url_prefers_entry_url_for_playlist_items():
+    entry = {
+        "_type": "url",
+        "id": "abc",
+        "ie_key": "Youtube",
+        "url": "https://www.youtube.com/watch?v=abc",
+        "webpage_url": "https://www.youtube.com/shorts/abc",
+    }
+    assert yt_mp3._entry_url(entry) == "https://www.youtube.com/watch?v=abc"
+    assert yt_mp3._entry_url({"_type": "url", "id": "abc"}) == "abc"
+    video = {"id": "abc", "url": "https://cdn.example/abc.m4a", "webpage_url": "https://a.com/abc"}
+    assert yt_mp3._entry_url(video) == "https://a.com/abc"
+
+
+def test_archive_lookup_batches_many_keys(tmp_path):
+    out = tmp_path / "song.mp3"
+    out.write_bytes(b"x")
+    archive = DownloadArchive(str(tmp_path / "archive.sqlite3"))
+    try:
+        archive.add("youtube last", str(out), "mp3")
+        keys = [f"youtube {n}" for n in range(DownloadArchive.BATCH * 2)] + ["youtube last"]
+        assert archive.lookup(keys, "mp3") == {"youtube last"}
+    finally:
+        archive.close()
+
+
+def test_extract_cache_normalize_url():
+    same = {
+        ExtractCache.normalize_url(u)
+        for u in (
+            "https://www.youtube.com/watch?v=abc&si=track",
+            "https://m.youtube.com/watch?feature=share&v=abc",
+            "https://youtu.be/abc?si=x",
+            " https://youtube.com/watch?v=abc ",
+        )
+    }
+    assert same == {"https://youtube.com/watch?v=abc"}
+    assert ExtractCache.normalize_url("https://youtu.be/abc?list=L") != (
+        ExtractCache.normalize_url("https://youtu.be/abc")
+    )
+
+
+def test_extract_cache_round_trip(tmp_path):
+    cache = ExtractCache(str(tmp_path / "extract.sqlite3"))
+    try:
+        info = {"id": "abc", "title": "Song", "webpage_url": "https://www.youtube.com/watch?v=abc"}
+        cache.put("https://youtu.be/abc", info, info["webpage_url"])
+        assert cache.get("https://www.youtube.com/watch?v=abc&si=x")["title"] == "Song"
+        assert cache.get("https://youtu.be/other") is None
+    finally:
+        cache.close()
+
+
+def test_extract_cache_respects_format_url_expiry(tmp_path):
+    cache = ExtractCache(str(tmp_path / "extract.sqlite3"))
+    now = int(time.time())
+    try:
+        for key, expire in (("1", now + ExtractCache.EXPIRE_MARGIN // 2), ("2", now + 3600)):
+            formats = [{"url": f"https://cdn/x?expire={expire}"}]
+            cache.put(f"https://a.com/{key}", {"id": key, "formats": formats})
+        assert cache.get("https://a.com/1") is None
+        assert cache.get("https://a.com/2")["id"] == "2"
+    finally:
+        cache.close()
+
+
+def test_extract_cache_playlist_entries_trimmed(tmp_path):
+    cache = ExtractCache(str(tmp_path / "extract.sqlite3"))
+    try:
+        entries = [{"id": str(n), "title": f"t{n}", "thumbnails": []} for n in range(3)]
+        info = {"_type": "playlist", "id": "L", "entries": entries + [None]}
+        cache.put("https://a.com/list", info)
+        got = cache.get("https://a.com/list")
+        assert got["entries"] == [{"id": str(n), "title": f"t{n}"} for n in range(3)]
+    finally:
+        cache.close()
+
+
+def test_extract_cache_evicts_least_recently_used(tmp_path):
+    cache = ExtractCache(str(tmp_path / "extract.sqlite3"), max_bytes=1500)
+    blob = os.urandom(600).hex()  # 압축되지 않는 내용
+    try:
+        cache.put("https://a.com/old", {"id": "old", "blob": blob})
+        time.sleep(0.01)
+        cache.put("https://a.com/new", {"id": "new", "blob": blob})
+        assert cache.get("https://a.com/old") is None
+        assert cache.get("https://a.com/new")["id"] == "new"
+    finally:
+        cache.close()
+
+
+def test_extract_cache_disabled_with_zero_ttl(tmp_path):
+    cache = ExtractCache(str(tmp_path / "extract.sqlite3"), ttl=0)
+    try:
+        cache.put("https://a.com/1", {"id": "1"})
+        assert cache.get("https://a.com/1") is None
+    finally:
+        cache.close()
+
+
+def test_tag_cache_store_load_evict(tmp_path):
+    music = tmp_path / "music"
+    music.mkdir()
+    path = str(music / "a.mp3")
+    meta = {"artist": "A", "album": "B", "title": "C", "track": "1"}
+    cache = TagCache(str(tmp_path / "tags.sqlite3"))
+    try:
+        cache.store([(path, 10, 123, meta)])
+        assert cache.load(str(music)) == {path: (10, 123, meta)}
+        assert cache.load(str(tmp_path)) == {}
+        cache.evict([path])
+        assert cache.load(str(music)) == {}
+    finally:
+        cache.close()
+
+
+def test_loudness_cache_links_pre_and_post_tag_digests(tmp_path):
+    song = tmp_path / "a.flac"
+    song.write_bytes(b"audio")
+    loudness = {"lufs": -14.2, "peak": 0.9, "method": "numpy"}
+    cache = LoudnessCache(str(tmp_path / "loudness.sqlite3"))
+    try:
+        cache.store(str(song), loudness, "before", "after")
+        assert cache.lookup("before") == (loudness, False)
+        assert cache.lookup("after") == (loudness, True)
+        assert cache.lookup("missing") is None
+        st = song.stat()
+        assert cache.lookup_file(str(song), st.st_size, st.st_mtime_ns) == loudness
+        assert cache.lookup_file(str(song), st.st_size + 1, st.st_mtime_ns) is None
+    finally:
+        cache.close()
+
+
+def test_loudness_cache_silent_file_needs_no_tagging(tmp_path):
+    # 무음이라 태그를 쓰지 않은 파일도 다시 분석하지 않는다
+    song = tmp_path / "a.flac"
+    song.write_bytes(b"audio")
+    silent = {"lufs": None, "peak": 0.0, "method": "numpy"}
+    cache = LoudnessCache(str(tmp_path / "loudness.sqlite3"))
+    try:
+        cache.store(str(song), silent, "d")
+        assert cache.lookup("d") == (silent, True)
+        st = song.stat()
+        assert cache.lookup_file(str(song), st.st_size, st.st_mtime_ns) == silent
+    finally:
+        cache.close()
+
+
+# ---- 작업 큐 (이어받기) ----
+
+def test_job_queue_resumes_only_unfinished_items(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    try:
+        job = queue.create("/music", "mp3", "/opt/ffmpeg")
+        entries = [
+            {"id": str(n), "url": f"https://a.com/{n}", "title": f"t{n}", "thumbnails": []}
+            for n in range(4)
+        ]
+        queue.add_items(job, [(n, f"a {n}", e) for n, e in enumerate(entries)])
+        queue.set_state(job, 0, "done", path="/music/t0.mp3")
+        queue.set_state(job, 1, "failed", error="Private video")
+        queue.set_state(job, 2, "converting")
+        (pending,) = queue.unfinished()
+        assert pending["id"] == job
+        assert (pending["dest"], pending["codec"], pending["ffmpeg_loc"]) == (
+            "/music", "mp3", "/opt/ffmpeg"
+        )
+        assert pending["entries"] == [
+            {"id": "2", "url": "https://a.com/2", "title": "t2"},
+            {"id": "3", "url": "https://a.com/3", "title": "t3"},
+        ]
+        queue.finish(job)
+        assert queue.unfinished() == []
+    finally:
+        queue.close()
+
+
+def test_job_queue_closes_jobs_without_remaining_items(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(path)
+    try:
+        job = queue.create("/music", "mp3", "")
+        queue.add_items(job, [(0, "a 0", {"id": "0"})])
+        queue.set_state(job, 0, "done")
+        assert queue.unfinished() == []
+    finally:
+        queue.close()
+    # 다시 열어도 active로 남지 않는다
+    reopened = JobQueue(path)
+    try:
+        assert reopened.unfinished() == []
+    finally:
+        reopened.close()
+
+
+def test_job_queue_ignores_missing_job():
+    queue = JobQueue("/nonexistent/never/jobs.sqlite3")
+    queue.add_items(None, [(0, "k", {"id": "0"})])
+    queue.set_state(None, 0, "done")
+    queue.finish(None)
+    queue.close()
+
+
+# ---- 일괄 모드 이벤트 스트림 ----
+
+def read_events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_lines_writer_serialises_events():
+    stream = io.StringIO()
+    writer = JsonLinesWriter(stream)
+    writer({"event": "converted", "index": 0, "path": "/music/한글.mp3", "error": ValueError("x")})
+    (event,) = read_events(stream)
+    assert event["event"] == "converted"
+    assert event["path"] == "/music/한글.mp3"
+    assert event["error"] == "x"
+    assert isinstance(event["time"], float)
+    assert "한글" in stream.getvalue()
+
+
+def test_json_lines_writer_throttles_progress_per_item():
+    stream = io.StringIO()
+    writer = JsonLinesWriter(stream)
+    for percent in (0, 10, 20, 30):
+        writer({"event": "progress", "index": 0, "percent": percent})
+    writer({"event": "progress", "index": 1, "percent": 50})
+    writer({"event": "status", "index": 0, "message": "a"})
+    writer({"event": "status", "index": 0, "message": "b"})
+    writer({"event": "progress", "index": 0, "percent": 100})
+    events = [
+        (e["event"], e["index"], e.get("percent", e.get("message")))
+        for e in read_events(stream)
+    ]
+    assert events == [
+        ("progress", 0, 0),
+        ("progress", 1, 50),
+        ("status", 0, "a"),
+        ("progress", 0, 100),
+    ]
+
+
+def test_json_lines_writer_emits_again_after_interval(monkeypatch):
+    stream = io.StringIO()
+    writer = JsonLinesWriter(stream)
+    monkeypatch.setattr(JsonLinesWriter, "PROGRESS_INTERVAL", 0.0)
+    writer({"event": "progress", "index": 0, "percent": 10})
+    writer({"event": "progress", "index": 0, "percent": 20})
+    assert [e["percent"] for e in read_events(stream)] == [10, 20]
+
+
+# ---- UI 갱신 버퍼 ----
+
+def test_ui_buffer_keeps_latest_status_per_item():
+    buffer = UiUpdateBuffer()
+    buffer.status(1, "(2/3) 10%")
+    buffer.status(0, "(1/3) 5%")
+    buffer.status(1, "(2/3) 20%")
+    buffer.log("시작")
+    lines, _, _, status, _ = buffer.drain()
+    assert lines == ["시작"]
+    assert status == ["(1/3) 5%", "(2/3) 20%"]
+    # 바뀐 것이 없으면 상태 줄을 다시 그리지 않는다
+    assert buffer.drain()[3] is None
+    buffer.progress(0, 50)
+    buffer.progress(0, None)
+    assert buffer.drain()[3] == ["(2/3) 20%"]
+
+
+# ---- ffmpeg 조사 캐시 ----
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    folder = tmp_path / "bin"
+    folder.mkdir()
+    exe = folder / os.path.basename(yt_mp3._ffmpeg_exe(str(folder)))
+    exe.write_bytes(b"#!")
+    runs = []
+
+    def run(path):
+        runs.append(path)
+        return {"version": "7.0", "encoders": ["aac", "libmp3lame"]}
+
+    monkeypatch.setattr(yt_mp3, "FFMPEG_PROBE_FILE", str(tmp_path / "probe.json"))
+    monkeypatch.setattr(yt_mp3, "_ffmpeg_probes", None)
+    monkeypatch.setattr(yt_mp3, "_run_ffmpeg_probe", run)
+    monkeypatch.setattr(yt_mp3.shutil, "which", lambda name: str(exe))
+    return folder, runs
+
+
+def test_probe_reuses_path_result_for_its_folder(fake_ffmpeg):
+    folder, runs = fake_ffmpeg
+    assert yt_mp3.probe_ffmpeg("")["version"] == "7.0"
+    # 시작할 때 PATH에서 찾은 폴더가 칸에 채워져도 ffmpeg를 다시 실행하지 않는다
+    assert yt_mp3.find_ffmpeg(str(folder)) == str(folder)
+    assert yt_mp3.find_ffmpeg(str(folder) + os.sep) == str(folder) + os.sep
+    assert len(runs) == 1
+
+
+def test_probe_reruns_when_executable_changes(fake_ffmpeg):
+    folder, runs = fake_ffmpeg
+    yt_mp3.probe_ffmpeg(str(folder))
+    exe = yt_mp3._ffmpeg_exe(str(folder))
+    with open(exe, "ab") as f:
+        f.write(b"new build")
+    yt_mp3.probe_ffmpeg(str(folder))
+    assert len(runs) == 2
+    assert yt_mp3.find_ffmpeg(str(folder.parent / "missing")) is None
+
+
+# ---- 다운로드 실행 (네트워크 없음) ----
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    config = tmp_path / "config"
+    for name, file in (
+        ("ARCHIVE_FILE", "archive.sqlite3"),
+        ("EXTRACT_CACHE_FILE", "extract_cache.sqlite3"),
+        ("JOB_QUEUE_FILE", "jobs.sqlite3"),
+        ("THUMB_CACHE_DIR", "thumbs"),
+        ("LOUDNESS_CACHE_FILE", "loudness.sqlite3"),
+        ("FINGERPRINT_INDEX_FILE", "fingerprints.sqlite3"),
+    ):
+        monkeypatch.setattr(yt_mp3, name, str(config / file))
+    events = []
+    engine = DownloadEngine(events.append, lang="en")
+    engine.events = events
+    yield engine
+    engine.close()
+
+
+def new_run(engine, tmp_path, fmt="mp3", ffmpeg_loc=None):
+    return yt_mp3._DownloadRun(
+        engine, str(tmp_path), DownloadEngine.FORMATS[fmt], ffmpeg_loc, 2, multi=True
+    )
+
+
+def event_names(engine):
+    return [e["event"] for e in engine.events]
+
+
+def test_run_routes_by_source_codec(engine, fake_ffmpeg, tmp_path):
+    folder, _ = fake_ffmpeg
+    run = new_run(engine, tmp_path, "mp3", str(folder))
+    route, source, opts = run.route({"acodec": "mp3"})
+    assert (route, source) == ("remux", "mp3")
+    assert "postprocessor_args" not in opts
+    route, source, opts = run.route({"acodec": "opus"})
+    assert route == "transcode"
+    # 조사한 ffmpeg의 인코더를 실제 변환에 넘긴다
+    assert opts["postprocessor_args"] == {"extractaudio+ffmpeg_o": ["-c:a", "libmp3lame"]}
+
+    run = new_run(engine, tmp_path, "opus", str(folder))
+    route, _, opts = run.route({"acodec": "mp4a.40.2"})
+    assert route == "original"
+    assert opts["postprocessors"] == []
+    assert run.pp_opts["postprocessors"]
+
+    run = new_run(engine, tmp_path, "mp3", None)
+    assert run.route({"acodec": "opus"})[0] == "original"
+
+
+class FakeRetries:
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, delay, *args):
+        self.scheduled.append(args)
+
+
+def failing_run(engine, tmp_path, error):
+    run = new_run(engine, tmp_path)
+    run.retries = FakeRetries()
+    run.get_ydl = lambda: None
+
+    def fetch(ydl, url):
+        raise error
+
+    run.fetch = fetch
+    run.counts["total"] = run.active = 1
+    run.titles[0] = "song"
+    return run
+
+
+def test_run_schedules_retry_for_transient_errors(engine, tmp_path):
+    error = wrapped(yt_dlp.networking.exceptions.TransportError("reset"))
+    run = failing_run(engine, tmp_path, error)
+    run.download_one(0, "https://example.com/v", "youtube v", 0)
+    assert run.retries.scheduled == [(0, "https://example.com/v", "youtube v", 1)]
+    assert run.active == 1
+    assert "retry" in event_names(engine)
+
+    # 한도를 넘기면 실패로 기록하고 단계를 떠난다
+    limit = DownloadEngine.RETRY_LIMITS["transient"]
+    run.download_one(0, "https://example.com/v", "youtube v", limit)
+    assert len(run.retries.scheduled) == 1
+    assert run.active == 0
+    assert run.counts["failed"] == 1
+    (failure,) = run.failures
+    assert failure["title"] == "song"
+    assert (failure["kind"], failure["attempts"]) == ("transient", limit + 1)
+
+
+def test_run_fails_permanent_errors_without_retry(engine, tmp_path):
+    run = failing_run(engine, tmp_path, wrapped(http_error(404)))
+    run.download_one(0, "https://example.com/v", "youtube v", 0)
+    assert run.retries.scheduled == []
+    assert run.failures[0]["kind"] == "permanent"
+
+    # 작업이 끝나가는 중이면 일시적 오류도 다시 시도하지 않는다
+    error = wrapped(yt_dlp.networking.exceptions.TransportError("reset"))
+    run = failing_run(engine, tmp_path, error)
+    run.retries_closed.set()
+    run.download_one(0, "https://example.com/v", "youtube v", 0)
+    assert run.retries.scheduled == []
+    assert run.counts["failed"] == 1
+
+
+def processed(result=None, error=None):
+    future = concurrent.futures.Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def test_run_records_converted_item(engine, tmp_path):
+    out = tmp_path / "song.mp3"
+    out.write_bytes(b"x")
+    run = new_run(engine, tmp_path)
+    run.counts["total"] = 1
+    run.stats[0] = {
+        "start": time.perf_counter(),
+        "route": "transcode",
+        "timings": {"download": 0.5},
+        "bytes": 1000,
+    }
+    run.pp_slots.acquire()
+    result = (str(out), {"ExtractAudio": 0.2}, None, None)
+    run.on_processed(0, "", "youtube v", "song.mp3", processed(result))
+    assert run.counts["converted"] == 1
+    assert run.stats == {}
+    assert engine.archive.lookup(["youtube v"], "mp3") == {"youtube v"}
+    (converted,) = [e for e in engine.events if e["event"] == "converted"]
+    # 오디오 추출 시간은 처리 경로 이름으로 기록한다
+    assert converted["timings"]["transcode"] == 0.2
+    assert converted["download_bps"] == 2000
+
+
+def test_run_records_failed_conversion(engine, tmp_path):
+    run = new_run(engine, tmp_path)
+    run.counts["total"] = 1
+    run.stats[0] = {"start": time.perf_counter(), "route": "remux", "timings": {}, "bytes": 0}
+    run.pp_slots.acquire()
+    run.on_processed(0, "", "youtube v", "song.webm", processed(error=OSError("disk full")))
+    assert run.counts["failed"] == 1
+    assert run.failures[0]["key"] == "youtube v"
+    assert engine.archive.lookup(["youtube v"], "mp3") == set()
+
+
+class FakePool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+def test_run_submit_skips_archived_entries(engine, tmp_path):
+    out = tmp_path / "old.mp3"
+    out.write_bytes(b"x")
+    engine.archive.add("youtube old", str(out), "mp3")
+    run = new_run(engine, tmp_path)
+    pool = FakePool()
+    run.submit(pool, [
+        {"id": "old", "ie_key": "Youtube", "url": "https://example.com/old"},
+        {"id": "new", "ie_key": "Youtube", "url": "https://example.com/new", "title": "New"},
+    ])
+    assert pool.submitted == [(0, "https://example.com/new", "youtube new")]
+    assert run.counts == {"total": 1, "converted": 0, "failed": 0, "skipped": 1}
+    assert run.active == 1
+    assert run.titles == {0: "New"}
@@ -1,17 +1,79 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+import time
+
+# --startup-time의 기준점 (인터프리터 기동 시간은 빠진다)
+_MODULE_START = time.perf_counter()
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+except ImportError:  # 헤드리스 환경: --batch 모드만 사용 가능
+    tk = None
+try:
+    from PIL import Image
+except ImportError:  # 없으면 앨범 아트를 ffmpeg로 변환한다
+    Image = None
+import argparse
+import array
+import base64
+import collections
+import functools
+import hashlib
+import heapq
+import importlib.util
+import io
+import itertools
+import random
+import re
 import threading
 import os
+import queue
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import json
 import shutil
+import ssl
 import subprocess
+import sqlite3
 import sys
+import zlib
 from datetime import datetime
-import yt_dlp
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, TPE1, TIT2, TRCK, TALB, ID3NoHeaderError
-from mutagen.oggopus import OggOpus
-from mutagen.mp4 import MP4
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+class _LazyModule:
+    """처음 속성에 접근할 때 loader()로 import하는 모듈 대리 객체 (warm_up 참고)."""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = self._loader()
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def _import_yt_dlp():
+    # importlib 대신 import 문을 써야 PyInstaller 분석이 yt_dlp를 찾아 묶는다
+    import yt_dlp.postprocessor
+
+    return yt_dlp
+
+
+# yt_dlp는 추출기 목록 때문에 import가 오래 걸리므로 창을 띄운 뒤에 불러온다
+yt_dlp = _LazyModule(_import_yt_dlp)
+
+
+def warm_up():
+    """무거운 모듈을 미리 import한다. GUI가 뜬 뒤 백그라운드 스레드에서 호출한다."""
+    yt_dlp.load()
+    from mutagen import flac, id3, mp3, mp4, oggopus  # noqa: F401
 
 
 STRINGS = {
@@ -23,7 +85,7 @@ STRINGS = {
         "save_path_label": "저장 경로",
         "browse": "찾아보기",
         "ffmpeg_path_label": "ffmpeg 경로 (비워두면 시스템 PATH 사용)",
-        "ffmpeg_auto": "시스템 PATH에서 자동 설정됨",
+        "ffmpeg_auto": "ffmpeg {version} 사용 가능",
         "ffmpeg_missing_win": "ffmpeg 미설치. 설치: winget install Gyan.FFmpeg",
         "ffmpeg_missing_mac": "ffmpeg 미설치. 설치: brew install ffmpeg",
         "ffmpeg_missing_linux": "ffmpeg 미설치. 설치: sudo apt install ffmpeg",
@@ -40,6 +102,7 @@ STRINGS = {
         "progress_label": "진행률",
         "overall_label": "전체: ({current}/{total})",
         "current_file": "현재 파일:",
+        "current_files": "진행 중: {count}개",
         "log_label": "진행 상황",
         "warn_no_url_title": "입력 오류",
         "warn_no_url": "YouTube URL을 입력해 주세요.",
@@ -52,7 +115,24 @@ STRINGS = {
         "error_title": "오류",
         "playlist_detected": "재생목록 감지: {title} ({count}개)",
         "download_start": "다운로드 시작: {count}개 항목",
-        "converting": "변환 중: {filename}",
+        "converting": "변환 중 ({route}): {filename}",
+        "route_remux": "재인코딩 없음",
+        "route_transcode": "재인코딩",
+        "route_original": "원본 그대로",
+        "ffmpeg_no_encoder": "⚠ ffmpeg에 {codec} 인코더가 없어 재인코딩 없이 받을 수 있는 원본만 받습니다.",
+        "converted": "완료: {filename}",
+        "error_convert": "❌ 변환 오류 ({filename}): {error}",
+        "skipped_archived": "건너뜀 (이미 받음): {title}",
+        "error_item": "❌ 다운로드 실패: {error}",
+        "retry_scheduled": "재시도 예약 {attempt}/{limit} ({kind}, {delay}초 후): {error}",
+        "failed_summary": "❌ 끝내 실패한 항목 {count}개:",
+        "failed_item": "  - {title} [{kind}] {error}",
+        "resume_title": "이어받기",
+        "resume_msg": "끝나지 않은 이전 작업이 있습니다 ({count}개 항목).\n이어서 받을까요?",
+        "resume_start": "이전 작업 이어받기: {count}개 항목",
+        "metrics_title": "⏱ 단계별 소요 시간 (항목 수 / 합계 / 평균 / 90%):",
+        "metrics_phase": "  {phase}: {count}개 / {seconds:.1f}초 / {mean:.2f}초 / {p90:.2f}초",
+        "metrics_transfer": "  전송: {mb:.1f} MB, 연결당 평균 {kbps:.0f} KB/s, 전체 {wall_kbps:.0f} KB/s",
         "download_done": "✅ 다운로드 완료!",
         "done_title": "완료",
         "done_msg": "다운로드가 완료되었습니다.",
@@ -60,6 +140,13 @@ STRINGS = {
         "log_saved": "로그 저장: {path}",
         "warn_no_dir_title": "알림",
         "warn_no_dir": "저장 경로가 존재하지 않습니다.",
+        "jobs_label": "동시 다운로드:",
+        "limits_label": "전송 제한 (0 = 제한 없음)",
+        "rate_limit_label": "속도 (KB/s):",
+        "per_host_label": "호스트당 연결:",
+        "replaygain_label": "음량 맞춤 (ReplayGain)",
+        "limits_changed": "전송 제한: {rate}, 호스트당 연결 {per_host}",
+        "unlimited": "제한 없음",
         "language_label": "언어 / Language",
         "lang_restart_title": "언어 변경",
         "lang_restart_msg": "언어 설정이 변경되었습니다. 앱을 재시작하면 적용됩니다.",
@@ -85,10 +172,24 @@ STRINGS = {
         "meta_save_error": "저장 오류: {error}",
         "meta_save_all_done": "전체 저장 완료: {ok}개 성공",
         "meta_save_all_fail": ", {fail}개 실패",
+        "meta_replaygain": "음량 분석 (ReplayGain)",
+        "meta_replaygain_progress": "음량 분석 중... ({done}/{total})",
+        "meta_replaygain_done": "음량 분석 완료: {analyzed}개 분석, {cached}개는 이전 결과 사용",
+        "meta_replaygain_no_ffmpeg": "음량 분석에는 ffmpeg가 필요합니다.",
+        "fp_unavailable": "⚠ 중복 곡 검사에는 numpy가 필요합니다. 검사 없이 진행합니다.",
+        "fp_index_start": "중복 곡 검사용 음향 지문 색인 갱신 중... ({count}개 파일)",
+        "fp_index_done": "음향 지문 색인: {files}개 파일 ({indexed}개 추가, {removed}개 삭제, {failed}개 실패)",
+        "duplicate_flag": "⚠ 이미 있는 곡과 같아 보입니다: {filename} ≈ {match}",
+        "duplicate_skip": "건너뜀 (이미 있는 곡): {filename} = {match}",
+        "duplicate_link": "하드 링크 (이미 있는 곡): {filename} → {match}",
+        "meta_scanning": "태그 읽는 중... {done}/{total}",
+        "meta_saving": "저장 중... {done}/{total}",
         # PlaylistWindow
         "playlist_title": "재생목록 미리보기",
         "playlist_total": "총 {count}개 영상",
+        "playlist_loading": "불러오는 중... {count}/{total}개",
         "playlist_unknown": "알 수 없음",
+        "playlist_archived": "받음",
         "playlist_select_all": "전체 선택",
         "playlist_deselect_all": "전체 해제",
         "playlist_cancel": "취소",
@@ -102,7 +203,7 @@ STRINGS = {
         "save_path_label": "Save Path",
         "browse": "Browse",
         "ffmpeg_path_label": "ffmpeg Path (leave empty to use system PATH)",
-        "ffmpeg_auto": "Auto-detected from system PATH",
+        "ffmpeg_auto": "ffmpeg {version} detected",
         "ffmpeg_missing_win": "ffmpeg not installed. Install: winget install Gyan.FFmpeg",
         "ffmpeg_missing_mac": "ffmpeg not installed. Install: brew install ffmpeg",
         "ffmpeg_missing_linux": "ffmpeg not installed. Install: sudo apt install ffmpeg",
@@ -119,6 +220,7 @@ STRINGS = {
         "progress_label": "Progress",
         "overall_label": "Overall: ({current}/{total})",
         "current_file": "Current file:",
+        "current_files": "Active: {count}",
         "log_label": "Log",
         "warn_no_url_title": "Input Error",
         "warn_no_url": "Please enter a YouTube URL.",
@@ -131,7 +233,24 @@ STRINGS = {
         "error_title": "Error",
         "playlist_detected": "Playlist detected: {title} ({count} items)",
         "download_start": "Download started: {count} items",
-        "converting": "Converting: {filename}",
+        "converting": "Converting ({route}): {filename}",
+        "route_remux": "remux",
+        "route_transcode": "re-encode",
+        "route_original": "original file",
+        "ffmpeg_no_encoder": "⚠ ffmpeg has no {codec} encoder; only sources that can be remuxed will be downloaded.",
+        "converted": "Done: {filename}",
+        "error_convert": "❌ Conversion error ({filename}): {error}",
+        "skipped_archived": "Skipped (already downloaded): {title}",
+        "error_item": "❌ Download failed: {error}",
+        "retry_scheduled": "Retry {attempt}/{limit} scheduled ({kind}, in {delay}s): {error}",
+        "failed_summary": "❌ {count} items still failed:",
+        "failed_item": "  - {title} [{kind}] {error}",
+        "resume_title": "Resume",
+        "resume_msg": "An unfinished download was found ({count} items).\nResume it now?",
+        "resume_start": "Resuming previous job: {count} items",
+        "metrics_title": "⏱ Time per phase (items / total / mean / p90):",
+        "metrics_phase": "  {phase}: {count} / {seconds:.1f}s / {mean:.2f}s / {p90:.2f}s",
+        "metrics_transfer": "  Transfer: {mb:.1f} MB, {kbps:.0f} KB/s per connection, {wall_kbps:.0f} KB/s overall",
         "download_done": "✅ Download complete!",
         "done_title": "Done",
         "done_msg": "Download completed successfully.",
@@ -139,6 +258,13 @@ STRINGS = {
         "log_saved": "Log saved: {path}",
         "warn_no_dir_title": "Notice",
         "warn_no_dir": "Save path does not exist.",
+        "jobs_label": "Parallel:",
+        "limits_label": "Transfer limits (0 = unlimited)",
+        "rate_limit_label": "Speed (KB/s):",
+        "per_host_label": "Connections per host:",
+        "replaygain_label": "ReplayGain",
+        "limits_changed": "Transfer limits: {rate}, {per_host} per host",
+        "unlimited": "unlimited",
         "language_label": "Language",
         "lang_restart_title": "Language Changed",
         "lang_restart_msg": "Language setting has been changed. Restart the app to apply.",
@@ -164,10 +290,24 @@ STRINGS = {
         "meta_save_error": "Save error: {error}",
         "meta_save_all_done": "Save complete: {ok} succeeded",
         "meta_save_all_fail": ", {fail} failed",
+        "meta_replaygain": "Analyze Loudness (ReplayGain)",
+        "meta_replaygain_progress": "Analyzing loudness... ({done}/{total})",
+        "meta_replaygain_done": "Loudness done: {analyzed} analyzed, {cached} reused",
+        "meta_replaygain_no_ffmpeg": "Loudness analysis requires ffmpeg.",
+        "fp_unavailable": "⚠ Duplicate detection requires numpy; continuing without it.",
+        "fp_index_start": "Updating the acoustic fingerprint index for duplicate detection... ({count} files)",
+        "fp_index_done": "Fingerprint index: {files} files ({indexed} added, {removed} removed, {failed} failed)",
+        "duplicate_flag": "⚠ Looks like a track you already have: {filename} ≈ {match}",
+        "duplicate_skip": "Skipped (already in library): {filename} = {match}",
+        "duplicate_link": "Hard-linked (already in library): {filename} → {match}",
+        "meta_scanning": "Reading tags... {done}/{total}",
+        "meta_saving": "Saving... {done}/{total}",
         # PlaylistWindow
         "playlist_title": "Playlist Preview",
         "playlist_total": "{count} videos total",
+        "playlist_loading": "Loading... {count}/{total}",
         "playlist_unknown": "Unknown",
+        "playlist_archived": "downloaded",
         "playlist_select_all": "Select All",
         "playlist_deselect_all": "Deselect All",
         "playlist_cancel": "Cancel",
@@ -184,20 +324,1483 @@ _LEGACY_FORMAT_MAP = {
 
 _LANG_NAMES = {"ko": "한국어", "en": "English"}
 
+_EMPTY_META = {"artist": "", "album": "", "title": "", "track": ""}
+
+# 재생목록 동시 다운로드 수 기본값 (네트워크 대기 위주이므로 코어 수 기준, 상한 8)
+DEFAULT_JOBS = min(8, max(2, os.cpu_count() or 2))
+MAX_JOBS = 16
+
+# 변환(ffmpeg) 단계 프로세스 수 — CPU 바운드이므로 코어 수만큼
+DEFAULT_PP_WORKERS = max(1, os.cpu_count() or 1)
+
+# 후처리 프로세스로 넘길 필요가 없는 큰 info 필드
+_PP_DROP_KEYS = {
+    "formats",
+    "requested_formats",
+    "requested_downloads",
+    "automatic_captions",
+    "subtitles",
+    "heatmap",
+    "entries",
+}
+
+
+def _postprocess_payload(info):
+    """다운로드가 끝난 info dict에서 후처리 프로세스로 보낼 피클 가능한 사본을 만든다."""
+    # requested_downloads 항목에는 포맷 필드와 filepath만 있으므로 영상 info와 합친다
+    downloads = info.get("requested_downloads") or [{}]
+    item = {**info, **downloads[0]}
+    payload = {
+        k: v
+        for k, v in item.items()
+        if not k.startswith("__") and k not in _PP_DROP_KEYS
+    }
+    return yt_dlp.YoutubeDL.sanitize_info(payload)
+
+
+@functools.lru_cache(maxsize=None)
+def _tags_pp_class():
+    """MutagenTagsPP 클래스. yt_dlp의 기반 클래스가 필요하므로 처음 쓸 때 만든다."""
+
+    class MutagenTagsPP(yt_dlp.postprocessor.PostProcessor):
+        """제목/아티스트/앨범/트랙 번호와 앨범 아트를 mutagen으로 한 번에 쓰는 후처리기."""
+
+        @staticmethod
+        def meta_for(info):
+            """FFmpegMetadata와 같은 우선순위로 info에서 태그 값을 고른다."""
+            artist = (
+                info.get("artist")
+                or ", ".join(info.get("artists") or ())
+                or info.get("creator")
+                or info.get("uploader")
+                or info.get("uploader_id")
+            )
+            track = info.get("track_number")
+            return {
+                "artist": artist or "",
+                "album": info.get("album") or "",
+                "title": info.get("track") or info.get("title") or "",
+                "track": str(track) if track is not None else "",
+            }
+
+        def run(self, info):
+            path = info["filepath"]
+            if os.path.splitext(path)[1].lower() not in MetadataWindow.AUDIO_EXTS:
+                return self.run_ffmpeg(info)
+            meta = self.meta_for(info)
+            cover = None
+            thumbnail = next(
+                (t["filepath"] for t in reversed(info.get("thumbnails") or ()) if t.get("filepath")),
+                None,
+            )
+            if thumbnail:
+                try:
+                    with open(thumbnail, "rb") as f:
+                        cover = f.read()
+                except OSError:
+                    self.report_warning(f"Skipping cover art: cannot read {thumbnail}")
+            self.to_screen(f'Writing tags to "{path}"')
+            try:
+                MetadataWindow._save_tags(
+                    path, meta, {k for k, v in meta.items() if v}, cover,
+                    info.get("replaygain"),
+                )
+            except Exception as e:
+                raise yt_dlp.utils.PostProcessingError(f"Cannot write tags: {e}") from e
+            return [], info
+
+        def run_ffmpeg(self, info):
+            """mutagen으로 다루지 않는 컨테이너(webm 등)는 ffmpeg 후처리기로 태그를 쓴다."""
+            pps = yt_dlp.postprocessor
+            metadata = pps.FFmpegMetadataPP(self._downloader, add_chapters=False)
+            if not metadata.available:
+                self.report_warning(f"Skipping tags: ffmpeg is required for {info['filepath']}")
+                return [], info
+            _, info = metadata.run(info)
+            # 앨범 아트는 ThumbnailCache의 파일이므로 지우지 않게 한다
+            cover = pps.EmbedThumbnailPP(self._downloader, already_have_thumbnail=True)
+            try:
+                _, info = cover.run(info)
+            except yt_dlp.utils.PostProcessingError as e:
+                self.report_warning(f"Skipping cover art: {e}")
+            return [], info
+
+    return MutagenTagsPP
+
+
+# ReplayGain 2.0 기준 음량 (LUFS). Opus의 R128_TRACK_GAIN은 EBU R128 기준으로 쓴다
+REPLAYGAIN_REFERENCE = -18.0
+R128_REFERENCE = -23.0
+
+# ITU-R BS.1770 K-가중 필터 (48 kHz 계수): 고역 셸빙 → RLB 고역 통과 (b, a)
+_K_WEIGHTING = (
+    ((1.53512485958697, -2.69169618940638, 1.19839281085285),
+     (1.0, -1.69065929318241, 0.73248077421585)),
+    ((1.0, -2.0, 1.0),
+     (1.0, -1.99004745483398, 0.99007225036621)),
+)
+_LOUDNESS_RATE = 48000
+
+
+def _ffmpeg_exe(ffmpeg_loc):
+    """find_ffmpeg 결과(폴더 또는 "")로 ffmpeg 실행 파일 경로를 만든다."""
+    if not ffmpeg_loc:
+        return "ffmpeg"
+    return os.path.join(ffmpeg_loc, "ffmpeg.exe" if sys.platform == "win32" else "ffmpeg")
+
+
+@functools.lru_cache(maxsize=None)
+def _k_weighting_ir(taps=4096):
+    """K-가중 필터의 임펄스 응답. 4096 샘플 뒤로는 1e-8 아래라 잘라도 된다."""
+    x = [1.0] + [0.0] * (taps - 1)
+    for b, a in _K_WEIGHTING:
+        y = []
+        x1 = x2 = y1 = y2 = 0.0
+        for v in x:
+            out = b[0] * v + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+            x1, x2 = v, x1
+            y1, y2 = out, y1
+            y.append(out)
+        x = y
+    return tuple(x)
+
+
+def _gated_loudness(np, energies):
+    """100 ms 구간별 K-가중 평균 제곱으로 BS.1770 게이트 통합 음량을 구한다 (블록이 없으면 None)."""
+    if len(energies) < 4:
+        return None
+    blocks = np.convolve(energies, np.full(4, 0.25), mode="valid")
+    blocks = blocks[blocks > 10 ** ((-70 + 0.691) / 10)]
+    if not blocks.size:
+        return None
+    blocks = blocks[blocks > blocks.mean() * 0.1]
+    return -0.691 + 10 * float(np.log10(blocks.mean()))
+
+
+def _measure_numpy(np, stream):
+    """48 kHz 스테레오 float32 PCM 스트림의 (통합 음량, 샘플 피크)를 FFT 중첩-가산으로 잰다."""
+    h = np.asarray(_k_weighting_ir())
+    taps = len(h)
+    nfft = 1 << 19
+    chunk = nfft - taps + 1
+    response = np.fft.rfft(h, nfft)
+    seg = _LOUDNESS_RATE // 10
+    tail = np.zeros((2, taps - 1))
+    rest = np.zeros((2, 0))
+    energies = []
+    peak = 0.0
+    while True:
+        data = stream.read(chunk * 8)
+        if not data:
+            break
+        x = np.frombuffer(data, dtype="<f4").reshape(-1, 2).T
+        n = x.shape[1]
+        peak = max(peak, float(np.abs(x).max()))
+        y = np.fft.irfft(np.fft.rfft(x, nfft) * response, nfft)[:, : n + taps - 1]
+        y[:, : taps - 1] += tail
+        tail = y[:, n:].copy()
+        rest = np.concatenate((rest, y[:, :n]), axis=1)
+        whole = rest.shape[1] // seg * seg
+        if whole:
+            square = rest[:, :whole] ** 2
+            energies.append(square.reshape(2, -1, seg).mean(axis=2).sum(axis=0))
+            rest = rest[:, whole:]
+    energies = np.concatenate(energies) if energies else np.zeros(0)
+    return _gated_loudness(np, energies), peak
+
+
+def _measure_ebur128(exe, path):
+    """numpy가 없을 때: ffmpeg ebur128 필터 요약에서 (통합 음량, 샘플 피크)를 읽는다."""
+    result = subprocess.run(
+        [exe, "-hide_banner", "-nostdin", "-i", path, "-map", "0:a:0", "-af",
+         f"aformat=sample_rates={_LOUDNESS_RATE}:channel_layouts=stereo,"
+         "ebur128=peak=sample:framelog=verbose",
+         "-f", "null", "-"],
+        capture_output=True, text=True, errors="replace",
+    )
+    summary = result.stderr.rpartition("Summary:")[2]
+    lufs = re.search(r"\bI:\s+(\S+) LUFS", summary)
+    peak = re.search(r"\bPeak:\s+(\S+) dBFS", summary)
+    if result.returncode != 0 or not lufs or not peak:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"ffmpeg exited with {result.returncode}")
+    lufs = float(lufs.group(1))
+    return (lufs if lufs > -70 else None), 10 ** (float(peak.group(1)) / 20)
+
+
+def measure_loudness(path, ffmpeg_loc=""):
+    """파일의 통합 음량(BS.1770, LUFS)과 샘플 피크를 잰다 (numpy가 없으면 ffmpeg ebur128)."""
+    exe = _ffmpeg_exe(ffmpeg_loc)
+    try:
+        import numpy as np
+    except ImportError:
+        lufs, peak = _measure_ebur128(exe, path)
+        return {"lufs": lufs, "peak": peak, "method": "ebur128"}
+    proc = subprocess.Popen(
+        [exe, "-v", "error", "-nostdin", "-i", path, "-map", "0:a:0",
+         "-ac", "2", "-ar", str(_LOUDNESS_RATE), "-f", "f32le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    try:
+        lufs, peak = _measure_numpy(np, proc.stdout)
+    finally:
+        proc.stdout.close()
+        error = proc.stderr.read().decode("utf-8", "replace").strip()
+        proc.stderr.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(error.splitlines()[-1] if error else f"ffmpeg exited with {proc.returncode}")
+    return {"lufs": lufs, "peak": peak, "method": "numpy"}
+
+
+def _replaygain_tags(loudness):
+    """측정값을 ReplayGain 태그 문자열로 바꾼다 ({"gain": "-3.21 dB", "peak": "0.987654"})."""
+    return {
+        "gain": f"{REPLAYGAIN_REFERENCE - loudness['lufs']:.2f} dB",
+        "peak": f"{loudness['peak']:.6f}",
+    }
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _loudness_pp_class():
+    """LoudnessPP 클래스. _tags_pp_class와 같은 이유로 처음 쓸 때 만든다."""
+
+    class LoudnessPP(yt_dlp.postprocessor.PostProcessor):
+        """최종 파일의 음량을 재서 info["replaygain"]에 남긴다."""
+
+        def __init__(self, downloader, ffmpeg_loc=""):
+            super().__init__(downloader)
+            self.ffmpeg_loc = ffmpeg_loc
+
+        def run(self, info):
+            path = info["filepath"]
+            if os.path.splitext(path)[1].lower() not in MetadataWindow.AUDIO_EXTS:
+                return [], info
+            self.to_screen(f'Measuring loudness of "{path}"')
+            try:
+                info["replaygain"] = measure_loudness(path, self.ffmpeg_loc)
+            except Exception as e:
+                self.report_warning(f"Skipping ReplayGain: {e}")
+            return [], info
+
+    return LoudnessPP
+
+
+# 음향 지문: 5512 Hz 모노를 2048 샘플 창으로 256 샘플(약 46 ms)씩 옮기며
+# 300-2000 Hz를 로그 간격 33개 대역으로 나눈다. 앞 10분만 쓴다
+_FP_RATE = 5512
+_FP_FRAME = 2048
+_FP_HOP = 256
+_FP_BANDS = 33
+_FP_MAX_SECONDS = 600
+# FFT를 한 번에 계산할 프레임 수 (메모리 상한)
+_FP_BLOCK = 1024
+
+
+def _have_numpy():
+    """numpy를 불러오지 않고 설치 여부만 확인한다."""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def fingerprint_audio(path, ffmpeg_loc=""):
+    """파일 앞부분의 Haitsma-Kalker 음향 지문을 uint32 배열의 bytes로 만든다 (numpy 필요)."""
+    import numpy as np
+
+    result = subprocess.run(
+        [_ffmpeg_exe(ffmpeg_loc), "-v", "error", "-nostdin", "-i", path, "-map", "0:a:0",
+         "-t", str(_FP_MAX_SECONDS), "-ac", "1", "-ar", str(_FP_RATE), "-f", "f32le", "-"],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"ffmpeg exited with {result.returncode}")
+    x = np.frombuffer(result.stdout, dtype="<f4")
+    if len(x) < _FP_FRAME + _FP_HOP:
+        return b""
+    window = np.hanning(_FP_FRAME).astype(np.float32)
+    freqs = np.fft.rfftfreq(_FP_FRAME, 1 / _FP_RATE)
+    edges = np.searchsorted(freqs, np.geomspace(300, 2000, _FP_BANDS + 1))
+    frames = np.lib.stride_tricks.sliding_window_view(x, _FP_FRAME)[::_FP_HOP]
+    energies = []
+    for start in range(0, len(frames), _FP_BLOCK):
+        power = np.abs(np.fft.rfft(frames[start:start + _FP_BLOCK] * window, axis=1)) ** 2
+        energies.append(np.add.reduceat(power[:, : edges[-1]], edges[:-1], axis=1))
+    energies = np.concatenate(energies)
+    slope = energies[:, :-1] - energies[:, 1:]
+    bits = (slope[1:] - slope[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel().tobytes()
+
+
+def _link_duplicate(existing, source):
+    """이미 있는 파일을 source와 같은 이름으로 하드 링크(안 되면 복사)하고 그 경로를 반환한다."""
+    target = os.path.splitext(source)[0] + os.path.splitext(existing)[1]
+    if os.path.exists(target):
+        return target
+    try:
+        os.link(existing, target)
+    except OSError:
+        shutil.copy2(existing, target)
+    return target
+
+
+def _postprocess_item(info, pp_opts, replaygain=False, dedupe=None):
+    """원본 오디오를 변환하고 태그/앨범 아트/ReplayGain을 쓴다 (프로세스 풀에서 실행)."""
+    # 반환값: (최종 경로 또는 건너뛰었으면 None, {후처리기: 초}, 음량 또는 None, 중복 검사 결과 또는 None)
+    timings = {}
+    started = {}
+
+    duplicate = None
+    if dedupe is not None:
+        mode, index_path = dedupe
+        begin = time.perf_counter()
+        try:
+            fingerprint = fingerprint_audio(
+                info["filepath"], pp_opts.get("ffmpeg_location", "")
+            )
+            index = FingerprintIndex(index_path)
+            try:
+                match = index.match(fingerprint)
+            finally:
+                index.close()
+        except Exception:
+            # 중복 검사는 부가 기능이므로 실패해도 변환은 계속한다
+            fingerprint = None
+        timings["Fingerprint"] = time.perf_counter() - begin
+        if fingerprint:
+            duplicate = {"fingerprint": fingerprint, "match": match}
+            if match is not None and mode in ("skip", "link"):
+                os.remove(info["filepath"])
+                duplicate["action"] = mode
+                path = _link_duplicate(match["path"], info["filepath"]) if mode == "link" else None
+                return path, timings, None, duplicate
+
+    def pp_hook(d):
+        name = d["postprocessor"]
+        if d["status"] == "started":
+            started[name] = time.perf_counter()
+        elif d["status"] == "finished" and name in started:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - started.pop(name)
+
+    with yt_dlp.YoutubeDL({**pp_opts, "postprocessor_hooks": [pp_hook]}) as ydl:
+        if replaygain:
+            meter = _loudness_pp_class()(ydl, pp_opts.get("ffmpeg_location", ""))
+            meter.add_progress_hook(pp_hook)
+            ydl.add_post_processor(meter)
+        tagger = _tags_pp_class()(ydl)
+        tagger.add_progress_hook(pp_hook)
+        ydl.add_post_processor(tagger)
+        info = ydl.post_process(info["filepath"], info)
+    loudness = info.get("replaygain")
+    if loudness is not None:
+        loudness = {**loudness, "digest": _file_digest(info["filepath"])}
+    return info["filepath"], timings, loudness, duplicate
+
+
+def _audio_codec(acodec):
+    """yt-dlp의 acodec 값("mp4a.40.2", "opus" 등)을 FORMATS의 codec 이름으로 바꾼다."""
+    name = (acodec or "").lower().split(".")[0]
+    return "aac" if name == "mp4a" else name or None
+
+
+def _entry_url(entry):
+    """재생목록 항목/영상 info에서 다운로드에 쓸 URL을 고른다."""
+    if entry.get("_type", "video") == "video":
+        # 추출된 영상 info의 url은 스트림 주소이므로 페이지 URL로 다시 받는다
+        return entry.get("webpage_url") or entry.get("url") or entry.get("id")
+    return entry.get("url") or entry.get("webpage_url") or entry.get("id")
+
+
+class _SqliteStore:
+    """처음 쓸 때 연결하고 SCHEMA를 만드는 스레드 공유 SQLite 저장소의 바탕 클래스."""
+
+    # 처음 연결할 때 실행할 문장 (PRAGMA, CREATE ... IF NOT EXISTS)
+    SCHEMA = ()
+    # 다른 프로세스가 같은 파일을 쓰는 동안 기다릴 시간 (초)
+    TIMEOUT = 5.0
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=self.TIMEOUT, check_same_thread=False
+            )
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class DownloadArchive(_SqliteStore):
+    """이미 받은 영상을 기록하는 SQLite 색인 (extractor + 영상 ID → 출력 파일)."""
+
+    # 한 번의 IN (...) 조회에 넣을 최대 키 수 (SQLite 변수 개수 제한 이하)
+    BATCH = 500
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS archive ("
+        " key TEXT PRIMARY KEY,"
+        " path TEXT NOT NULL,"
+        " codec TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " ts REAL NOT NULL"
+        ") WITHOUT ROWID",
+    )
+
+    @staticmethod
+    def key_for(info):
+        """yt-dlp download archive와 같은 형식의 키 ("youtube <id>")를 만든다."""
+        video_id = info.get("id")
+        extractor = info.get("extractor_key") or info.get("ie_key")
+        if not video_id or not extractor:
+            return None
+        return f"{extractor.lower()} {video_id}"
+
+    def lookup(self, keys, codec):
+        """keys 중 같은 코덱으로 받았고 파일이 남아 있는 키의 집합을 반환한다."""
+        keys = [k for k in keys if k]
+        found = set()
+        try:
+            with self._lock:
+                conn = self._connect()
+                for start in range(0, len(keys), self.BATCH):
+                    chunk = keys[start:start + self.BATCH]
+                    marks = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, path FROM archive"
+                        f" WHERE codec = ? AND key IN ({marks})",
+                        (codec, *chunk),
+                    ).fetchall()
+                    found.update(key for key, path in rows if os.path.exists(path))
+        except sqlite3.Error:
+            pass
+        return found
+
+    def add(self, key, path, codec):
+        if not key:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO archive VALUES (?, ?, ?, ?, ?)",
+                    (key, path, codec, size, time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _is_playlist(info):
+    return info.get("_type") in ("playlist", "multi_video") or "entries" in info
+
+
+def _downloaded_path(info):
+    """다운로드에 성공했으면 디스크에 있는 파일 경로를, 아니면 None을 반환한다."""
+    if not info:
+        return None
+    downloads = info.get("requested_downloads") or [info]
+    path = downloads[0].get("filepath")
+    return path if path and os.path.exists(path) else None
+
+
+class ExtractCache(_SqliteStore):
+    """extract_info 결과를 정규화된 URL 기준으로 보관하는 TTL + LRU 디스크 캐시."""
+
+    # 재생목록 항목을 캐시할 때 남길 필드
+    ENTRY_KEYS = (
+        "_type", "id", "title", "url", "webpage_url", "duration",
+        "ie_key", "extractor_key", "channel", "uploader",
+    )
+    # URL에서 버리는 추적용 쿼리 파라미터
+    TRACKING_PARAMS = {"si", "feature", "pp", "t", "index", "start_radio", "ab_channel"}
+    # 포맷 URL 만료 직전의 안전 여유 (초)
+    EXPIRE_MARGIN = 300
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS extract_cache ("
+        " url TEXT PRIMARY KEY,"
+        " expires REAL NOT NULL,"
+        " atime REAL NOT NULL,"
+        " data BLOB NOT NULL"
+        ") WITHOUT ROWID",
+    )
+
+    def __init__(self, path, ttl=1800, max_bytes=128 * 1024 * 1024):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def normalize_url(cls, url):
+        """youtu.be/모바일 도메인과 추적 파라미터를 정리해 같은 영상이 같은 키가 되게 한다."""
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        query = [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in cls.TRACKING_PARAMS
+        ]
+        path = parts.path
+        if host == "youtu.be" and path.strip("/"):
+            query.insert(0, ("v", path.strip("/")))
+            host, path = "youtube.com", "/watch"
+        elif host in ("m.youtube.com", "youtube.com"):
+            host = "youtube.com"
+        return urlunsplit(
+            ((parts.scheme or "https").lower(), host, path, urlencode(sorted(query)), "")
+        )
+
+    @staticmethod
+    def _expires_at(info):
+        """포맷 URL의 expire 파라미터 중 가장 이른 시각 (없으면 None)."""
+        expires = []
+        for f in info.get("formats") or ():
+            for k, v in parse_qsl(urlsplit(f.get("url") or "").query):
+                if k == "expire" and v.isdigit():
+                    expires.append(int(v))
+        return min(expires) if expires else None
+
+    def get(self, url):
+        """캐시된 info dict를 반환한다. 없거나 만료되었으면 None."""
+        key = self.normalize_url(url)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT expires, data FROM extract_cache WHERE url = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[0] <= now:
+                    conn.execute("DELETE FROM extract_cache WHERE url = ?", (key,))
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE extract_cache SET atime = ? WHERE url = ?", (now, key)
+                )
+                conn.commit()
+            return json.loads(zlib.decompress(row[1]))
+        except (sqlite3.Error, zlib.error, ValueError):
+            return None
+
+    def put(self, url, info, *urls):
+        """info를 url(및 추가 URL들) 키로 저장한다."""
+        if not info or self.ttl <= 0:
+            return
+        entries = None
+        if info.get("_type") == "playlist":
+            # 재생목록은 항목을 최소 필드로 줄여 저장한다 (전체 항목 info는 따로 캐시됨).
+            # sanitize_info(remove_private_keys=True)는 entries를 지우므로 따로 보관한다
+            entries = [
+                {k: e[k] for k in self.ENTRY_KEYS if k in e}
+                for e in info.get("entries") or ()
+                if e
+            ]
+        info = yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+        if entries is not None:
+            info["entries"] = entries
+        now = time.time()
+        expires = now + self.ttl
+        url_expire = self._expires_at(info)
+        if url_expire is not None:
+            expires = min(expires, url_expire - self.EXPIRE_MARGIN)
+        if expires <= now:
+            return
+        data = zlib.compress(
+            json.dumps(info, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        keys = {self.normalize_url(u) for u in (url, *urls) if u}
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO extract_cache VALUES (?, ?, ?, ?)",
+                    [(k, expires, now, data) for k in keys],
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM extract_cache WHERE expires <= ?", (now,))
+        (size,) = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM extract_cache"
+        ).fetchone()
+        if size <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT url, LENGTH(data) FROM extract_cache ORDER BY atime"
+        ).fetchall()
+        drop = []
+        for url, length in rows:
+            if size <= self.max_bytes:
+                break
+            drop.append((url,))
+            size -= length
+        conn.executemany("DELETE FROM extract_cache WHERE url = ?", drop)
+
+
+class PlaylistEntry:
+    """재생목록 항목에서 ExtractCache.ENTRY_KEYS 필드만 남긴 가벼운 dict 호환 레코드."""
+
+    __slots__ = ExtractCache.ENTRY_KEYS
+
+    def __init__(self, entry):
+        for key in self.__slots__:
+            value = entry.get(key)
+            if value is not None:
+                setattr(self, key, value)
+
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key, default)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ or not hasattr(self, key):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def __repr__(self):
+        return f"PlaylistEntry({dict(self)!r})"
+
+
+class TagCache(_SqliteStore):
+    """MetadataWindow가 읽은 태그를 (경로, 크기, mtime_ns) 기준으로 보관하는 SQLite 캐시."""
+
+    FIELDS = ("artist", "album", "title", "track")
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS tags ("
+        " path TEXT PRIMARY KEY,"
+        " dir TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " artist TEXT, album TEXT, title TEXT, track TEXT"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS tags_dir ON tags (dir)",
+    )
+
+    def load(self, scan_dir):
+        """scan_dir의 캐시 항목을 {path: (size, mtime_ns, meta)}로 반환한다."""
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT path, size, mtime_ns, artist, album, title, track"
+                    " FROM tags WHERE dir = ?",
+                    (os.path.normcase(os.path.abspath(scan_dir)),),
+                ).fetchall()
+        except sqlite3.Error:
+            return {}
+        return {
+            row[0]: (row[1], row[2], dict(zip(self.FIELDS, row[3:])))
+            for row in rows
+        }
+
+    def store(self, rows):
+        """rows: [(path, size, mtime_ns, meta)]"""
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            path,
+                            os.path.normcase(os.path.dirname(os.path.abspath(path))),
+                            size,
+                            mtime_ns,
+                            *(meta[k] for k in self.FIELDS),
+                        )
+                        for path, size, mtime_ns, meta in rows
+                    ],
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def evict(self, paths):
+        if not paths:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "DELETE FROM tags WHERE path = ?", [(p,) for p in paths]
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+class LoudnessCache(_SqliteStore):
+    """음량 측정값을 파일 내용 해시(SHA-256)로 보관하는 SQLite 캐시."""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS loudness ("
+        " digest TEXT PRIMARY KEY,"
+        " lufs REAL,"
+        " peak REAL NOT NULL,"
+        " method TEXT NOT NULL,"
+        " tagged INTEGER NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS files ("
+        " path TEXT PRIMARY KEY,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " digest TEXT NOT NULL"
+        ") WITHOUT ROWID",
+    )
+    TIMEOUT = 30
+
+    def lookup(self, digest):
+        """해시로 찾는다. (측정값, 태그가 이미 들어간 내용인지) 또는 None."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT lufs, peak, method, tagged FROM loudness WHERE digest = ?",
+                    (digest,),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return {"lufs": row[0], "peak": row[1], "method": row[2]}, bool(row[3])
+
+    def lookup_file(self, path, size, mtime_ns):
+        """마지막으로 본 뒤 바뀌지 않았고 태그까지 끝난 파일이면 측정값, 아니면 None."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT l.lufs, l.peak, l.method FROM files f"
+                    " JOIN loudness l ON l.digest = f.digest"
+                    " WHERE f.path = ? AND f.size = ? AND f.mtime_ns = ? AND l.tagged",
+                    (path, size, mtime_ns),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else {"lufs": row[0], "peak": row[1], "method": row[2]}
+
+    def store(self, path, loudness, digest, tagged_digest=None):
+        """측정값을 기록한다. tagged_digest는 태그를 쓴 뒤의 해시 (쓰지 않았으면 None)."""
+        rows = [(digest, tagged_digest is None or tagged_digest == digest)]
+        if tagged_digest is not None and tagged_digest != digest:
+            rows.append((tagged_digest, True))
+        try:
+            st = os.stat(path)
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO loudness VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (d, loudness["lufs"], loudness["peak"], loudness["method"], int(t))
+                        for d, t in rows
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, tagged_digest or digest),
+                )
+                conn.commit()
+        except (OSError, sqlite3.Error):
+            pass
+
+
+def replaygain_file(path, ffmpeg_loc, cache_path):
+    """파일 하나의 음량을 재고 ReplayGain 태그를 쓴다 (프로세스 풀에서 실행)."""
+    digest = _file_digest(path)
+    cache = LoudnessCache(cache_path)
+    try:
+        hit = cache.lookup(digest)
+    finally:
+        cache.close()
+    if hit is not None and hit[1]:
+        return {"loudness": hit[0], "digest": digest, "tagged_digest": digest,
+                "analyzed": False}
+    loudness = hit[0] if hit is not None else measure_loudness(path, ffmpeg_loc)
+    tagged_digest = None
+    if loudness["lufs"] is not None:
+        MetadataWindow._save_tags(path, {}, (), replaygain=loudness)
+        tagged_digest = _file_digest(path)
+    return {"loudness": loudness, "digest": digest, "tagged_digest": tagged_digest,
+            "analyzed": hit is None}
+
+
+def replaygain_library(paths, ffmpeg_loc, cache, on_result, workers=None, stop=None):
+    """여러 파일의 ReplayGain 태그를 프로세스 풀에서 채우고 파일마다 on_result를 부른다."""
+    pending = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            on_result(path, None, e)
+            continue
+        hit = cache.lookup_file(path, st.st_size, st.st_mtime_ns)
+        if hit is None:
+            pending.append(path)
+        else:
+            on_result(path, {"loudness": hit, "analyzed": False}, None)
+    if not pending:
+        return
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers or DEFAULT_PP_WORKERS, len(pending)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        futures = {
+            pool.submit(replaygain_file, path, ffmpeg_loc, cache.path): path
+            for path in pending
+        }
+        for future in as_completed(futures):
+            if stop is not None and stop():
+                break
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                on_result(path, None, e)
+                continue
+            cache.store(path, result["loudness"], result["digest"], result["tagged_digest"])
+            on_result(path, result, None)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+class FingerprintIndex(_SqliteStore):
+    """저장 경로 오디오 파일들의 음향 지문(fingerprint_audio)을 모아 둔 SQLite 색인."""
+
+    # 같은 곡으로 볼 최대 비트 오류율 (관계없는 곡은 0.5 근처)
+    MAX_BER = 0.35
+    # 후보로 볼 최소 일치 부분 지문 수 / 겹치는 길이 (짧은 쪽 대비 비율, 최소 프레임)
+    MIN_HITS = 3
+    MIN_OVERLAP = 0.5
+    MIN_FRAMES = 10 * _FP_RATE // _FP_HOP
+    # 비교해 볼 후보 (곡, 위치) 수
+    CANDIDATES = 5
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS tracks ("
+        " id INTEGER PRIMARY KEY,"
+        " path TEXT NOT NULL UNIQUE,"
+        " dir TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " fp BLOB NOT NULL"
+        ")",
+        "CREATE INDEX IF NOT EXISTS tracks_dir ON tracks (dir)",
+        "CREATE TABLE IF NOT EXISTS hashes ("
+        " hash INTEGER NOT NULL,"
+        " track INTEGER NOT NULL,"
+        " pos INTEGER NOT NULL,"
+        " PRIMARY KEY (hash, track, pos)"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS hashes_track ON hashes (track)",
+    )
+    TIMEOUT = 30
+
+    @staticmethod
+    def _values(fingerprint):
+        values = array.array("I")
+        values.frombytes(fingerprint)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    @staticmethod
+    def _indexed(value):
+        # 무음 등에서 나오는 0/전부 1은 어느 곡에나 있으므로 빼고, 나머지는 값으로 1/4만 고른다
+        return value & 3 == 0 and value not in (0, 0xFFFFFFFF)
+
+    @staticmethod
+    def _dir_key(path):
+        return os.path.normcase(os.path.dirname(os.path.abspath(path)))
+
+    def signatures(self, folder):
+        """folder에 색인된 파일의 {path: (size, mtime_ns)}."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path, size, mtime_ns FROM tracks WHERE dir = ?",
+                (os.path.normcase(os.path.abspath(folder)),),
+            ).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def add(self, path, fingerprint):
+        """path의 지문을 넣는다 (이미 있으면 바꾼다). 크기/수정 시각은 지금 값을 쓴다."""
+        values = self._values(fingerprint)
+        st = os.stat(path)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM hashes WHERE track = ?", row)
+                conn.execute("DELETE FROM tracks WHERE id = ?", row)
+            track = conn.execute(
+                "INSERT INTO tracks (path, dir, size, mtime_ns, fp) VALUES (?, ?, ?, ?, ?)",
+                (path, self._dir_key(path), st.st_size, st.st_mtime_ns, fingerprint),
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO hashes VALUES (?, ?, ?)",
+                [(v, track, pos) for pos, v in enumerate(values) if self._indexed(v)],
+            )
+            conn.commit()
+
+    def remove(self, paths):
+        if not paths:
+            return
+        with self._lock:
+            conn = self._connect()
+            for path in paths:
+                row = conn.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()
+                if row is not None:
+                    conn.execute("DELETE FROM hashes WHERE track = ?", row)
+                    conn.execute("DELETE FROM tracks WHERE id = ?", row)
+            conn.commit()
+
+    def match(self, fingerprint, exclude=None):
+        """fingerprint와 같은 곡으로 보이는 색인 파일의 {"path", "ber", "offset"} 또는 None."""
+        query = self._values(fingerprint)
+        positions = {}
+        for pos, v in enumerate(query):
+            if self._indexed(v):
+                positions.setdefault(v, []).append(pos)
+        votes = collections.Counter()
+        values = list(positions)
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(values), 500):
+                batch = values[start:start + 500]
+                rows = conn.execute(
+                    "SELECT hash, track, pos FROM hashes WHERE hash IN"
+                    f" ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for value, track, pos in rows:
+                    for qpos in positions[value]:
+                        votes[track, pos - qpos] += 1
+        best = None
+        for (track, offset), hits in votes.most_common(self.CANDIDATES):
+            if hits < self.MIN_HITS:
+                break
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT path, fp FROM tracks WHERE id = ?", (track,)
+                ).fetchone()
+            if row is None or row[0] == exclude:
+                continue
+            ber = self._bit_error_rate(query, self._values(row[1]), offset)
+            if ber is not None and ber <= self.MAX_BER and (best is None or ber < best["ber"]):
+                best = {
+                    "path": row[0],
+                    "ber": round(ber, 4),
+                    "offset": round(offset * _FP_HOP / _FP_RATE, 2),
+                }
+        return best
+
+    @classmethod
+    def _bit_error_rate(cls, query, other, offset):
+        """query[i]와 other[i + offset]을 맞춰 본 비트 오류율. 겹치는 부분이 짧으면 None."""
+        start = max(0, -offset)
+        end = min(len(query), len(other) - offset)
+        overlap = end - start
+        if overlap < max(cls.MIN_FRAMES, cls.MIN_OVERLAP * min(len(query), len(other))):
+            return None
+        errors = sum((query[i] ^ other[i + offset]).bit_count() for i in range(start, end))
+        return errors / (32 * overlap)
+
+    def update(self, folder, ffmpeg_loc, on_start=None, workers=None, stop=None):
+        """folder의 오디오 파일 중 새로 생기거나 바뀐 것만 프로세스 풀에서 지문을 만든다."""
+        found = MetadataWindow.scan_audio_files(folder)
+        known = self.signatures(folder)
+        stale = []
+        for path, size, mtime_ns in found:
+            if known.pop(path, None) != (size, mtime_ns):
+                stale.append(path)
+        self.remove(list(known))
+        counts = {"files": len(found), "indexed": 0, "removed": len(known), "failed": 0}
+        if not stale:
+            return counts
+        if on_start is not None:
+            on_start(len(stale))
+        with ProcessPoolExecutor(
+            max_workers=min(workers or DEFAULT_PP_WORKERS, len(stale)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {pool.submit(fingerprint_audio, path, ffmpeg_loc): path for path in stale}
+            for future in as_completed(futures):
+                if stop is not None and stop.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                try:
+                    self.add(futures[future], future.result())
+                    counts["indexed"] += 1
+                except Exception:
+                    counts["failed"] += 1
+        return counts
+
+
+class ThumbnailCache(_SqliteStore):
+    """앨범 아트를 내용 해시로 한 번만 변환해 두는 디스크 캐시 (전체 크기 기준 LRU)."""
+
+    # 앨범 아트로 넣을 최대 가로/세로 (px). 작은 이미지는 키우지 않는다
+    MAX_SIDE = 1200
+    JPEG_QUALITY = 90
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS thumb_urls ("
+        " url TEXT PRIMARY KEY,"
+        " digest TEXT NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS thumbs ("
+        " digest TEXT PRIMARY KEY,"
+        " size INTEGER NOT NULL,"
+        " atime REAL NOT NULL"
+        ") WITHOUT ROWID",
+    )
+
+    def __init__(self, folder, max_bytes=64 * 1024 * 1024):
+        super().__init__(os.path.join(folder, "index.sqlite3"))
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._inflight = {}
+
+    def _file(self, digest):
+        return os.path.join(self.folder, digest + ".jpg")
+
+    def _touch(self, conn, column, value):
+        """url 또는 digest로 캐시된 파일을 찾아 사용 시각을 갱신한다. 없으면 None."""
+        if column == "url":
+            row = conn.execute(
+                "SELECT digest FROM thumb_urls WHERE url = ?", (value,)
+            ).fetchone()
+            if row is None:
+                return None
+            value = row[0]
+        path = self._file(value)
+        if not os.path.exists(path):
+            conn.execute("DELETE FROM thumbs WHERE digest = ?", (value,))
+            conn.execute("DELETE FROM thumb_urls WHERE digest = ?", (value,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE thumbs SET atime = ? WHERE digest = ?", (time.time(), value))
+        conn.commit()
+        return path
+
+    def get(self, url, fetch, ffmpeg_loc=None):
+        """url의 변환된 앨범 아트 경로를 반환한다. 캐시에 없으면 fetch(url) → bytes로 받는다."""
+        with self._lock:
+            path = self._touch(self._connect(), "url", url)
+            if path is not None:
+                return path
+            waiting = self._inflight.get(url)
+            if waiting is None:
+                self._inflight[url] = threading.Event()
+        if waiting is not None:
+            waiting.wait()
+            with self._lock:
+                return self._touch(self._connect(), "url", url)
+        try:
+            return self._store(url, fetch(url), ffmpeg_loc)
+        finally:
+            with self._lock:
+                self._inflight.pop(url).set()
+
+    def _store(self, url, data, ffmpeg_loc):
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        with self._lock:
+            conn = self._connect()
+            path = self._touch(conn, "digest", digest)
+            if path is not None:
+                conn.execute("INSERT OR REPLACE INTO thumb_urls VALUES (?, ?)", (url, digest))
+                conn.commit()
+                return path
+        path = self._file(digest)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            if Image is not None:
+                self._convert_pillow(data, tmp)
+            else:
+                self._convert_ffmpeg(data, tmp, ffmpeg_loc)
+            os.replace(tmp, path)
+        except (OSError, ValueError, subprocess.SubprocessError):
+            return None
+        finally:
+            for leftover in (tmp, tmp + ".src"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO thumbs VALUES (?, ?, ?)",
+                (digest, os.path.getsize(path), now),
+            )
+            conn.execute("INSERT OR REPLACE INTO thumb_urls VALUES (?, ?)", (url, digest))
+            self._evict(conn, keep=digest)
+            conn.commit()
+        return path
+
+    def _convert_pillow(self, data, out):
+        with Image.open(io.BytesIO(data)) as img:
+            img = img.convert("RGB")
+            img.thumbnail((self.MAX_SIDE, self.MAX_SIDE))
+            img.save(out, "JPEG", quality=self.JPEG_QUALITY)
+
+    def _convert_ffmpeg(self, data, out, ffmpeg_loc):
+        src = out + ".src"
+        with open(src, "wb") as f:
+            f.write(data)
+        side = self.MAX_SIDE
+        subprocess.run(
+            [
+                _ffmpeg_exe(ffmpeg_loc), "-nostdin", "-loglevel", "error", "-y", "-i", src,
+                "-frames:v", "1", "-q:v", "2", "-f", "mjpeg",
+                "-vf", f"scale='min({side},iw)':'min({side},ih)':"
+                "force_original_aspect_ratio=decrease",
+                out,
+            ],
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+
+    def _evict(self, conn, keep):
+        (size,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbs").fetchone()
+        if size <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT digest, size FROM thumbs WHERE digest != ? ORDER BY atime", (keep,)
+        ).fetchall()
+        drop = []
+        for digest, length in rows:
+            if size <= self.max_bytes:
+                break
+            drop.append((digest,))
+            size -= length
+            try:
+                os.remove(self._file(digest))
+            except OSError:
+                pass
+        conn.executemany("DELETE FROM thumbs WHERE digest = ?", drop)
+        conn.executemany("DELETE FROM thumb_urls WHERE digest = ?", drop)
+
+
+class JobQueue(_SqliteStore):
+    """다운로드 작업과 항목별 상태를 기록하는 SQLite(WAL) 큐."""
+
+    UNFINISHED = ("pending", "downloading", "converting")
+    # 끝난 작업 기록을 지우기까지의 기간 (초)
+    PRUNE_AFTER = 7 * 24 * 3600
+
+    # 항목마다 상태를 커밋하므로 WAL + synchronous=NORMAL로 fsync를 줄인다
+    SCHEMA = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        " id INTEGER PRIMARY KEY,"
+        " created REAL NOT NULL,"
+        " dest TEXT NOT NULL,"
+        " codec TEXT NOT NULL,"
+        " ffmpeg_loc TEXT,"
+        " state TEXT NOT NULL"
+        ")",
+        "CREATE TABLE IF NOT EXISTS items ("
+        " job INTEGER NOT NULL,"
+        " seq INTEGER NOT NULL,"
+        " key TEXT,"
+        " entry TEXT NOT NULL,"
+        " state TEXT NOT NULL,"
+        " error TEXT,"
+        " path TEXT,"
+        " updated REAL NOT NULL,"
+        " PRIMARY KEY (job, seq)"
+        ") WITHOUT ROWID",
+    )
+
+    def create(self, dest, codec, ffmpeg_loc):
+        """새 작업을 만들고 ID를 반환한다 (기록할 수 없으면 None)."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                old = now - self.PRUNE_AFTER
+                conn.execute(
+                    "DELETE FROM items WHERE job IN"
+                    " (SELECT id FROM jobs WHERE state != 'active' AND created < ?)",
+                    (old,),
+                )
+                conn.execute(
+                    "DELETE FROM jobs WHERE state != 'active' AND created < ?", (old,)
+                )
+                cur = conn.execute(
+                    "INSERT INTO jobs (created, dest, codec, ffmpeg_loc, state)"
+                    " VALUES (?, ?, ?, ?, 'active')",
+                    (now, dest, codec, ffmpeg_loc),
+                )
+                conn.commit()
+                return cur.lastrowid
+        except sqlite3.Error:
+            return None
+
+    def add_items(self, job, rows):
+        """rows: [(seq, key, entry)] — entry는 다시 받을 때 쓸 최소 필드만 남긴다."""
+        if job is None:
+            return
+        now = time.time()
+        data = [
+            (
+                job,
+                seq,
+                key,
+                json.dumps(
+                    {k: entry[k] for k in ExtractCache.ENTRY_KEYS if k in entry},
+                    ensure_ascii=False,
+                    default=str,
+                ),
+                "pending",
+                now,
+            )
+            for seq, key, entry in rows
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO items (job, seq, key, entry, state, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    data,
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def set_state(self, job, seq, state, error=None, path=None):
+        if job is None:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "UPDATE items SET state = ?, error = ?, path = ?, updated = ?"
+                    " WHERE job = ? AND seq = ?",
+                    (state, error, path, time.time(), job, seq),
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def finish(self, job, state="finished"):
+        """작업을 닫는다. 닫힌 작업은 이어받기 대상에서 빠진다."""
+        if job is None:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("UPDATE jobs SET state = ? WHERE id = ?", (state, job))
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def unfinished(self):
+        """끝나지 않은 항목이 남은 active 작업 목록 (오래된 순)."""
+        marks = ",".join("?" * len(self.UNFINISHED))
+        jobs = []
+        try:
+            with self._lock:
+                conn = self._connect()
+                rows = conn.execute(
+                    "SELECT id, dest, codec, ffmpeg_loc FROM jobs"
+                    " WHERE state = 'active' ORDER BY id"
+                ).fetchall()
+                for job, dest, codec, ffmpeg_loc in rows:
+                    entries = [
+                        json.loads(entry)
+                        for (entry,) in conn.execute(
+                            f"SELECT entry FROM items WHERE job = ? AND state IN ({marks})"
+                            f" ORDER BY seq",
+                            (job, *self.UNFINISHED),
+                        )
+                    ]
+                    if not entries:
+                        conn.execute(
+                            "UPDATE jobs SET state = 'finished' WHERE id = ?", (job,)
+                        )
+                        continue
+                    jobs.append({
+                        "id": job,
+                        "dest": dest,
+                        "codec": codec,
+                        "ffmpeg_loc": ffmpeg_loc,
+                        "entries": entries,
+                    })
+                conn.commit()
+        except (sqlite3.Error, ValueError):
+            pass
+        return jobs
+
+
+class UiUpdateBuffer:
+    """작업 스레드의 UI 갱신 요청을 모아 두는 스레드 안전 버퍼."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lines = []
+        self._statuses = {}
+        self._statuses_dirty = False
+        self._items = {}
+        self._items_dirty = False
+        self._overall = None
+        self._calls = []
+
+    def log(self, msg):
+        with self._lock:
+            self._lines.append(msg)
+
+    def status(self, key, msg):
+        """항목(key)별로 덮어쓰는 상태 줄. 진행 중 목록에서 빠지면 같이 지운다."""
+        with self._lock:
+            self._statuses[key] = msg
+            self._statuses_dirty = True
+
+    def progress(self, index, value):
+        """항목별 진행률 (None이면 진행 중 목록에서 제거)."""
+        with self._lock:
+            if value is None:
+                self._items.pop(index, None)
+                if self._statuses.pop(index, None) is not None:
+                    self._statuses_dirty = True
+            else:
+                self._items[index] = value
+            self._items_dirty = True
+
+    def overall(self, current, total):
+        with self._lock:
+            self._overall = (current, total)
+
+    def call(self, fn, *args, **kwargs):
+        """Tk 스레드에서 실행할 함수 (로그/진행률 반영 후 순서대로 실행)."""
+        with self._lock:
+            self._calls.append((fn, args, kwargs))
+
+    def drain(self):
+        """(로그 줄, 진행 중 항목 진행률, 전체 진행, 항목별 상태 줄, 호출 목록). 바뀌지 않았으면 None."""
+        with self._lock:
+            lines, calls = self._lines, self._calls
+            active = list(self._items.values()) if self._items_dirty else None
+            status = (
+                [self._statuses[k] for k in sorted(self._statuses)]
+                if self._statuses_dirty else None
+            )
+            overall = self._overall
+            self._lines, self._calls = [], []
+            self._items_dirty = self._statuses_dirty = False
+            self._overall = None
+        return lines, active, overall, status, calls
+
+
+class RotatingLogWriter:
+    """로그 줄을 버퍼에 모아 파일에 쓰고 max_bytes를 넘으면 회전하는 writer."""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._size = self._file.tell()
+
+    def write_lines(self, lines):
+        data = "".join(line + "\n" for line in lines)
+        self._file.write(data)
+        self._size += len(data.encode("utf-8"))
+        if self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", encoding="utf-8", buffering=64 * 1024)
+        self._size = 0
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
 
 class MetadataWindow:
     """다운로드된 오디오 파일의 메타데이터를 편집하는 서브 윈도우."""
 
     AUDIO_EXTS = (".opus", ".mp3", ".m4a")
 
-    def __init__(self, parent, scan_dir, lang="ko"):
+    # 태그를 병렬로 읽을 스레드 수 (mutagen 파싱은 대부분 파일 I/O 대기)
+    SCAN_WORKERS = min(16, (os.cpu_count() or 2) * 2)
+    # 스캔 결과를 화면에 반영하는 주기 (ms)
+    SCAN_POLL_MS = 50
+
+    def __init__(
+        self, parent, scan_dir, lang="ko", tag_cache=None, ffmpeg_loc=None,
+        loudness_cache=None,
+    ):
         self.parent = parent
         self.scan_dir = scan_dir
         self.lang = lang
+        self.tag_cache = tag_cache
+        # 음량 분석용 (find_ffmpeg 결과, LoudnessCache)
+        self.ffmpeg_loc = ffmpeg_loc
+        self.loudness_cache = loudness_cache
         # {filepath: {"artist": str, "title": str, "track": str}}
         self.file_meta = {}
+        # 파일에서 읽어 온(또는 마지막으로 저장한) 값 — 변경 여부 비교용
+        self.loaded_meta = {}
+        # 태그를 읽기 전에 사용자가 고친 필드 {filepath: {field: value}} — 읽은 값 위에 덮는다
+        self.user_edits = {}
+        # 현재 파일을 보여 줄 때 입력란에 들어 있던 값 — 사용자가 고친 필드 판별용
+        self._shown = None
         self.files = []
         self.current_index = None
+        self.closed = False
+        # 스캔 스레드 → UI 결과 큐
+        self._scan_q = queue.Queue()
 
         self.win = tk.Toplevel(parent)
         self.win.title(self._t("meta_title"))
@@ -205,43 +1808,141 @@ class MetadataWindow:
         self.win.resizable(True, True)
         self.win.grab_set()
         self.win.transient(parent)
+        self.win.protocol("WM_DELETE_WINDOW", self._close)
 
-        self._scan_files()
-        if not self.files:
-            messagebox.showinfo(
-                self._t("meta_no_files_title"),
-                self._t("meta_no_files"),
-                parent=self.win,
-            )
-            self.win.destroy()
-            return
-
+        # 창을 먼저 띄우고, 파일 목록과 태그는 백그라운드에서 읽어 채운다
         self._build_ui()
-        self._select_file(0)
+        self._set_busy(True)
+        threading.Thread(target=self._scan_files, daemon=True).start()
+        self._poll_scan()
 
     def _t(self, key, **kwargs):
         s = STRINGS[self.lang][key]
         return s.format(**kwargs) if kwargs else s
 
+    @classmethod
+    def scan_audio_files(cls, scan_dir):
+        """scan_dir의 오디오 파일을 이름순 [(path, size, mtime_ns)]로 반환한다."""
+        with os.scandir(os.path.abspath(scan_dir)) as it:
+            found = []
+            for e in it:
+                if e.name.lower().endswith(cls.AUDIO_EXTS) and e.is_file():
+                    st = e.stat()
+                    found.append((e.path, st.st_size, st.st_mtime_ns))
+        found.sort(key=lambda f: os.path.basename(f[0]))
+        return found
+
     def _scan_files(self):
-        """저장 경로에서 오디오 파일을 스캔하고 기존 태그를 로드한다."""
+        """저장 경로에서 오디오 파일을 스캔하고 기존 태그를 스레드 풀로 읽는다 (스캔 스레드)."""
+        try:
+            found = self.scan_audio_files(self.scan_dir)
+        except OSError:
+            found = []
+        self._scan_q.put(("files", [path for path, _, _ in found]))
+
+        cached = self.tag_cache.load(self.scan_dir) if self.tag_cache else {}
+        stale = []
+        for path, size, mtime_ns in found:
+            hit = cached.pop(path, None)
+            if hit is not None and hit[0] == size and hit[1] == mtime_ns:
+                self._scan_q.put(("tags", path, hit[2]))
+            else:
+                stale.append((path, size, mtime_ns))
+        if self.tag_cache:
+            # 남은 캐시 항목은 삭제된 파일
+            self.tag_cache.evict(list(cached))
+
+        fresh = []
+        with ThreadPoolExecutor(
+            max_workers=self.SCAN_WORKERS, thread_name_prefix="yt-mp3-tags"
+        ) as pool:
+            futures = {pool.submit(self._read_tags, f[0]): f for f in stale}
+            for future in as_completed(futures):
+                if self.closed:
+                    for f in futures:
+                        f.cancel()
+                    break
+                path, size, mtime_ns = futures[future]
+                meta = future.result()
+                fresh.append((path, size, mtime_ns, meta))
+                self._scan_q.put(("tags", path, meta))
+        if self.tag_cache:
+            self.tag_cache.store(fresh)
+        if not self.closed:
+            self._scan_q.put(("done",))
+
+    def _remember_saved(self, path, meta):
+        """저장한 태그를 새 크기/수정 시각과 함께 캐시에 반영한다."""
+        if not self.tag_cache:
+            return
         try:
-            entries = sorted(os.listdir(self.scan_dir))
+            st = os.stat(path)
         except OSError:
             return
-        for name in entries:
-            if not name.lower().endswith(self.AUDIO_EXTS):
-                continue
-            path = os.path.join(self.scan_dir, name)
-            if not os.path.isfile(path):
-                continue
-            self.files.append(path)
-            self.file_meta[path] = self._read_tags(path)
+        self.tag_cache.store([(path, st.st_size, st.st_mtime_ns, dict(meta))])
+
+    def _poll_scan(self):
+        """스캔 결과를 모아서 목록/편집 패널에 반영한다."""
+        if self.closed:
+            return
+        try:
+            while True:
+                msg = self._scan_q.get_nowait()
+                if msg[0] == "files":
+                    self.files = msg[1]
+                    if not self.files:
+                        messagebox.showinfo(
+                            self._t("meta_no_files_title"),
+                            self._t("meta_no_files"),
+                            parent=self.win,
+                        )
+                        self._close()
+                        return
+                    self.file_listbox.insert(
+                        "end", *(os.path.basename(p) for p in self.files)
+                    )
+                    self._select_file(0)
+                elif msg[0] == "tags":
+                    _, path, meta = msg
+                    self.loaded_meta[path] = dict(meta)
+                    edits = self.user_edits.pop(path, {})
+                    current = (
+                        self.current_index is not None
+                        and self.files[self.current_index] == path
+                    )
+                    typing = self._edited_fields() if current else {}
+                    edits.update(typing)
+                    self.file_meta[path] = {**meta, **edits}
+                    if current:
+                        # 지금 고치고 있는 입력란은 덮어쓰지 않는다
+                        self._show_meta(self.file_meta[path], keep=typing)
+                else:
+                    self._set_busy(False)
+                    self.status_label.configure(text="")
+                    return
+        except queue.Empty:
+            pass
+        self.status_label.configure(
+            text=self._t(
+                "meta_scanning", done=len(self.file_meta), total=len(self.files)
+            ),
+            foreground="gray",
+        )
+        self.win.after(self.SCAN_POLL_MS, self._poll_scan)
+
+    def _set_busy(self, busy):
+        """스캔/저장 중에는 일괄 작업 버튼을 비활성화한다."""
+        for btn in self.action_buttons:
+            btn.configure(state="disabled" if busy else "normal")
 
     @staticmethod
     def _read_tags(path):
         """파일에서 기존 메타데이터를 읽는다."""
-        meta = {"artist": "", "album": "", "title": "", "track": ""}
+        from mutagen.id3 import ID3, ID3NoHeaderError
+        from mutagen.mp4 import MP4
+        from mutagen.oggopus import OggOpus
+
+        meta = dict(_EMPTY_META)
         ext = os.path.splitext(path)[1].lower()
         try:
             if ext == ".mp3":
@@ -291,9 +1992,6 @@ class MetadataWindow:
         self.file_listbox.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        for path in self.files:
-            self.file_listbox.insert("end", os.path.basename(path))
-
         self.file_listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
 
         # 우측: 편집 패널
@@ -317,9 +2015,10 @@ class MetadataWindow:
             fill="x", padx=5, pady=(0, 6)
         )
 
-        ttk.Button(
+        apply_btn = ttk.Button(
             common_lf, text=self._t("meta_apply_all"), command=self._apply_common
-        ).pack(fill="x", padx=5, pady=(0, 8))
+        )
+        apply_btn.pack(fill="x", padx=5, pady=(0, 8))
 
         # --- 개별 파일 필드 (제목 / 트랙번호) ---
         per_file_lf = ttk.LabelFrame(right, text=self._t("meta_per_file"))
@@ -343,19 +2042,23 @@ class MetadataWindow:
         btn_frame = ttk.Frame(right)
         btn_frame.pack(fill="x", pady=(10, 0))
 
-        ttk.Button(
-            btn_frame, text=self._t("meta_auto_fill"), command=self._auto_fill_all
-        ).pack(fill="x", pady=2)
-        ttk.Button(
-            btn_frame, text=self._t("meta_save"), command=self._save_current
-        ).pack(fill="x", pady=2)
-        ttk.Button(
-            btn_frame, text=self._t("meta_save_all"), command=self._save_all
-        ).pack(fill="x", pady=2)
+        self.action_buttons = [apply_btn]
+        for key, command in (
+            ("meta_auto_fill", self._auto_fill_all),
+            ("meta_save", self._save_current),
+            ("meta_save_all", self._save_all),
+            ("meta_replaygain", self._replaygain_all),
+        ):
+            btn = ttk.Button(btn_frame, text=self._t(key), command=command)
+            btn.pack(fill="x", pady=2)
+            self.action_buttons.append(btn)
         ttk.Button(
             btn_frame, text=self._t("meta_close"), command=self._close
         ).pack(fill="x", pady=2)
 
+        # 전체 저장 진행률 (저장 중에만 표시)
+        self.save_progress = ttk.Progressbar(right, mode="determinate")
+
         # 상태 표시
         self.status_label = ttk.Label(right, text="", foreground="green", wraplength=240)
         self.status_label.pack(anchor="w", pady=(10, 0))
@@ -370,14 +2073,37 @@ class MetadataWindow:
         self.file_listbox.selection_set(index)
         self.file_listbox.see(index)
         path = self.files[index]
-        meta = self.file_meta[path]
+        # 태그를 아직 읽지 못한 파일은 도착하면 _poll_scan에서 채운다
+        meta = self.file_meta.get(path)
+        if meta is None:
+            meta = {**_EMPTY_META, **self.user_edits.get(path, {})}
+        self._show_meta(meta)
+
+    def _form_values(self):
+        return {
+            "artist": self.artist_var.get(),
+            "album": self.album_var.get(),
+            "title": self.title_var.get(),
+            "track": self.track_var.get(),
+        }
+
+    def _edited_fields(self):
+        """현재 파일을 보여 준 뒤 사용자가 고친 입력란 {field: value}."""
+        if self._shown is None:
+            return {}
+        return {k: v for k, v in self._form_values().items() if v != self._shown[k]}
+
+    def _show_meta(self, meta, keep=()):
         # 공통 필드: 첫 파일 선택 시에만 초기화 (이후에는 사용자 입력 유지)
-        if self.artist_var.get() == "" and meta["artist"]:
+        if "artist" not in keep and self.artist_var.get() == "" and meta["artist"]:
             self.artist_var.set(meta["artist"])
-        if self.album_var.get() == "" and meta["album"]:
+        if "album" not in keep and self.album_var.get() == "" and meta["album"]:
             self.album_var.set(meta["album"])
-        self.title_var.set(meta["title"])
-        self.track_var.set(meta["track"])
+        if "title" not in keep:
+            self.title_var.set(meta["title"])
+        if "track" not in keep:
+            self.track_var.set(meta["track"])
+        self._shown = self._form_values()
 
     def _on_listbox_select(self, _event):
         sel = self.file_listbox.curselection()
@@ -388,12 +2114,13 @@ class MetadataWindow:
         """현재 편집 중인 파일의 변경사항을 메모리에 반영한다."""
         if self.current_index is not None:
             path = self.files[self.current_index]
-            self.file_meta[path] = {
-                "artist": self.artist_var.get(),
-                "album": self.album_var.get(),
-                "title": self.title_var.get(),
-                "track": self.track_var.get(),
-            }
+            if path in self.file_meta:
+                self.file_meta[path] = self._form_values()
+            else:
+                # 태그를 아직 읽지 못했으면 고친 필드만 기억해 두었다가 _poll_scan에서 덮는다
+                edits = self._edited_fields()
+                if edits:
+                    self.user_edits.setdefault(path, {}).update(edits)
 
     @staticmethod
     def _parse_filename(path):
@@ -436,45 +2163,112 @@ class MetadataWindow:
             text=self._t("meta_auto_fill_done"), foreground="green"
         )
 
-    def _save_tags(self, path, meta):
-        """mutagen으로 메타데이터를 파일에 쓴다."""
+    @staticmethod
+    def _tag_padding(info):
+        """기존 패딩 안에 태그가 들어가면 그대로 두어 오디오 데이터를 다시 쓰지 않는다."""
+        return info.padding if info.padding >= 0 else 8192
+
+    @staticmethod
+    def _save_tags(path, meta, fields=None, cover=None, replaygain=None):
+        """mutagen으로 메타데이터를 파일에 쓴다. fields가 주어지면 그 필드만 쓴다."""
+        from mutagen.flac import Picture
+        from mutagen.id3 import APIC, TALB, TIT2, TPE1, TRCK, TXXX
+        from mutagen.mp3 import MP3
+        from mutagen.mp4 import MP4, MP4Cover, MP4FreeForm
+        from mutagen.oggopus import OggOpus
+
+        fields = set(fields if fields is not None else _EMPTY_META)
+        if replaygain is not None and replaygain.get("lufs") is None:
+            # 무음이라 게인을 정할 수 없다
+            replaygain = None
+        if not fields and cover is None and replaygain is None:
+            return
+        gain_tags = _replaygain_tags(replaygain) if replaygain is not None else {}
         ext = os.path.splitext(path)[1].lower()
+        padding = MetadataWindow._tag_padding
+        mime = "image/png" if cover and cover.startswith(b"\x89PNG") else "image/jpeg"
         if ext == ".mp3":
             audio = MP3(path)
             if audio.tags is None:
                 audio.add_tags()
-            audio.tags["TPE1"] = TPE1(encoding=3, text=meta["artist"])
-            audio.tags["TALB"] = TALB(encoding=3, text=meta["album"])
-            audio.tags["TIT2"] = TIT2(encoding=3, text=meta["title"])
-            audio.tags["TRCK"] = TRCK(encoding=3, text=meta["track"])
-            audio.save()
+            frames = {"artist": TPE1, "album": TALB, "title": TIT2, "track": TRCK}
+            for field in fields:
+                frame = frames[field]
+                audio.tags[frame.__name__] = frame(encoding=3, text=meta[field])
+            if cover is not None:
+                audio.tags.delall("APIC")
+                audio.tags.add(
+                    APIC(encoding=3, mime=mime, type=3, desc="Cover", data=cover)
+                )
+            for key, value in gain_tags.items():
+                desc = f"replaygain_track_{key}"
+                audio.tags[f"TXXX:{desc}"] = TXXX(encoding=3, desc=desc, text=value)
+            audio.save(padding=padding)
         elif ext == ".opus":
             audio = OggOpus(path)
-            audio["artist"] = meta["artist"]
-            audio["album"] = meta["album"]
-            audio["title"] = meta["title"]
-            audio["tracknumber"] = meta["track"]
-            audio.save()
+            keys = {"artist": "artist", "album": "album", "title": "title",
+                    "track": "tracknumber"}
+            for field in fields:
+                audio[keys[field]] = meta[field]
+            if cover is not None:
+                picture = Picture()
+                picture.type = 3
+                picture.mime = mime
+                picture.data = cover
+                audio["metadata_block_picture"] = [
+                    base64.b64encode(picture.write()).decode("ascii")
+                ]
+            if replaygain is not None:
+                # Q7.8 고정소수점 dB, 헤더의 output gain 위에 더해진다
+                gain = round((R128_REFERENCE - replaygain["lufs"]) * 256)
+                audio["R128_TRACK_GAIN"] = str(max(-32768, min(32767, gain)))
+            audio.save(padding=padding)
         elif ext == ".m4a":
             audio = MP4(path)
             if audio.tags is None:
                 audio.add_tags()
-            audio.tags["\xa9ART"] = [meta["artist"]]
-            audio.tags["\xa9alb"] = [meta["album"]]
-            audio.tags["\xa9nam"] = [meta["title"]]
-            track_num = int(meta["track"]) if meta["track"].isdigit() else 0
-            audio.tags["trkn"] = [(track_num, 0)]
-            audio.save()
+            atoms = {"artist": "\xa9ART", "album": "\xa9alb", "title": "\xa9nam"}
+            for field in fields:
+                if field == "track":
+                    track_num = int(meta["track"]) if meta["track"].isdigit() else 0
+                    audio.tags["trkn"] = [(track_num, 0)]
+                else:
+                    audio.tags[atoms[field]] = [meta[field]]
+            if cover is not None:
+                image_format = (
+                    MP4Cover.FORMAT_PNG if mime == "image/png" else MP4Cover.FORMAT_JPEG
+                )
+                audio.tags["covr"] = [MP4Cover(cover, imageformat=image_format)]
+            for key, value in gain_tags.items():
+                audio.tags[f"----:com.apple.iTunes:replaygain_track_{key}"] = [
+                    MP4FreeForm(value.encode("ascii"))
+                ]
+            audio.save(padding=padding)
+
+    def _dirty_fields(self, path):
+        """읽어 온 값과 달라진 필드 집합."""
+        meta = self.file_meta.get(path)
+        loaded = self.loaded_meta.get(path)
+        if meta is None or loaded is None:
+            return set()
+        return {k for k in _EMPTY_META if meta[k] != loaded[k]}
+
+    def _mark_saved(self, path, meta):
+        self.loaded_meta[path] = dict(meta)
+        self._remember_saved(path, meta)
 
     def _save_current(self):
-        """현재 선택된 파일의 메타데이터를 저장한다."""
+        """현재 선택된 파일의 메타데이터를 저장한다 (바뀐 필드만)."""
         if self.current_index is None:
             return
         self._flush_current()
         path = self.files[self.current_index]
         meta = self.file_meta[path]
         try:
-            self._save_tags(path, meta)
+            fields = self._dirty_fields(path)
+            if fields:
+                self._save_tags(path, meta, fields)
+                self._mark_saved(path, meta)
             name = os.path.basename(path)
             self.status_label.configure(
                 text=self._t("meta_saved", name=name), foreground="green"
@@ -485,16 +2279,64 @@ class MetadataWindow:
             )
 
     def _save_all(self):
-        """모든 파일의 메타데이터를 저장한다."""
+        """바뀐 파일만 골라 스레드 풀에서 저장한다. 진행률은 _poll_save가 표시한다."""
         self._flush_current()
-        ok, fail = 0, 0
+        jobs = []
         for path in self.files:
-            meta = self.file_meta[path]
-            try:
-                self._save_tags(path, meta)
-                ok += 1
-            except Exception:
-                fail += 1
+            fields = self._dirty_fields(path)
+            if fields:
+                jobs.append((path, dict(self.file_meta[path]), fields))
+        if not jobs:
+            self.status_label.configure(
+                text=self._t("meta_save_all_done", ok=0), foreground="green"
+            )
+            return
+
+        self._set_busy(True)
+        self.save_progress.configure(maximum=len(jobs), value=0)
+        self.save_progress.pack(fill="x", pady=(10, 0), before=self.status_label)
+        save_q = queue.Queue()
+
+        def worker():
+            with ThreadPoolExecutor(
+                max_workers=self.SCAN_WORKERS, thread_name_prefix="yt-mp3-save"
+            ) as pool:
+                futures = {pool.submit(self._save_tags, *job): job for job in jobs}
+                for future in as_completed(futures):
+                    path, meta, _ = futures[future]
+                    save_q.put((path, meta, future.exception()))
+            save_q.put(None)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self._poll_save(save_q, len(jobs), 0, 0)
+
+    def _poll_save(self, save_q, total, ok, fail):
+        if self.closed:
+            return
+        try:
+            while True:
+                item = save_q.get_nowait()
+                if item is None:
+                    self._finish_save(ok, fail)
+                    return
+                path, meta, error = item
+                if error is None:
+                    self._mark_saved(path, meta)
+                    ok += 1
+                else:
+                    fail += 1
+        except queue.Empty:
+            pass
+        self.save_progress.configure(value=ok + fail)
+        self.status_label.configure(
+            text=self._t("meta_saving", done=ok + fail, total=total),
+            foreground="gray",
+        )
+        self.win.after(self.SCAN_POLL_MS, self._poll_save, save_q, total, ok, fail)
+
+    def _finish_save(self, ok, fail):
+        self.save_progress.pack_forget()
+        self._set_busy(False)
         msg = self._t("meta_save_all_done", ok=ok)
         color = "green"
         if fail:
@@ -502,18 +2344,195 @@ class MetadataWindow:
             color = "orange"
         self.status_label.configure(text=msg, foreground=color)
 
+    def _replaygain_all(self):
+        """모든 파일의 음량을 프로세스 풀에서 재고 ReplayGain 태그를 쓴다."""
+        if self.ffmpeg_loc is None or self.loudness_cache is None:
+            self.status_label.configure(
+                text=self._t("meta_replaygain_no_ffmpeg"), foreground="red"
+            )
+            return
+        paths = list(self.files)
+        self._set_busy(True)
+        self.save_progress.configure(maximum=len(paths), value=0)
+        self.save_progress.pack(fill="x", pady=(10, 0), before=self.status_label)
+        gain_q = queue.Queue()
+
+        def worker():
+            try:
+                replaygain_library(
+                    paths,
+                    self.ffmpeg_loc,
+                    self.loudness_cache,
+                    lambda path, result, error: gain_q.put((path, result, error)),
+                    stop=lambda: self.closed,
+                )
+            finally:
+                gain_q.put(None)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self._poll_replaygain(gain_q, len(paths), {"analyzed": 0, "cached": 0, "fail": 0})
+
+    def _poll_replaygain(self, gain_q, total, counts):
+        if self.closed:
+            return
+        try:
+            while True:
+                item = gain_q.get_nowait()
+                if item is None:
+                    self.save_progress.pack_forget()
+                    self._set_busy(False)
+                    msg = self._t(
+                        "meta_replaygain_done",
+                        analyzed=counts["analyzed"],
+                        cached=counts["cached"],
+                    )
+                    if counts["fail"]:
+                        msg += self._t("meta_save_all_fail", fail=counts["fail"])
+                    self.status_label.configure(
+                        text=msg, foreground="orange" if counts["fail"] else "green"
+                    )
+                    return
+                path, result, error = item
+                if error is not None:
+                    counts["fail"] += 1
+                    continue
+                counts["analyzed" if result["analyzed"] else "cached"] += 1
+                if path in self.loaded_meta:
+                    # 태그를 쓰면 mtime이 바뀌므로 태그 캐시도 새 값으로 맞춘다
+                    self._remember_saved(path, self.loaded_meta[path])
+        except queue.Empty:
+            pass
+        done = sum(counts.values())
+        self.save_progress.configure(value=done)
+        self.status_label.configure(
+            text=self._t("meta_replaygain_progress", done=done, total=total),
+            foreground="gray",
+        )
+        self.win.after(self.SCAN_POLL_MS, self._poll_replaygain, gain_q, total, counts)
+
     def _close(self):
+        self.closed = True
         self.win.grab_release()
         self.win.destroy()
 
 
-class PlaylistWindow:
-    """재생목록 미리보기 및 선택 다운로드 서브 윈도우."""
+class VirtualCheckList:
+    """보이는 행만 그리는 체크 목록 (Canvas 기반)."""
 
-    def __init__(self, parent, title, entries, callback, lang="ko"):
-        self.callback = callback
-        self.entries = entries
+    ROW_HEIGHT = 22
+    BOX = 12
+    # 비활성(0/1) → 선택 가능(1/0) 변환표: 전체 선택을 C 수준 연산으로 처리한다
+    _FLIP = bytes([1, 0]) + bytes(254)
+
+    def __init__(self, parent):
+        self.labels = []
+        self.selected = bytearray()
+        self.disabled = bytearray()
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, background="white")
+        self.scrollbar = ttk.Scrollbar(
+            parent, orient="vertical", command=self.canvas.yview
+        )
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def append(self, labels, disabled):
+        """행을 추가한다. disabled는 labels와 같은 길이의 0/1 시퀀스."""
+        self.labels.extend(labels)
+        self.disabled.extend(disabled)
+        self.selected.extend(bytes(disabled).translate(self._FLIP))
+        self.canvas.configure(
+            scrollregion=(0, 0, 1, len(self.labels) * self.ROW_HEIGHT)
+        )
+        self.redraw()
+
+    def select_all(self):
+        self.selected[:] = self.disabled.translate(self._FLIP)
+        self.redraw()
+
+    def deselect_all(self):
+        self.selected[:] = bytes(len(self.selected))
+        self.redraw()
+
+    def disable(self, index):
+        self.disabled[index] = 1
+        self.selected[index] = 0
+
+    def checked(self):
+        """선택된 행의 인덱스 목록."""
+        return [i for i, v in enumerate(self.selected) if v]
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first = max(0, int(top // self.ROW_HEIGHT))
+        last = min(len(self.labels), int((top + height) // self.ROW_HEIGHT) + 1)
+        return first, last
+
+    def redraw(self):
+        """화면에 보이는 행만 다시 그린다."""
+        c = self.canvas
+        c.delete("row")
+        first, last = self._visible_range()
+        h, box = self.ROW_HEIGHT, self.BOX
+        for i in range(first, last):
+            y = i * h + h // 2
+            color = "#999999" if self.disabled[i] else "black"
+            c.create_rectangle(
+                6, y - box // 2, 6 + box, y + box // 2, outline=color, tags="row"
+            )
+            if self.selected[i]:
+                c.create_line(
+                    8, y, 11, y + 3, 16, y - 4, width=2, fill=color, tags="row"
+                )
+            c.create_text(
+                6 + box + 6, y, text=self.labels[i], anchor="w", fill=color, tags="row"
+            )
+
+    def _on_click(self, event):
+        i = int(self.canvas.canvasy(event.y) // self.ROW_HEIGHT)
+        if 0 <= i < len(self.labels) and not self.disabled[i]:
+            self.selected[i] ^= 1
+            self.redraw()
+
+    def scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+
+
+class PlaylistWindow:
+    """재생목록 미리보기 및 선택 다운로드 서브 윈도우."""
+
+    def __init__(
+        self,
+        parent,
+        title,
+        entries,
+        callback,
+        lang="ko",
+        archived=(),
+        loading=False,
+        on_closed=None,
+        expected=None,
+    ):
+        self.callback = callback
+        self.on_closed = on_closed
+        self.entries = []
         self.lang = lang
+        self.archived = set(archived)
+        self.loading = loading
+        self.expected = expected
+        self.closed = False
 
         self.win = tk.Toplevel(parent)
         self.win.title(self._t("playlist_title"))
@@ -526,49 +2545,12 @@ class PlaylistWindow:
         header = ttk.Frame(self.win)
         header.pack(fill="x", padx=10, pady=(10, 5))
         ttk.Label(header, text=title, font=("", 11, "bold")).pack(anchor="w")
-        ttk.Label(
-            header, text=self._t("playlist_total", count=len(entries))
-        ).pack(anchor="w")
-
-        # 중앙: 스크롤 가능한 체크박스 목록
-        list_frame = ttk.Frame(self.win)
-        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
-
-        canvas = tk.Canvas(list_frame, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        self.inner = ttk.Frame(canvas)
-
-        self.inner.bind(
-            "<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        canvas.create_window((0, 0), window=self.inner, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # 마우스 휠 스크롤
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        self.count_label = ttk.Label(header)
+        self.count_label.pack(anchor="w")
 
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        self.win.protocol("WM_DELETE_WINDOW", self._on_cancel)
-
-        self.vars = []
-        for i, entry in enumerate(entries):
-            var = tk.BooleanVar(value=True)
-            self.vars.append(var)
-            dur = PlaylistWindow._fmt_duration(entry.get("duration"))
-            label = f"{i + 1}. {entry.get('title', self._t('playlist_unknown'))}"
-            if dur:
-                label += f"  ({dur})"
-            ttk.Checkbutton(self.inner, text=label, variable=var).pack(
-                anchor="w", padx=5, pady=1
-            )
-
-        # 하단 버튼
+        # 하단 버튼 (목록보다 먼저 pack해서 창이 작아져도 버튼이 보이게 한다)
         btn_frame = ttk.Frame(self.win)
-        btn_frame.pack(fill="x", padx=10, pady=(5, 10))
+        btn_frame.pack(side="bottom", fill="x", padx=10, pady=(5, 10))
 
         ttk.Button(
             btn_frame, text=self._t("playlist_select_all"), command=self._select_all
@@ -585,30 +2567,98 @@ class PlaylistWindow:
             btn_frame, text=self._t("playlist_download"), command=self._on_download
         ).pack(side="right", padx=(5, 0))
 
+        # 중앙: 가상화된 체크 목록 (보이는 행만 그린다)
+        list_frame = ttk.Frame(self.win)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.list = VirtualCheckList(list_frame)
+
+        # 마우스 휠 스크롤
+        def _on_mousewheel(event):
+            self.list.scroll(int(-1 * (event.delta / 120)))
+
+        self.win.bind_all("<MouseWheel>", _on_mousewheel)
+        self.win.bind_all("<Button-4>", lambda e: self.list.scroll(-1))
+        self.win.bind_all("<Button-5>", lambda e: self.list.scroll(1))
+        self.win.protocol("WM_DELETE_WINDOW", self._on_cancel)
+
+        self.add_entries(entries)
+
+    def add_entries(self, entries, archived=()):
+        """불러온 항목을 목록 끝에 추가한다."""
+        if self.closed:
+            return
+        self.archived.update(archived)
+        labels = []
+        disabled = bytearray()
+        for entry in entries:
+            i = len(self.entries)
+            self.entries.append(entry)
+            # 이미 받은 항목은 선택 해제 + 비활성화 (다운로드 시에도 건너뛴다)
+            done = DownloadArchive.key_for(entry) in self.archived
+            dur = PlaylistWindow._fmt_duration(entry.get("duration"))
+            label = f"{i + 1}. {entry.get('title') or self._t('playlist_unknown')}"
+            if dur:
+                label += f"  ({dur})"
+            if done:
+                label += f"  [{self._t('playlist_archived')}]"
+            labels.append(label)
+            disabled.append(done)
+        self.list.append(labels, disabled)
+        self._update_count()
+
+    def finish_loading(self):
+        """항목을 모두 불러왔음을 표시한다."""
+        self.loading = False
+        if not self.closed:
+            self._update_count()
+
+    def _update_count(self):
+        if self.loading:
+            text = self._t(
+                "playlist_loading",
+                count=len(self.entries),
+                total=self.expected or "?",
+            )
+        else:
+            text = self._t("playlist_total", count=len(self.entries))
+        self.count_label.configure(text=text)
+
     def _t(self, key, **kwargs):
         s = STRINGS[self.lang][key]
         return s.format(**kwargs) if kwargs else s
 
     def _select_all(self):
-        for v in self.vars:
-            v.set(True)
+        self.list.select_all()
 
     def _deselect_all(self):
-        for v in self.vars:
-            v.set(False)
+        self.list.deselect_all()
 
     def _on_download(self):
-        selected = [
-            entry.get("url") or entry.get("webpage_url") or entry.get("id")
-            for entry, var in zip(self.entries, self.vars)
-            if var.get()
-        ]
-        self.win.grab_release()
-        self.win.destroy()
+        picked = self.list.checked()
+        selected = [self.entries[i] for i in picked]
+        if self.loading:
+            # 목록을 불러오는 중: 선택분만 먼저 보내고 창은 유지한다
+            for i in picked:
+                self.list.disable(i)
+            self.list.redraw()
+            if selected:
+                self.callback(selected)
+            return
+        self._close()
         if selected:
             self.callback(selected)
+        if self.on_closed:
+            self.on_closed()
 
     def _on_cancel(self):
+        self._close()
+        if self.on_closed:
+            self.on_closed()
+
+    def _close(self):
+        self.closed = True
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.win.unbind_all(seq)
         self.win.grab_release()
         self.win.destroy()
 
@@ -625,83 +2675,1604 @@ class PlaylistWindow:
         return f"{m}:{s:02d}"
 
 
+class _UiPlaylistSink:
+    """작업 스레드에서 PlaylistWindow로 항목을 넘기는 어댑터 (Tk 스레드에서 반영)."""
+
+    def __init__(self, win, ui):
+        self.win = win
+        self.ui = ui
+
+    @property
+    def closed(self):
+        return self.win.closed
+
+    def add_entries(self, entries, archived=()):
+        self.ui.call(self.win.add_entries, entries, archived)
+
+    def finish_loading(self):
+        self.ui.call(self.win.finish_loading)
+
+
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".yt-mp3")
+CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+ARCHIVE_FILE = os.path.join(CONFIG_DIR, "archive.sqlite3")
+EXTRACT_CACHE_FILE = os.path.join(CONFIG_DIR, "extract_cache.sqlite3")
+TAG_CACHE_FILE = os.path.join(CONFIG_DIR, "tag_cache.sqlite3")
+JOB_QUEUE_FILE = os.path.join(CONFIG_DIR, "jobs.sqlite3")
+THUMB_CACHE_DIR = os.path.join(CONFIG_DIR, "thumbs")
+FFMPEG_PROBE_FILE = os.path.join(CONFIG_DIR, "ffmpeg_probe.json")
+LOUDNESS_CACHE_FILE = os.path.join(CONFIG_DIR, "loudness.sqlite3")
+FINGERPRINT_INDEX_FILE = os.path.join(CONFIG_DIR, "fingerprints.sqlite3")
+DEFAULT_SAVE_PATH = os.path.join(os.path.expanduser("~"), "Music", "yt-mp3")
+
+
+def load_config():
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _config_format(config):
+    """설정의 오디오 포맷 키 (옛 한국어 키는 내부 키로 바꾼다)."""
+    saved_format = config.get("audio_format", "opus")
+    saved_format = _LEGACY_FORMAT_MAP.get(saved_format, saved_format)
+    return saved_format if saved_format in DownloadEngine.FORMATS else "opus"
+
+
+def _config_jobs(config):
+    try:
+        jobs = int(config.get("jobs", DEFAULT_JOBS))
+    except (TypeError, ValueError):
+        jobs = DEFAULT_JOBS
+    return min(max(jobs, 1), MAX_JOBS)
+
+
+# 목표 코덱별로 쓸 수 있는 ffmpeg 인코더 (앞쪽을 우선한다)
+FFMPEG_ENCODERS = {
+    "mp3": ("libmp3lame", "mp3_mf"),
+    "aac": ("libfdk_aac", "aac_at", "aac"),
+    "opus": ("libopus", "opus"),
+}
+
+# probe_ffmpeg 결과: "" (PATH) 또는 custom 폴더의 실행 파일 경로 → 조사 결과 dict
+_ffmpeg_probes = None
+_ffmpeg_probes_lock = threading.Lock()
+
+
+def _same_file(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _run_ffmpeg_probe(path):
+    """ffmpeg -version / -encoders를 실행해 버전과 인코더 이름 목록을 읽는다."""
+    try:
+        version = subprocess.run(
+            [path, "-hide_banner", "-version"],
+            capture_output=True, text=True, timeout=30, check=True,
+        ).stdout
+        listing = subprocess.run(
+            [path, "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=30, check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    words = version.split()
+    encoders = []
+    started = False
+    for line in listing.splitlines():
+        # " A....D libmp3lame  ..." 형식. 앞부분의 범례는 "------" 줄에서 끝난다
+        if started:
+            parts = line.split()
+            if len(parts) >= 2:
+                encoders.append(parts[1])
+        elif line.strip().startswith("---"):
+            started = True
+    return {
+        "version": words[2] if words[:2] == ["ffmpeg", "version"] else "",
+        "encoders": sorted(encoders),
+    }
+
+
+def probe_ffmpeg(custom=""):
+    """ffmpeg의 경로/버전/인코더 목록을 dict로 반환한다. 찾지 못하거나 실행되지 않으면 None."""
+    global _ffmpeg_probes
+    with _ffmpeg_probes_lock:
+        if _ffmpeg_probes is None:
+            try:
+                with open(FFMPEG_PROBE_FILE, "r", encoding="utf-8") as f:
+                    _ffmpeg_probes = json.load(f)
+            except (OSError, ValueError):
+                _ffmpeg_probes = {}
+        # 같은 실행 파일이면 폴더 표기가 달라도 같은 키가 되도록 실행 파일 경로로 기억한다
+        key = os.path.abspath(_ffmpeg_exe(custom)) if custom else ""
+        cached = _ffmpeg_probes.get(key)
+        if custom:
+            path = key
+        else:
+            path = cached["path"] if cached else None
+        signature = _file_signature(path)
+        if signature is None and not custom:
+            # 기억해 둔 PATH의 ffmpeg가 사라졌으면 다시 찾는다
+            path = shutil.which("ffmpeg")
+            path = path and os.path.abspath(path)
+            signature = _file_signature(path)
+        if cached and cached["path"] == path and cached["signature"] == signature:
+            return cached
+        # PATH에서 찾은 ffmpeg의 폴더를 지정한 경우처럼 이미 조사한 파일이면 다시 실행하지 않는다
+        same = signature and next(
+            (
+                probe for probe in _ffmpeg_probes.values()
+                if probe.get("signature") == signature and _same_file(probe["path"], path)
+            ),
+            None,
+        )
+        result = dict(same) if same else _run_ffmpeg_probe(path) if signature else None
+        if result is None:
+            if _ffmpeg_probes.pop(key, None) is None:
+                return None
+        else:
+            result.update(path=path, signature=signature)
+            _ffmpeg_probes[key] = result
+        try:
+            os.makedirs(os.path.dirname(FFMPEG_PROBE_FILE), exist_ok=True)
+            tmp = FFMPEG_PROBE_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(_ffmpeg_probes, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, FFMPEG_PROBE_FILE)
+        except OSError:
+            pass
+        return result
+
+
+def ffmpeg_encoder(codec, probe):
+    """probe(probe_ffmpeg 결과)의 ffmpeg로 codec을 만들 때 쓸 인코더. 없으면 None."""
+    available = set(probe["encoders"]) if probe else ()
+    return next((e for e in FFMPEG_ENCODERS.get(codec, ()) if e in available), None)
+
+
+def find_ffmpeg(custom=""):
+    """ffmpeg가 custom 폴더에 있으면 그 경로, PATH에 있으면 "", 없으면 None을 반환한다."""
+    return None if probe_ffmpeg(custom) is None else custom
+
+
+class _YdlLogger:
+    """yt-dlp 출력을 엔진으로 돌린다. 표준 출력은 JSON-lines 이벤트용으로 비워 둔다."""
+
+    def __init__(self, on_error=None):
+        self.on_error = on_error
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        pass
+
+    def error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
+
+
+def _error_chain(error):
+    """yt-dlp 오류가 감싸고 있는 원래 예외까지 차례로 돌려준다."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        exc_info = getattr(error, "exc_info", None)
+        wrapped = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        error = (
+            wrapped
+            or getattr(error, "cause", None)
+            or error.__cause__
+            or error.__context__
+        )
+
+
+# 예외 종류로 판별하지 못했을 때 오류 문장에서 찾는 표식 (소문자)
+_THROTTLE_MARKERS = ("http error 429", "too many requests", "rate limit", "rate-limit")
+_TRANSIENT_MARKERS = (
+    "http error 5", "http error 403", "timed out", "timeout", "connection reset",
+    "connection refused", "connection aborted", "remote end closed",
+    "incomplete read", "incompleteread", "temporarily", "temporary failure",
+    "network is unreachable", "name resolution",
+)
+# 다시 시도해도 같은 결과인 TLS/인증서 설정 오류 (일시적 표식보다 먼저 본다)
+_TLS_MARKERS = ("certificate verify failed", "certificate_verify_failed", "[ssl")
+
+
+def classify_error(error):
+    """다운로드 실패를 throttle / transient / permanent로 나눈다."""
+    chain = list(_error_chain(error))
+    # 인증서/TLS 설정 오류는 재시도해도 같다. 핸드셰이크 중 끊긴 연결(SSLEOFError)만 예외
+    if any(
+        isinstance(exc, (yt_dlp.networking.exceptions.SSLError, ssl.SSLError)) for exc in chain
+    ) and not any(isinstance(exc, ssl.SSLEOFError) for exc in chain):
+        return "permanent"
+    for exc in chain:
+        if isinstance(exc, yt_dlp.networking.exceptions.HTTPError):
+            if exc.status == 429:
+                return "throttle"
+            if exc.status >= 500 or exc.status in (403, 408):
+                return "transient"
+            return "permanent"
+        if isinstance(
+            exc, (yt_dlp.networking.exceptions.TransportError, TimeoutError, ConnectionError)
+        ):
+            return "transient"
+    text = str(error).lower()
+    if any(m in text for m in _THROTTLE_MARKERS):
+        return "throttle"
+    if any(m in text for m in _TLS_MARKERS):
+        return "permanent"
+    if any(m in text for m in _TRANSIENT_MARKERS):
+        return "transient"
+    return "permanent"
+
+
+def _retry_after(error):
+    """HTTP 응답의 Retry-After(초)를 찾는다 (없으면 None)."""
+    for exc in _error_chain(error):
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is None:
+            continue
+        value = str(headers.get("Retry-After") or "").strip()
+        if value.isdigit():
+            return float(value)
+    return None
+
+
+class RetryScheduler:
+    """지연 시간이 지난 항목을 submit 콜백으로 다시 넘기는 타이머 스레드."""
+
+    def __init__(self, submit):
+        self.submit = submit
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="yt-mp3-retry", daemon=True
+        )
+        self._thread.start()
+
+    def schedule(self, delay, *args):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), args))
+            self._cond.notify()
+
+    def close(self):
+        """대기 중인 항목은 버리고 스레드를 멈춘다."""
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+                if self._closed:
+                    return
+                _, _, args = heapq.heappop(self._heap)
+            self.submit(*args)
+
+
+class TokenBucket:
+    """모든 다운로드가 함께 쓰는 토큰 버킷 대역폭 제한 (바이트/초). rate가 0이면 제한 없음."""
+
+    def __init__(self, rate=0):
+        self._cond = threading.Condition()
+        self.rate = 0
+        self.burst = 0
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self.set_rate(rate)
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def set_rate(self, rate):
+        with self._cond:
+            self._refill(time.monotonic())
+            self.rate = max(0, int(rate or 0))
+            # 최대 1초 분량까지 모아 두었다가 한꺼번에 쓸 수 있다
+            self.burst = max(self.rate, 64 * 1024)
+            self._tokens = min(self._tokens, self.burst) if self.rate else 0.0
+            self._cond.notify_all()
+
+    def consume(self, amount):
+        if amount <= 0:
+            return
+        with self._cond:
+            if not self.rate:
+                return
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            while self.rate and self._tokens < 0:
+                self._cond.wait(-self._tokens / self.rate)
+                self._refill(time.monotonic())
+
+
+class HostLimiter:
+    """호스트별 동시 다운로드 수 제한. limit이 0이면 제한 없음. 실행 중에 바꿀 수 있다."""
+
+    def __init__(self, limit=0):
+        self.limit = max(0, int(limit or 0))
+        self._active = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url):
+        """제한 단위: URL의 netloc 그대로 (소문자). 도메인을 추측해 묶지 않는다."""
+        try:
+            return urlsplit(url.strip()).netloc.lower()
+        except ValueError:
+            return ""
+
+    @staticmethod
+    def media_url(info):
+        """추출 결과에서 실제로 받을 스트림의 URL (고른 포맷 기준, 없으면 페이지 URL)."""
+        formats = info.get("requested_formats") or [info]
+        return formats[0].get("url") or info.get("webpage_url") or ""
+
+    def set_limit(self, limit):
+        with self._cond:
+            self.limit = max(0, int(limit or 0))
+            self._cond.notify_all()
+
+    def acquire(self, host):
+        with self._cond:
+            while self.limit and self._active.get(host, 0) >= self.limit:
+                self._cond.wait()
+            self._active[host] = self._active.get(host, 0) + 1
+
+    def release(self, host):
+        with self._cond:
+            count = self._active.get(host, 0) - 1
+            if count > 0:
+                self._active[host] = count
+            else:
+                self._active.pop(host, None)
+            self._cond.notify_all()
+
+
+class PhaseMetrics:
+    """단계별 소요 시간 히스토그램과 전송량/항목 결과 카운터 (스레드 안전)."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}  # phase → [구간별 개수..., +Inf 개수, 합계]
+        self.bytes = {}
+        self.items = {}
+
+    def observe(self, phase, seconds, nbytes=None):
+        seconds = max(0.0, seconds)
+        slot = next(
+            (n for n, le in enumerate(self.BUCKETS) if seconds <= le), len(self.BUCKETS)
+        )
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            hist[slot] += 1
+            hist[-1] += seconds
+            if nbytes:
+                self.bytes[phase] = self.bytes.get(phase, 0) + nbytes
+
+    def count(self, result):
+        with self._lock:
+            self.items[result] = self.items.get(result, 0) + 1
+
+    def copy(self):
+        other = PhaseMetrics()
+        with self._lock:
+            other.phases = {k: list(v) for k, v in self.phases.items()}
+            other.bytes = dict(self.bytes)
+            other.items = dict(self.items)
+        return other
+
+    def since(self, earlier):
+        """earlier(copy()) 이후에 쌓인 값만 담은 사본."""
+        diff = self.copy()
+        for phase, hist in earlier.phases.items():
+            if phase in diff.phases:
+                diff.phases[phase] = [a - b for a, b in zip(diff.phases[phase], hist)]
+                if not sum(diff.phases[phase][:-1]):
+                    del diff.phases[phase]
+        for table, old in ((diff.bytes, earlier.bytes), (diff.items, earlier.items)):
+            for key, value in old.items():
+                table[key] = table.get(key, 0) - value
+                if not table[key]:
+                    del table[key]
+        return diff
+
+    def _quantile(self, hist, q):
+        """구간 안에서 선형 보간한 분위수 추정값 (Prometheus histogram_quantile과 같은 방식)."""
+        rank = q * sum(hist[:-1])
+        seen = 0
+        lower = 0.0
+        for n, le in enumerate(self.BUCKETS):
+            if hist[n] and seen + hist[n] >= rank:
+                return lower + (le - lower) * (rank - seen) / hist[n]
+            seen += hist[n]
+            lower = le
+        # +Inf 구간: 마지막 경계값으로 보고한다
+        return self.BUCKETS[-1]
+
+    def summary(self):
+        """JSON으로 내보낼 요약 dict. 구간 개수는 누적이 아닌 구간별 값이다."""
+        with self._lock:
+            phases = {k: list(v) for k, v in self.phases.items()}
+            nbytes = dict(self.bytes)
+            items = dict(self.items)
+        result = {"items": items, "phases": {}}
+        # 처음 기록된 순서 = 대략 파이프라인 순서
+        for phase, hist in phases.items():
+            count = sum(hist[:-1])
+            entry = {
+                "count": count,
+                "seconds": round(hist[-1], 3),
+                "mean": round(hist[-1] / count, 3),
+                "p50": round(self._quantile(hist, 0.5), 3),
+                "p90": round(self._quantile(hist, 0.9), 3),
+                "p99": round(self._quantile(hist, 0.99), 3),
+                "buckets": {
+                    str(le): n
+                    for le, n in zip(self.BUCKETS + ("+Inf",), hist[:-1])
+                    if n
+                },
+            }
+            if phase in nbytes:
+                entry["bytes"] = nbytes[phase]
+                if hist[-1] > 0:
+                    # 항목별 전송 시간 합 기준: 동시 다운로드 수와 무관한 연결당 평균 속도
+                    entry["bytes_per_second"] = round(nbytes[phase] / hist[-1])
+            result["phases"][phase] = entry
+        return result
+
+    def prometheus(self):
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)."""
+        with self._lock:
+            phases = {k: list(v) for k, v in self.phases.items()}
+            nbytes = dict(self.bytes)
+            items = dict(self.items)
+        lines = [
+            "# HELP yt_mp3_phase_seconds Time spent per item in each pipeline phase.",
+            "# TYPE yt_mp3_phase_seconds histogram",
+        ]
+        for phase, hist in sorted(phases.items()):
+            running = 0
+            for le, n in zip(self.BUCKETS + ("+Inf",), hist[:-1]):
+                running += n
+                lines.append(f'yt_mp3_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {running}')
+            lines.append(f'yt_mp3_phase_seconds_sum{{phase="{phase}"}} {hist[-1]:.6f}')
+            lines.append(f'yt_mp3_phase_seconds_count{{phase="{phase}"}} {running}')
+        lines += [
+            "# HELP yt_mp3_phase_bytes_total Bytes transferred during a phase.",
+            "# TYPE yt_mp3_phase_bytes_total counter",
+        ]
+        lines += [
+            f'yt_mp3_phase_bytes_total{{phase="{phase}"}} {n}'
+            for phase, n in sorted(nbytes.items())
+        ]
+        lines += [
+            "# HELP yt_mp3_items_total Items finished, by result.",
+            "# TYPE yt_mp3_items_total counter",
+        ]
+        lines += [
+            f'yt_mp3_items_total{{result="{result}"}} {n}'
+            for result, n in sorted(items.items())
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class DownloadEngine:
+    """Tk와 무관한 추출 → 다운로드 → 변환 파이프라인 (진행 상황은 emit(event)로 알린다)."""
+
+    # copy: 스트림 복사(remux)만으로 끝나는 원본을 고르는 yt-dlp 포맷 선택식.
+    #       인코더가 있으면 뒤에 "/bestaudio/best"를 붙여 나머지는 재인코딩한다
+    # target: FFmpegExtractAudio의 preferredcodec ("m4a"는 AAC 원본을 MP4 컨테이너로 복사)
+    # transcode: False면 재인코딩하지 않는다 (원본이 다른 코덱이면 받은 파일 그대로 둔다)
+    FORMATS = {
+        "opus": {"codec": "opus", "ext": "opus", "transcode": False,
+                 "copy": "bestaudio[acodec=opus]", "target": "opus"},
+        "mp3":  {"codec": "mp3",  "ext": "mp3", "transcode": True,
+                 "copy": "bestaudio[acodec=mp3]", "target": "mp3"},
+        "aac":  {"codec": "aac",  "ext": "m4a", "transcode": True,
+                 "copy": "bestaudio[acodec^=mp4a]/bestaudio[acodec=aac]", "target": "m4a"},
+    }
+
+    DUPLICATE_MODES = ("off", "flag", "skip", "link")
+
+    # 재생목록 항목을 수신자에 넘기는 묶음 크기 / 최대 대기 시간 (초)
+    PLAYLIST_BATCH = 50
+    PLAYLIST_BATCH_INTERVAL = 0.25
+
+    # 실패 종류별 최대 재시도 횟수 / 첫 대기 시간 (초) / 대기 시간 상한 (초)
+    RETRY_LIMITS = {"throttle": 6, "transient": 4}
+    RETRY_BASE = {"throttle": 30.0, "transient": 2.0}
+    RETRY_CAP = 600.0
+
+    def __init__(self, emit, lang="ko", config=None):
+        config = config or {}
+        self.emit = emit
+        self.lang = lang if lang in STRINGS else "ko"
+        self.archive = DownloadArchive(ARCHIVE_FILE)
+        self.extract_cache = ExtractCache(
+            EXTRACT_CACHE_FILE,
+            ttl=config.get("extract_cache_ttl", 1800),
+            max_bytes=config.get("extract_cache_max_mb", 128) * 1024 * 1024,
+        )
+        self.job_queue = JobQueue(JOB_QUEUE_FILE)
+        self.thumbnails = ThumbnailCache(
+            THUMB_CACHE_DIR,
+            max_bytes=config.get("thumb_cache_max_mb", 64) * 1024 * 1024,
+        )
+        # 전송 제한은 이 엔진의 모든 다운로드가 함께 쓴다
+        self.bandwidth = TokenBucket(int(config.get("rate_limit_kbps", 0) or 0) * 1024)
+        self.hosts = HostLimiter(config.get("per_host", 0))
+        # 실행 중 누적되는 단계별 측정값 (--metrics-file/--metrics-port가 내보낸다)
+        self.metrics = PhaseMetrics()
+        # 변환 뒤 음량을 재서 ReplayGain 태그를 쓸지 (ffmpeg가 있어야 한다)
+        self.replaygain = bool(config.get("replaygain", False))
+        self.loudness = LoudnessCache(LOUDNESS_CACHE_FILE)
+        # 이미 있는 곡과 같은 음원을 받았을 때: off / flag(알림만) / skip / link(하드 링크)
+        self.duplicates = config.get("duplicates", "off")
+        if self.duplicates not in self.DUPLICATE_MODES:
+            self.duplicates = "off"
+        self.fingerprints = FingerprintIndex(FINGERPRINT_INDEX_FILE)
+        # 지문 색인 갱신은 다운로드를 막지 않도록 백그라운드 스레드 하나에서 한다
+        self._fp_thread = None
+        self._fp_lock = threading.Lock()
+        # close()가 설정한다: 백그라운드 작업과 추출 재시도 대기를 멈춘다
+        self._closing = threading.Event()
+
+    def _t(self, key, **kwargs):
+        s = STRINGS[self.lang][key]
+        return s.format(**kwargs) if kwargs else s
+
+    @classmethod
+    def codec_for_path(cls, path):
+        """확장자로 FORMATS의 codec 이름을 고른다. 해당하는 포맷이 없으면 None."""
+        ext = os.path.splitext(path)[1].lower().lstrip(".")
+        return next((f["codec"] for f in cls.FORMATS.values() if f["ext"] == ext), None)
+
+    def _emit(self, event, **fields):
+        """값이 None인 필드는 빼고 이벤트를 보낸다."""
+        self.emit({"event": event, **{k: v for k, v in fields.items() if v is not None}})
+
+    def close(self):
+        self._closing.set()
+        if self._fp_thread is not None:
+            self._fp_thread.join()
+        self.archive.close()
+        self.extract_cache.close()
+        self.job_queue.close()
+        self.thumbnails.close()
+        self.loudness.close()
+        self.fingerprints.close()
+
+    def set_limits(self, rate_kbps=None, per_host=None):
+        """전송 제한을 바꾼다 (None인 값은 그대로 둔다). 진행 중인 다운로드에도 바로 적용된다."""
+        if rate_kbps is not None:
+            self.bandwidth.set_rate(int(rate_kbps) * 1024)
+        if per_host is not None:
+            self.hosts.set_limit(per_host)
+        rate_kbps = self.bandwidth.rate // 1024
+        per_host = self.hosts.limit
+        self._emit(
+            "limits",
+            rate_kbps=rate_kbps,
+            per_host=per_host,
+            message=self._t(
+                "limits_changed",
+                rate=f"{rate_kbps} KB/s" if rate_kbps else self._t("unlimited"),
+                per_host=per_host or self._t("unlimited"),
+            ),
+        )
+
+    # ---- extract ----
+
+    def extract(self, url, fmt, on_playlist):
+        """URL의 메타데이터를 추출한다. 단일 영상이면 info dict, 재생목록이면 None을 반환한다."""
+        start = time.perf_counter()
+        # 재생목록 항목은 on_playlist(info)가 돌려준 수신자(add_entries, finish_loading, closed)로 간다
+        opened = []
+
+        def open_sink(playlist):
+            opened.append(playlist)
+            return on_playlist(playlist)
+
+        attempt = 0
+        try:
+            while True:
+                try:
+                    return self._extract_once(url, fmt, open_sink)
+                except Exception as e:
+                    kind = classify_error(e)
+                    limit = self.RETRY_LIMITS.get(kind, 0)
+                    # 재생목록 항목을 이미 넘기기 시작했으면 다시 받을 때 겹치므로 그대로 실패한다
+                    if opened or attempt >= limit or self._closing.is_set():
+                        raise
+                    delay = self.retry_delay(kind, attempt, e)
+                    attempt += 1
+                    self._emit(
+                        "retry",
+                        url=url,
+                        kind=kind,
+                        attempt=attempt,
+                        delay=round(delay, 1),
+                        error=str(e),
+                        message=self._t(
+                            "retry_scheduled",
+                            attempt=attempt,
+                            limit=limit,
+                            kind=kind,
+                            delay=round(delay),
+                            error=e,
+                        ),
+                    )
+                    if self._closing.wait(delay):
+                        raise
+        except Exception as e:
+            self.metrics.count("extract_failed")
+            self._emit(
+                "extract_failed",
+                url=url,
+                kind=classify_error(e),
+                attempts=attempt + 1,
+                error=str(e),
+                message=self._t("error_extract", error=e),
+            )
+            raise
+        finally:
+            self.metrics.observe("extract", time.perf_counter() - start)
+
+    def _extract_once(self, url, fmt, on_playlist):
+        """extract의 한 번 시도 (캐시 확인 → 평면 추출)."""
+        info = self.extract_cache.get(url)
+        if info is not None and _is_playlist(info):
+            self._stream_playlist(url, info, fmt, on_playlist, cached=True)
+            return None
+        if info is None:
+            opts = {
+                "quiet": True,
+                "no_warnings": True,
+                "extract_flat": "in_playlist",
+                "logger": _YdlLogger(),
+            }
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = self._follow_redirects(
+                    ydl, ydl.extract_info(url, download=False, process=False)
+                )
+                if _is_playlist(info):
+                    # 항목 생성기는 YoutubeDL이 열려 있는 동안 소비해야 한다
+                    self._stream_playlist(url, info, fmt, on_playlist)
+                    return None
+            self.extract_cache.put(url, info, info.get("webpage_url"))
+        return info
+
+    @staticmethod
+    def _follow_redirects(ydl, info, limit=10):
+        """url/url_transparent 결과를 process=False로 따라가 재생목록 생성기를 그대로 둔다."""
+        for _ in range(limit):
+            kind = info.get("_type")
+            if kind not in ("url", "url_transparent"):
+                break
+            target = ydl.extract_info(
+                info["url"], download=False, process=False, ie_key=info.get("ie_key")
+            )
+            if kind == "url_transparent":
+                # yt-dlp와 같게 바깥 결과의 값이 안쪽 결과를 덮는다
+                forced = {
+                    k: v for k, v in info.items()
+                    if v is not None
+                    and k not in ("_type", "url", "id", "extractor", "extractor_key", "ie_key")
+                }
+                target = {**target, **forced}
+            info = target
+        return info
+
+    def _stream_playlist(self, url, info, fmt, on_playlist, cached=False):
+        """재생목록 항목을 받는 대로 묶음 단위로 수신자에 넘긴다."""
+        playlist_title = info.get("title") or self._t("playlist_title")
+        expected = info.get("playlist_count")
+        self._emit(
+            "playlist",
+            url=url,
+            title=playlist_title,
+            count=expected,
+            message=self._t("playlist_detected", title=playlist_title, count=expected or "?"),
+        )
+        sink = on_playlist(info)
+
+        collected = []
+        batch = []
+        last = time.monotonic()
+        complete = False
+        try:
+            for entry in info.get("entries") or ():
+                if sink.closed:
+                    break
+                if not entry:
+                    continue
+                # 필요한 필드만 남기고 원본 항목 dict는 바로 버린다
+                batch.append(PlaylistEntry(entry))
+                if (
+                    len(batch) >= self.PLAYLIST_BATCH
+                    or time.monotonic() - last >= self.PLAYLIST_BATCH_INTERVAL
+                ):
+                    self._send_playlist_batch(sink, batch, fmt)
+                    collected.extend(batch)
+                    batch = []
+                    last = time.monotonic()
+            else:
+                complete = True
+        finally:
+            if batch:
+                self._send_playlist_batch(sink, batch, fmt)
+                collected.extend(batch)
+            sink.finish_loading()
+        if complete and not cached:
+            self.extract_cache.put(
+                url, {**info, "entries": collected}, info.get("webpage_url")
+            )
+
+    def _send_playlist_batch(self, sink, batch, fmt):
+        archived = self.archive.lookup(
+            [DownloadArchive.key_for(e) for e in batch], fmt["codec"]
+        )
+        sink.add_entries(list(batch), archived)
+
+    # ---- download ----
+
+    @classmethod
+    def retry_delay(cls, kind, attempt, error=None):
+        """지터를 섞은 지수 백오프 (상한의 절반 + 무작위 절반). Retry-After가 더 길면 따른다."""
+        delay = min(cls.RETRY_CAP, cls.RETRY_BASE[kind] * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = _retry_after(error)
+        return max(delay, retry_after) if retry_after else delay
+
+    def _progress_hook(self, d, index=0, prefix=""):
+        if d["status"] == "downloading":
+            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+            downloaded = d.get("downloaded_bytes", 0)
+            if total > 0:
+                pct = downloaded / total * 100
+                self._emit("progress", index=index, percent=pct)
+            info = d.get("_default_template", d.get("_percent_str", ""))
+            if info:
+                self._emit("status", index=index, message=f"  {prefix}{info.strip()}")
+        elif d["status"] == "finished":
+            self._emit("progress", index=index, percent=100)
+
+    def _prepare_dedupe(self, dest, ffmpeg_loc):
+        """_postprocess_item의 dedupe 인자를 만들고 지문 색인 갱신을 백그라운드로 시작한다."""
+        if self.duplicates == "off" or ffmpeg_loc is None:
+            return None
+        if not _have_numpy():
+            self._emit("fingerprint_unavailable", message=self._t("fp_unavailable"))
+            return None
+        with self._fp_lock:
+            if self._fp_thread is None or not self._fp_thread.is_alive():
+                self._fp_thread = threading.Thread(
+                    target=self._update_fingerprints, args=(dest, ffmpeg_loc), daemon=True
+                )
+                self._fp_thread.start()
+        return self.duplicates, self.fingerprints.path
+
+    def _update_fingerprints(self, dest, ffmpeg_loc):
+        """dest에서 새로 생기거나 바뀐 파일만 지문을 만든다 (백그라운드 스레드)."""
+        started = time.perf_counter()
+        try:
+            counts = self.fingerprints.update(
+                dest,
+                ffmpeg_loc,
+                on_start=lambda count: self._emit(
+                    "fingerprint_index_start",
+                    count=count,
+                    message=self._t("fp_index_start", count=count),
+                ),
+                # 변환 단계와 CPU를 나눠 쓴다
+                workers=max(1, DEFAULT_PP_WORKERS // 2),
+                stop=self._closing,
+            )
+        except (OSError, sqlite3.Error):
+            return
+        seconds = time.perf_counter() - started
+        self.metrics.observe("fingerprint_index", seconds)
+        self._emit(
+            "fingerprint_index",
+            seconds=round(seconds, 3),
+            **counts,
+            message=(
+                self._t("fp_index_done", **counts)
+                if counts["indexed"] or counts["removed"] else None
+            ),
+        )
+
+    def _metrics_message(self, summary):
+        lines = [self._t("metrics_title")]
+        for phase, entry in summary["phases"].items():
+            lines.append(self._t(
+                "metrics_phase",
+                phase=phase,
+                count=entry["count"],
+                seconds=entry["seconds"],
+                mean=entry["mean"],
+                p90=entry["p90"],
+            ))
+        transfer = summary["phases"].get("download", {})
+        if transfer.get("bytes"):
+            lines.append(self._t(
+                "metrics_transfer",
+                mb=transfer["bytes"] / 1024 / 1024,
+                kbps=transfer.get("bytes_per_second", 0) / 1024,
+                wall_kbps=transfer["bytes"] / max(summary["wall_seconds"], 1e-6) / 1024,
+            ))
+        return "\n".join(lines)
+
+    def download(
+        self, entries, dest, fmt, ffmpeg_loc, jobs=DEFAULT_JOBS, intake=None, since=None
+    ):
+        """다운로드 단계(스레드)와 변환 단계(프로세스)를 큐로 연결해 파이프라인으로 처리한다."""
+        since = since or self.metrics.copy()
+        batch_start = time.perf_counter()
+        # 재생목록을 불러오는 중이면 intake로 항목이 더 들어오므로 전체 개수가 늘어난다
+        run = _DownloadRun(
+            self, dest, fmt, ffmpeg_loc, jobs, multi=intake is not None or len(entries) > 1
+        )
+        try:
+            run.run(entries, intake)
+            run.report(since, batch_start)
+            return run.counts
+        except Exception as e:
+            self._emit(
+                "error", error=str(e), message=self._t("error_download", error=e)
+            )
+            raise
+        finally:
+            run.close()
+
+    def resume(self, pending, jobs=DEFAULT_JOBS):
+        """JobQueue.unfinished()가 돌려준 작업들의 남은 항목만 다시 받는다."""
+        codecs = {f["codec"]: f for f in self.FORMATS.values()}
+        counts = {"total": 0, "converted": 0, "failed": 0, "skipped": 0}
+        for job in pending:
+            self.job_queue.finish(job["id"], "resumed")
+            fmt = codecs.get(job["codec"])
+            if fmt is None:
+                continue
+            entries = job["entries"]
+            self._emit(
+                "resume",
+                job=job["id"],
+                count=len(entries),
+                message=self._t("resume_start", count=len(entries)),
+            )
+            os.makedirs(job["dest"], exist_ok=True)
+            result = self.download(
+                entries, job["dest"], fmt, job["ffmpeg_loc"], jobs=jobs
+            )
+            for k in counts:
+                counts[k] += result[k]
+        return counts
+
+
+class _DownloadRun:
+    """DownloadEngine.download 한 번의 상태: 다운로드 스레드 → 변환 프로세스 파이프라인."""
+
+    def __init__(self, engine, dest, fmt, ffmpeg_loc, jobs, multi=False):
+        self.engine = engine
+        self.fmt = fmt
+        self.ffmpeg_loc = ffmpeg_loc
+        self.jobs = jobs
+        self.is_multi = multi
+        self._emit = engine._emit
+        self._t = engine._t
+        self._configure(dest)
+        # 태그와 앨범 아트는 _postprocess_item이 MutagenTagsPP로 한 번에 쓴다.
+        # 음량 측정은 디코딩에 ffmpeg가 필요하다
+        self.replaygain = engine.replaygain and ffmpeg_loc is not None
+        self.dedupe = engine._prepare_dedupe(dest, ffmpeg_loc)
+
+        # 작업 스레드마다 별도의 YoutubeDL 인스턴스를 사용한다 (인스턴스는 스레드 안전하지 않음)
+        self.local = threading.local()
+        self.instances = []
+        self._instances_lock = threading.Lock()
+
+        self.counts = {"total": 0, "converted": 0, "failed": 0, "skipped": 0}
+        self.done = 0
+        self._done_lock = threading.Lock()
+
+        # 항목별 상태를 기록해 두면 중간에 종료되어도 남은 항목만 이어받을 수 있다
+        self.job = engine.job_queue.create(dest, fmt["codec"], ffmpeg_loc)
+
+        # 다운로드 → 변환 사이의 제한 큐: 변환이 밀리면 다운로드 스레드가 대기한다
+        self.stage_q = queue.Queue(maxsize=jobs)
+        self.pp_slots = threading.Semaphore(DEFAULT_PP_WORKERS)
+
+        # 다운로드 단계에 남은 항목 수 (재시도 대기 포함). 0이 되면 입력이 끝난 뒤 종료한다
+        self.active = 0
+        self.fatal = []
+        self.idle = threading.Condition()
+        self.titles = {}
+        self.failures = []
+        # 항목별 단계 시간: {"start", "ready", "route", "timings", "bytes"}
+        self.stats = {}
+        # run()이 만든다: 재시도 타이머와 그 뒤로는 재시도하지 않게 하는 표시
+        self.retries = None
+        self.retries_closed = threading.Event()
+
+    def _configure(self, dest):
+        """다운로드 단계와 변환 단계의 yt-dlp 옵션을 만든다."""
+        fmt, ffmpeg_loc = self.fmt, self.ffmpeg_loc
+        # 다운로드 단계: 원본 오디오만 받는다 (후처리 없음)
+        self.ydl_opts = {
+            "format": "bestaudio/best",
+            "outtmpl": os.path.join(dest, "%(title)s.%(ext)s"),
+            "noplaylist": True,
+            # 실패는 예외로 받아 RetryScheduler가 종류별로 처리한다
+            "ignoreerrors": False,
+            "noprogress": True,
+            # 읽기 단위를 고정해 두어야 진행률 훅의 속도 제한이 촘촘하게 걸린다
+            "buffersize": 64 * 1024,
+            "noresizebuffer": True,
+            # 중단된 다운로드의 .part 파일을 이어받는다 (이어받기 작업에서 중요)
+            "continuedl": True,
+            "nopart": False,
+        }
+        # 변환 단계: 별도 프로세스에서 yt-dlp 후처리기만 실행한다
+        self.pp_opts = {"quiet": True, "no_warnings": True}
+
+        if ffmpeg_loc:
+            self.ydl_opts["ffmpeg_location"] = ffmpeg_loc
+            self.pp_opts["ffmpeg_location"] = ffmpeg_loc
+
+        # 원본 코덱이 목표와 같으면 FFmpegExtractAudio는 재인코딩 없이 컨테이너만 바꾼다.
+        # ffmpeg에 목표 코덱의 인코더가 없으면 복사할 수 있는 원본만 고른다 (없으면 항목이
+        # 다운로드 전에 실패한다)
+        probe = probe_ffmpeg(ffmpeg_loc) if ffmpeg_loc is not None else None
+        self.encoder = ffmpeg_encoder(fmt["codec"], probe) if fmt["transcode"] else None
+        if probe is not None and self.encoder is None and fmt["transcode"]:
+            self.ydl_opts["format"] = fmt["copy"]
+            self._emit(
+                "encoder_missing",
+                codec=fmt["codec"],
+                ffmpeg=probe["path"],
+                message=self._t("ffmpeg_no_encoder", codec=fmt["codec"]),
+            )
+        else:
+            self.ydl_opts["format"] = fmt["copy"] + "/bestaudio/best"
+        self.pp_opts["postprocessors"] = [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": fmt["target"],
+                "preferredquality": "192",
+            },
+        ]
+        if ffmpeg_loc is None:
+            # ffmpeg 없이 받을 수 있는 opus는 원본 컨테이너(webm 등) 그대로 둔다
+            self.pp_opts["postprocessors"] = []
+        # 재인코딩할 때는 고른 인코더를 ffmpeg 출력 옵션으로 넘긴다 (yt-dlp 기본값보다 뒤에 붙어 우선한다)
+        self.transcode_opts = self.pp_opts
+        if self.encoder is not None and self.pp_opts["postprocessors"]:
+            self.transcode_opts = {
+                **self.pp_opts,
+                "postprocessor_args": {"extractaudio+ffmpeg_o": ["-c:a", self.encoder]},
+            }
+
+    def run(self, entries, intake=None):
+        """entries와 intake로 들어오는 묶음을 받아 모든 항목이 끝날 때까지 기다린다."""
+        with ProcessPoolExecutor(
+            max_workers=DEFAULT_PP_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pp_pool:
+            feeder = threading.Thread(
+                target=self.transcode_stage, args=(pp_pool,), daemon=True
+            )
+            feeder.start()
+            try:
+                with ThreadPoolExecutor(
+                    max_workers=self.jobs, thread_name_prefix="yt-mp3-dl"
+                ) as pool:
+                    self.retries = RetryScheduler(
+                        lambda *args: pool.submit(self.run_item, *args)
+                    )
+                    try:
+                        self.submit(pool, entries)
+                        while intake is not None and not self.fatal:
+                            batch = intake.get()
+                            if batch is None:
+                                break
+                            self.submit(pool, batch)
+                        with self.idle:
+                            while self.active and not self.fatal:
+                                self.idle.wait()
+                    finally:
+                        self.retries_closed.set()
+                        self.retries.close()
+                        if self.fatal:
+                            pool.shutdown(wait=True, cancel_futures=True)
+                    if self.fatal:
+                        raise self.fatal[0]
+            finally:
+                self.stage_q.put(None)
+                feeder.join()
+
+    def report(self, since, batch_start):
+        """실패 요약과 측정값을 알리고 작업을 끝난 것으로 기록한다."""
+        engine = self.engine
+        failures = self.failures
+        if failures:
+            failures.sort(key=lambda f: f["index"])
+            lines = [self._t("failed_summary", count=len(failures))]
+            lines += [
+                self._t(
+                    "failed_item",
+                    title=f["title"] or f["index"] + 1,
+                    kind=f["kind"],
+                    error=f["error"],
+                )
+                for f in failures
+            ]
+            self._emit("failed_summary", items=failures, message="\n".join(lines))
+        summary = engine.metrics.since(since).summary()
+        summary["wall_seconds"] = round(time.perf_counter() - batch_start, 3)
+        self._emit(
+            "metrics", summary=summary, message=engine._metrics_message(summary)
+        )
+        # 예외로 끝난 작업은 active로 남겨 다음 실행 때 이어받는다
+        engine.job_queue.finish(self.job)
+        self._emit("finished", **self.counts, message=self._t("download_done"))
+
+    def close(self):
+        for ydl in self.instances:
+            ydl.close()
+
+    # ---- 다운로드 단계 ----
+
+    def hook(self, d):
+        # 받은 바이트만큼 공용 토큰 버킷에서 빼고, 모자라면 이 스레드의 읽기를 멈춘다
+        local = self.local
+        if d["status"] == "downloading":
+            got = d.get("downloaded_bytes") or 0
+            delta = got - local.received if got >= local.received else got
+            local.received = got
+            local.bytes += delta
+            if local.first_byte is None:
+                local.first_byte = time.perf_counter()
+            self.engine.bandwidth.consume(delta)
+        elif d["status"] == "finished":
+            local.received = 0
+        self.engine._progress_hook(d, index=local.index, prefix=local.prefix)
+
+    def get_ydl(self):
+        ydl = getattr(self.local, "ydl", None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                **self.ydl_opts,
+                "progress_hooks": [self.hook],
+                "logger": _YdlLogger(),
+            })
+            self.local.ydl = ydl
+            with self._instances_lock:
+                self.instances.append(ydl)
+        return ydl
+
+    def item_done(self, result):
+        with self._done_lock:
+            self.done += 1
+            self.counts[result] += 1
+            current, count = self.done, self.counts["total"]
+        self.engine.metrics.count(result)
+        self._emit("overall", done=current, total=count)
+
+    def leave_stage(self):
+        with self.idle:
+            self.active -= 1
+            self.idle.notify_all()
+
+    def fail(self, i, prefix, kind, error, attempts, message=None, **fields):
+        self._emit(
+            "item_failed",
+            index=i,
+            kind=kind,
+            error=error,
+            attempts=attempts,
+            message=message or prefix + self._t("error_item", error=error),
+            **fields,
+        )
+        self.engine.job_queue.set_state(self.job, i, "failed", error=error)
+        with self._done_lock:
+            self.failures.append({
+                "index": i,
+                "title": self.titles.get(i),
+                "kind": kind,
+                "error": error,
+                "attempts": attempts,
+                **fields,
+            })
+        self.item_done("failed")
+
+    def submit(self, pool, batch):
+        """다운로드 색인에 있는 항목은 네트워크 요청 없이 건너뛰고 나머지를 제출한다."""
+        engine = self.engine
+        keys = [DownloadArchive.key_for(e) for e in batch]
+        archived = engine.archive.lookup(keys, self.fmt["codec"])
+        items = []
+        for entry, key in zip(batch, keys):
+            if key in archived:
+                title = entry.get("title") or key
+                with self._done_lock:
+                    self.counts["skipped"] += 1
+                engine.metrics.count("skipped")
+                self._emit(
+                    "skipped",
+                    key=key,
+                    title=title,
+                    message=self._t("skipped_archived", title=title),
+                )
+            else:
+                items.append((entry, key))
+        if not items:
+            return
+        with self._done_lock:
+            start = self.counts["total"]
+            self.counts["total"] += len(items)
+            current, count = self.done, self.counts["total"]
+        with self.idle:
+            self.active += len(items)
+        engine.job_queue.add_items(
+            self.job, [(i, key, entry) for i, (entry, key) in enumerate(items, start)]
+        )
+        self._emit(
+            "queued",
+            count=len(items),
+            message=self._t("download_start", count=len(items)),
+        )
+        self._emit("overall", done=current, total=count)
+        for i, (entry, key) in enumerate(items, start):
+            url = _entry_url(entry)
+            self.titles[i] = entry.get("title") or url
+            pool.submit(self.run_item, i, url, key)
+
+    def run_item(self, i, url, key, attempt=0):
+        # 예상하지 못한 오류는 작업 전체를 멈춘다 (항목 오류는 download_one이 처리한다)
+        try:
+            self.download_one(i, url, key, attempt)
+        except BaseException as e:
+            with self.idle:
+                self.fatal.append(e)
+                self.idle.notify_all()
+
+    def limited(self, host, work):
+        # 호스트 자리를 기다린 시간은 항목의 host_wait로 따로 잰다
+        hosts = self.engine.hosts
+        waited = time.perf_counter()
+        hosts.acquire(host)
+        self.local.host_wait += time.perf_counter() - waited
+        try:
+            return work()
+        finally:
+            hosts.release(host)
+
+    def download_resolved(self, ydl, info):
+        # 포맷을 고른 뒤 실제 스트림 호스트(CDN) 기준으로 동시 연결 수를 제한한다
+        return self.limited(
+            HostLimiter.host_of(HostLimiter.media_url(info)),
+            lambda: ydl.process_ie_result(info, download=True),
+        )
+
+    def fetch(self, ydl, url):
+        # 캐시된 메타데이터가 있으면 추출을 생략하고 포맷만 골라 바로 다운로드한다
+        extract_cache = self.engine.extract_cache
+        cached = extract_cache.get(url)
+        if cached is not None:
+            try:
+                info = self.download_resolved(
+                    ydl, ydl.process_ie_result(cached, download=False)
+                )
+            except Exception:
+                info = None
+            if _downloaded_path(info):
+                return info
+            # 포맷 URL 만료 등으로 실패 → 새로 추출
+        info = self.limited(
+            HostLimiter.host_of(url), lambda: ydl.extract_info(url, download=False)
+        )
+        if info is None:
+            return None
+        info = self.download_resolved(ydl, info)
+        if info is not None:
+            extract_cache.put(url, info, info.get("webpage_url"))
+        return info
+
+    def download_one(self, i, url, key, attempt):
+        engine = self.engine
+        local = self.local
+        job_queue = engine.job_queue
+        # 진행률 훅은 다운로드를 수행하는 스레드에서 호출되므로 스레드 로컬로 항목을 구분한다
+        local.index = i
+        local.prefix = prefix = (
+            f"({i + 1}/{self.counts['total']}) " if self.is_multi else ""
+        )
+        self._emit(
+            "item_start",
+            index=i,
+            url=url,
+            attempt=attempt or None,
+            message=f"--- {prefix}---" if self.is_multi and not attempt else None,
+        )
+        self._emit("progress", index=i, percent=0)
+        job_queue.set_state(self.job, i, "downloading")
+        local.received = 0
+        local.bytes = 0
+        local.first_byte = None
+        started = time.perf_counter()
+        self.stats.setdefault(i, {"start": started})
+        local.host_wait = 0.0
+        try:
+            info = self.fetch(self.get_ydl(), url)
+            if info is None:
+                raise yt_dlp.utils.DownloadError("no video information")
+        except Exception as e:
+            error = str(e)
+            kind = classify_error(e)
+            limit = engine.RETRY_LIMITS.get(kind, 0)
+            if attempt < limit and not self.retries_closed.is_set():
+                delay = engine.retry_delay(kind, attempt, e)
+                # 재시도를 기다리는 동안 종료되어도 이어받을 수 있도록 pending으로 되돌린다
+                job_queue.set_state(self.job, i, "pending", error=error)
+                self._emit(
+                    "retry",
+                    index=i,
+                    url=url,
+                    kind=kind,
+                    attempt=attempt + 1,
+                    delay=round(delay, 1),
+                    error=error,
+                    message=prefix + self._t(
+                        "retry_scheduled",
+                        attempt=attempt + 1,
+                        limit=limit,
+                        kind=kind,
+                        delay=round(delay),
+                        error=error,
+                    ),
+                )
+                self.retries.schedule(delay, i, url, key, attempt + 1)
+                return
+            self.stats.pop(i, None)
+            self.fail(i, prefix, kind, error, attempt + 1, url=url)
+            self.leave_stage()
+            return
+        finally:
+            self._emit("progress", index=i, percent=None)
+        # 추출/포맷 선택은 첫 바이트까지, 다운로드는 첫 바이트부터
+        downloaded = time.perf_counter()
+        first_byte = local.first_byte or downloaded
+        cover_url, cover = self.cover_art(self.get_ydl(), info)
+        ready = time.perf_counter()
+        timings = {
+            "host_wait": local.host_wait,
+            "item_extract": first_byte - started - local.host_wait,
+            "download": downloaded - first_byte,
+            "thumbnail": ready - downloaded,
+        }
+        for phase, seconds in timings.items():
+            engine.metrics.observe(
+                phase, seconds, local.bytes if phase == "download" else None
+            )
+        self.stats[i].update(ready=ready, timings=timings, bytes=local.bytes)
+        key = key or DownloadArchive.key_for(info)
+        payload = _postprocess_payload(info)
+        # 캐시 파일을 그대로 넘긴다 (MutagenTagsPP는 읽기만 한다)
+        payload["thumbnails"] = (
+            [{"id": "cover", "url": cover_url, "filepath": cover}] if cover else []
+        )
+        job_queue.set_state(self.job, i, "converting")
+        self.stage_q.put((i, prefix, key, payload))
+        self.leave_stage()
+
+    def cover_art(self, ydl, info):
+        """앨범 아트를 캐시에서 찾거나 받아서 한 번만 변환한다 ((URL, JPEG 경로 또는 None))."""
+        url = info.get("thumbnail") or next(
+            (t["url"] for t in reversed(info.get("thumbnails") or []) if t.get("url")),
+            None,
+        )
+        if not url:
+            return None, None
+
+        def fetch_bytes(thumb_url):
+            response = ydl.urlopen(thumb_url)
+            try:
+                data = response.read()
+            finally:
+                response.close()
+            self.engine.bandwidth.consume(len(data))
+            return data
+
+        try:
+            return url, self.engine.thumbnails.get(url, fetch_bytes, self.ffmpeg_loc)
+        except Exception:
+            return url, None
+
+    # ---- 변환 단계 ----
+
+    def route(self, payload):
+        """받은 파일의 처리 경로와 변환 옵션 ((original/remux/transcode, 원본 코덱, 옵션))."""
+        source = _audio_codec(payload.get("acodec"))
+        if not self.pp_opts["postprocessors"]:
+            return "original", source, self.pp_opts
+        if source == self.fmt["codec"]:
+            return "remux", source, self.pp_opts
+        if not self.fmt["transcode"]:
+            # 재인코딩하지 않는 포맷: 받은 파일(m4a, mp3 등)에 태그만 쓴다
+            return "original", source, {**self.pp_opts, "postprocessors": []}
+        return "transcode", source, self.transcode_opts
+
+    def transcode_stage(self, pp_pool):
+        while True:
+            item = self.stage_q.get()
+            if item is None:
+                return
+            i, prefix, key, payload = item
+            filename = os.path.basename(payload["filepath"])
+            route, source, item_opts = self.route(payload)
+            stats = self.stats[i]
+            stats["route"] = route
+            self.pp_slots.acquire()
+            # 변환 대기: 다운로드가 끝난 뒤 프로세스 풀 자리가 날 때까지
+            wait = time.perf_counter() - stats["ready"]
+            stats["timings"]["convert_wait"] = wait
+            self.engine.metrics.observe("convert_wait", wait)
+            self._emit(
+                "converting",
+                index=i,
+                route=route,
+                source_codec=source,
+                encoder=self.encoder if route == "transcode" else None,
+                message=prefix + self._t(
+                    "converting", filename=filename, route=self._t("route_" + route)
+                ),
+            )
+            future = pp_pool.submit(
+                _postprocess_item, payload, item_opts, self.replaygain, self.dedupe
+            )
+            future.add_done_callback(
+                lambda f, i=i, p=prefix, k=key, n=filename: self.on_processed(i, p, k, n, f)
+            )
+
+    def on_processed(self, i, prefix, key, filename, future):
+        engine = self.engine
+        self.pp_slots.release()
+        item = self.stats.pop(i)
+        try:
+            path, pp_timings, loudness, duplicate = future.result()
+            match = duplicate["match"] if duplicate else None
+            action = duplicate.get("action") if duplicate else None
+            codec = self.fmt["codec"]
+            if action is not None:
+                if path is None:
+                    path = match["path"]
+                # 중복이라 건너뛰거나 링크한 항목은 이미 있는 파일의 코덱으로 기록한다.
+                # 다른 포맷이면 그 포맷으로 다시 요청할 때 받아서 다시 비교한다
+                codec = engine.codec_for_path(path)
+            if codec is not None:
+                engine.archive.add(key, path, codec)
+        except Exception as e:
+            self.fail(
+                i,
+                prefix,
+                "permanent",
+                str(e),
+                1,
+                message=prefix + self._t("error_convert", filename=filename, error=e),
+                key=key,
+            )
+            return
+        engine.job_queue.set_state(self.job, i, "done", path=path)
+        timings = item["timings"]
+        for phase, seconds in pp_timings.items():
+            # 오디오 추출은 재인코딩 여부에 따라 비용이 크게 다르므로 나눠서 기록한다
+            if phase == "ExtractAudio":
+                phase = item["route"]
+            engine.metrics.observe(phase, seconds)
+            timings[phase] = seconds
+        timings["total"] = time.perf_counter() - item["start"]
+        engine.metrics.observe("total", timings["total"])
+        if match is not None:
+            self._emit(
+                "duplicate",
+                index=i,
+                key=key,
+                path=path,
+                match=match["path"],
+                ber=match["ber"],
+                offset=match["offset"],
+                action=action or "flag",
+                message=prefix + self._t(
+                    "duplicate_" + (action or "flag"),
+                    filename=filename,
+                    match=os.path.basename(match["path"]),
+                ),
+            )
+        if duplicate is not None and action != "skip":
+            try:
+                engine.fingerprints.add(path, duplicate["fingerprint"])
+            except (OSError, sqlite3.Error):
+                pass
+        if action is not None:
+            self.item_done("skipped")
+            return
+        if loudness is not None:
+            # 새 파일이므로 태그까지 쓴 내용의 해시만 기록한다
+            engine.loudness.store(path, loudness, loudness["digest"])
+        self._emit(
+            "converted",
+            index=i,
+            key=key,
+            path=path,
+            route=item["route"],
+            timings={k: round(v, 3) for k, v in timings.items()},
+            bytes=item["bytes"],
+            download_bps=(
+                round(item["bytes"] / timings["download"])
+                if timings["download"] > 0 else None
+            ),
+            lufs=(
+                round(loudness["lufs"], 2)
+                if loudness and loudness["lufs"] is not None else None
+            ),
+            message=prefix + self._t("converted", filename=filename),
+        )
+        self.item_done("converted")
+
+
 class YtMp3App:
-    CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".yt-mp3")
-    CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+    # 작업 스레드의 진행률/로그를 화면에 반영하는 주기 (약 15 Hz)
+    UI_INTERVAL_MS = 66
+    # 로그 창에 남길 최대 줄 수 / 로그 파일 flush 주기 (초)
+    LOG_KEEP_LINES = 5000
+    LOG_FLUSH_INTERVAL = 1.0
 
     def __init__(self, root):
         self.root = root
 
         self.downloading = False
-        self._log_lines = []
-
-        self.formats = {
-            "opus": {"codec": "opus", "ext": "opus"},
-            "mp3":  {"codec": "mp3",  "ext": "mp3"},
-            "aac":  {"codec": "aac",  "ext": "m4a"},
-        }
+        # 현재 작업의 로그 파일 (작업 중에만 열려 있음)
+        self._log_file = None
+        self._log_flushed = time.monotonic()
+        self.tag_cache = TagCache(TAG_CACHE_FILE)
+        # 작업 스레드 → UI 갱신 요청 버퍼 (Tk 스레드가 주기적으로 반영)
+        self._ui = UiUpdateBuffer()
+        self.formats = DownloadEngine.FORMATS
 
-        config = self._load_config()
+        config = load_config()
 
         # Language
         self.lang = config.get("language", "ko")
         if self.lang not in STRINGS:
             self.lang = "ko"
 
+        # 다운로드 엔진 — 이 창은 엔진 이벤트를 화면에 그리는 클라이언트다
+        self.engine = DownloadEngine(self._on_engine_event, lang=self.lang, config=config)
+
         self.root.title(self._t("window_title"))
-        self.root.geometry("620x640")
+        self.root.geometry("620x700")
         self.root.resizable(False, False)
 
-        default_path = os.path.join(os.path.expanduser("~"), "Music", "yt-mp3")
-        self.save_path = tk.StringVar(value=config.get("save_path", default_path))
+        self.save_path = tk.StringVar(value=config.get("save_path", DEFAULT_SAVE_PATH))
         self.ffmpeg_path = tk.StringVar(value=config.get("ffmpeg_path", ""))
-
-        # Migrate legacy Korean format key to internal key
-        saved_format = config.get("audio_format", "opus")
-        if saved_format in _LEGACY_FORMAT_MAP:
-            saved_format = _LEGACY_FORMAT_MAP[saved_format]
-        if saved_format not in self.formats:
-            saved_format = "opus"
-        self.selected_format = tk.StringVar(value=saved_format)
+        # ffmpeg_path 칸의 값 → find_ffmpeg 결과 (클릭할 때 ffmpeg를 다시 실행하지 않는다)
+        self._ffmpeg_known = {}
+        self.selected_format = tk.StringVar(value=_config_format(config))
+        self.jobs = tk.IntVar(value=_config_jobs(config))
+        self.rate_limit = tk.IntVar(value=self.engine.bandwidth.rate // 1024)
+        self.per_host = tk.IntVar(value=self.engine.hosts.limit)
+        self.replaygain = tk.BooleanVar(value=self.engine.replaygain)
 
         self._build_ui()
         self._check_ffmpeg_on_startup()
+        self._drain_ui()
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after_idle(self._offer_resume)
+        # 창이 뜬 뒤 yt_dlp/mutagen을 미리 불러 두어 첫 다운로드가 기다리지 않게 한다
+        self.warm_up_thread = threading.Thread(target=warm_up, daemon=True)
+        self.root.after_idle(self.warm_up_thread.start)
 
     def _t(self, key, **kwargs):
         s = STRINGS[self.lang][key]
         return s.format(**kwargs) if kwargs else s
 
-    def _load_config(self):
-        try:
-            with open(self.CONFIG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (OSError, json.JSONDecodeError):
-            return {}
-
     def _save_config(self):
         config = {
             "save_path": self.save_path.get(),
             "ffmpeg_path": self.ffmpeg_path.get(),
             "audio_format": self.selected_format.get(),
             "language": self.lang,
+            "jobs": self._get_jobs(),
+            "rate_limit_kbps": self.engine.bandwidth.rate // 1024,
+            "per_host": self.engine.hosts.limit,
+            "replaygain": self.replaygain.get(),
+            "duplicates": self.engine.duplicates,
+            "extract_cache_ttl": self.engine.extract_cache.ttl,
+            "extract_cache_max_mb": self.engine.extract_cache.max_bytes // (1024 * 1024),
         }
-        os.makedirs(self.CONFIG_DIR, exist_ok=True)
-        with open(self.CONFIG_FILE, "w", encoding="utf-8") as f:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(config, f, ensure_ascii=False, indent=2)
 
     def _on_close(self):
         self._save_config()
+        self._close_log_file(announce=False)
+        self.engine.close()
+        self.tag_cache.close()
         self.root.destroy()
 
+    def _with_ffmpeg(self, then):
+        """ffmpeg_path 칸의 ffmpeg로 then(ffmpeg_loc)을 부른다. 처음 보는 경로만 작업 스레드에서 조사한다."""
+        custom = self.ffmpeg_path.get().strip()
+        if custom in self._ffmpeg_known:
+            then(self._ffmpeg_known[custom])
+            return
+        threading.Thread(
+            target=lambda: self._ui.call(
+                self._remember_ffmpeg, custom, find_ffmpeg(custom), then
+            ),
+            daemon=True,
+        ).start()
+
+    def _remember_ffmpeg(self, custom, ffmpeg_loc, then=None):
+        self._ffmpeg_known[custom] = ffmpeg_loc
+        if then is not None:
+            then(ffmpeg_loc)
+
     def _check_ffmpeg_on_startup(self):
-        ffmpeg_loc = shutil.which("ffmpeg")
-        if ffmpeg_loc:
-            ffmpeg_dir = os.path.dirname(ffmpeg_loc)
-            if not self.ffmpeg_path.get():
-                self.ffmpeg_path.set(ffmpeg_dir)
+        # 처음 조사할 때는 ffmpeg를 실행하므로 창이 그려지는 것을 막지 않게 작업 스레드에서 한다
+        custom = self.ffmpeg_path.get().strip()
+        thread = threading.Thread(
+            target=lambda: self._ui.call(self._show_ffmpeg_status, custom, probe_ffmpeg(custom)),
+            daemon=True,
+        )
+        thread.start()
+
+    def _show_ffmpeg_status(self, custom, probe):
+        # 사용자가 정한 경로는 그대로 두고, 비어 있을 때만 PATH에서 찾은 폴더로 채운다
+        self._remember_ffmpeg(custom, custom if probe else None)
+        if probe and not custom and not self.ffmpeg_path.get().strip():
+            folder = os.path.dirname(probe["path"])
+            self.ffmpeg_path.set(folder)
+            self._remember_ffmpeg(folder, folder)
+        if probe:
             self.ffmpeg_status.configure(
-                text=self._t("ffmpeg_auto"), foreground="green"
+                text=self._t("ffmpeg_auto", version=probe["version"] or "?"),
+                foreground="green",
             )
         else:
             if sys.platform == "win32":
@@ -813,6 +4384,48 @@ class YtMp3App:
         # Set initial description
         self._on_format_change()
 
+        ttk.Spinbox(
+            fmt_frame,
+            from_=1,
+            to=MAX_JOBS,
+            textvariable=self.jobs,
+            width=3,
+            state="readonly",
+        ).pack(side="right", padx=(0, 10), pady=8)
+        ttk.Label(fmt_frame, text=self._t("jobs_label")).pack(side="right", pady=8)
+
+        # --- 전송 제한 (다운로드 중에도 바로 적용) ---
+        limit_frame = ttk.LabelFrame(self.root, text=self._t("limits_label"))
+        limit_frame.pack(fill="x", **pad)
+
+        ttk.Label(limit_frame, text=self._t("rate_limit_label")).pack(
+            side="left", padx=(10, 5), pady=8
+        )
+        ttk.Spinbox(
+            limit_frame,
+            from_=0,
+            to=1000000,
+            increment=100,
+            textvariable=self.rate_limit,
+            width=8,
+        ).pack(side="left", pady=8)
+        ttk.Label(limit_frame, text=self._t("per_host_label")).pack(
+            side="left", padx=(20, 5), pady=8
+        )
+        ttk.Spinbox(
+            limit_frame,
+            from_=0,
+            to=MAX_JOBS,
+            textvariable=self.per_host,
+            width=3,
+            state="readonly",
+        ).pack(side="left", pady=8)
+        ttk.Checkbutton(
+            limit_frame, text=self._t("replaygain_label"), variable=self.replaygain
+        ).pack(side="right", padx=10, pady=8)
+        self.rate_limit.trace_add("write", self._on_limits_change)
+        self.per_host.trace_add("write", self._on_limits_change)
+
         # --- 버튼 영역 ---
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(fill="x", **pad)
@@ -858,6 +4471,10 @@ class YtMp3App:
         self.progress = ttk.Progressbar(self.file_frame, mode="determinate")
         self.progress.pack(side="left", fill="x", expand=True, padx=(0, 10), pady=4)
 
+        # 다운로드 속도/남은 시간 등 자주 바뀌는 상태는 로그 대신 이 줄에 덮어쓴다
+        self.status_line = ttk.Label(prog_frame, text="", font=("", 8), foreground="gray")
+        self.status_line.pack(anchor="w", padx=10, pady=(0, 4))
+
         # --- 로그 ---
         log_frame = ttk.LabelFrame(self.root, text=self._t("log_label"))
         log_frame.pack(fill="both", expand=True, **pad)
@@ -921,7 +4538,16 @@ class YtMp3App:
                 self._t("warn_no_dir_title"), self._t("warn_no_dir")
             )
             return
-        MetadataWindow(self.root, scan_dir, lang=self.lang)
+        self._with_ffmpeg(
+            lambda ffmpeg_loc: MetadataWindow(
+                self.root,
+                scan_dir,
+                lang=self.lang,
+                tag_cache=self.tag_cache,
+                ffmpeg_loc=ffmpeg_loc,
+                loudness_cache=self.engine.loudness,
+            )
+        )
 
     def _browse_path(self):
         path = filedialog.askdirectory(initialdir=self.save_path.get())
@@ -933,40 +4559,105 @@ class YtMp3App:
         if path:
             self.ffmpeg_path.set(path)
 
-    def _find_ffmpeg(self):
-        """ffmpeg 실행 가능 여부를 확인하고, 찾으면 경로를 반환한다."""
-        custom = self.ffmpeg_path.get().strip()
-        if custom:
-            candidate = os.path.join(custom, "ffmpeg.exe") if sys.platform == "win32" else os.path.join(custom, "ffmpeg")
-            if os.path.isfile(candidate):
-                return custom
-            return None
-        if shutil.which("ffmpeg"):
-            return ""
-        return None
-
     def _log(self, msg):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self._log_lines.append(f"[{timestamp}] {msg}")
+        self._log_many([msg])
+
+    def _log_many(self, msgs):
+        """여러 줄을 한 번의 Text insert로 로그에 추가한다 (최근 LOG_KEEP_LINES줄만 유지)."""
+        if self._log_file is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                self._log_file.write_lines(f"[{timestamp}] {msg}" for msg in msgs)
+            except OSError:
+                self._log_file = None
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", msg + "\n")
+        self.log_text.insert("end", "\n".join(msgs) + "\n")
+        lines = int(self.log_text.index("end-1c").split(".")[0])
+        if lines > self.LOG_KEEP_LINES:
+            self.log_text.delete("1.0", f"{lines - self.LOG_KEEP_LINES}.0")
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
+    def _get_jobs(self):
+        try:
+            return min(max(int(self.jobs.get()), 1), MAX_JOBS)
+        except (tk.TclError, ValueError):
+            return DEFAULT_JOBS
+
+    def _on_limits_change(self, *_args):
+        try:
+            rate_kbps = max(0, int(self.rate_limit.get()))
+            per_host = max(0, int(self.per_host.get()))
+        except (tk.TclError, ValueError):
+            # 입력 중인 값은 무시한다
+            return
+        if (rate_kbps, per_host) != (self.engine.bandwidth.rate // 1024, self.engine.hosts.limit):
+            self.engine.set_limits(rate_kbps, per_host)
+
     def _set_progress(self, value):
         self.progress["value"] = value
 
-    def _save_log(self, dest):
-        if not self._log_lines:
-            return
+    def _show_item_progress(self, active):
+        """진행 중인 항목들의 평균 진행률을 표시한다."""
+        if active:
+            self._set_progress(sum(active) / len(active))
+        if len(active) > 1:
+            self.file_label.configure(
+                text=self._t("current_files", count=len(active))
+            )
+        else:
+            self.file_label.configure(text=self._t("current_file"))
+
+    def _drain_ui(self):
+        """버퍼에 쌓인 UI 갱신을 한 번에 반영하고 다음 주기를 예약한다."""
+        try:
+            lines, active, overall, status, calls = self._ui.drain()
+            if lines:
+                self._log_many(lines)
+            if status is not None:
+                # 진행 중인 항목마다 한 줄씩, 항목 순서대로 보여 준다
+                self.status_line.configure(text="\n".join(m.strip() for m in status))
+            if active is not None:
+                self._show_item_progress(active)
+            if overall is not None:
+                self._update_overall(*overall)
+            for fn, args, kwargs in calls:
+                fn(*args, **kwargs)
+            self._flush_log_file()
+        finally:
+            self.root.after(self.UI_INTERVAL_MS, self._drain_ui)
+
+    def _open_log_file(self, dest):
+        """작업 로그를 dest의 download_log_<시각>.txt에 기록하기 시작한다."""
+        self._close_log_file(announce=False)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_path = os.path.join(dest, f"download_log_{timestamp}.txt")
         try:
-            with open(log_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(self._log_lines))
-            self.root.after(0, self._log, self._t("log_saved", path=log_path))
+            self._log_file = RotatingLogWriter(log_path)
         except OSError:
-            pass
+            self._log_file = None
+
+    def _flush_log_file(self):
+        if self._log_file is None:
+            return
+        now = time.monotonic()
+        if now - self._log_flushed >= self.LOG_FLUSH_INTERVAL:
+            self._log_flushed = now
+            try:
+                self._log_file.flush()
+            except OSError:
+                pass
+
+    def _close_log_file(self, announce=True):
+        writer, self._log_file = self._log_file, None
+        if writer is None:
+            return
+        try:
+            writer.close()
+        except OSError:
+            return
+        if announce:
+            self._log(self._t("log_saved", path=writer.path))
 
     # ---- download ----
 
@@ -988,83 +4679,118 @@ class YtMp3App:
         os.makedirs(dest, exist_ok=True)
 
         fmt = self.formats[self.selected_format.get()]
-        if fmt["codec"] != "opus" and self._find_ffmpeg() is None:
+        # 처음 보는 ffmpeg 경로를 조사하는 동안 다시 누르지 못하게 한다
+        self.download_btn.configure(state="disabled")
+        self._with_ffmpeg(lambda ffmpeg_loc: self._begin_download(url, dest, fmt, ffmpeg_loc))
+
+    def _begin_download(self, url, dest, fmt, ffmpeg_loc):
+        if fmt["codec"] != "opus" and ffmpeg_loc is None:
+            self.download_btn.configure(state="normal")
             messagebox.showwarning(
                 self._t("warn_ffmpeg_title"),
                 self._t("warn_ffmpeg"),
             )
             return
 
-        self._log_lines.clear()
-        self.download_btn.configure(state="disabled")
+        self._open_log_file(dest)
         self._set_progress(0)
         self.progress.configure(mode="indeterminate")
         self.progress.start(15)
         self._log(self._t("fetching_playlist"))
 
-        ffmpeg_loc = self._find_ffmpeg()
+        # Tk 변수는 Tk 스레드에서만 읽는다
+        jobs = self._get_jobs()
+        self.engine.replaygain = self.replaygain.get()
         thread = threading.Thread(
             target=self._extract_and_route,
-            args=(url, dest, fmt, ffmpeg_loc),
+            args=(url, dest, fmt, ffmpeg_loc, jobs),
             daemon=True,
         )
         thread.start()
 
-    def _extract_and_route(self, url, dest, fmt, ffmpeg_loc):
+    def _on_engine_event(self, event):
+        """엔진 이벤트를 UI 갱신 버퍼로 옮긴다 (작업 스레드에서 호출됨)."""
+        kind = event["event"]
+        if kind == "progress":
+            self._ui.progress(event["index"], event.get("percent"))
+        elif kind == "status":
+            self._ui.status(event["index"], event["message"])
+        elif kind == "overall":
+            self._ui.overall(event["done"], event["total"])
+        elif "message" in event:
+            self._ui.log(event["message"])
+
+    def _extract_and_route(self, url, dest, fmt, ffmpeg_loc, jobs):
         """메타데이터를 추출하여 재생목록이면 서브 윈도우, 단일 영상이면 바로 다운로드."""
+        # 작업 요약의 단계별 시간에 추출도 들어가도록 추출 전에 기준점을 찍어 둔다
+        since = self.engine.metrics.copy()
         try:
-            with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-        except Exception as e:
-            self.root.after(
-                0, self._log, self._t("error_extract", error=e)
-            )
-            self.root.after(
-                0,
-                lambda: messagebox.showerror(self._t("error_title"), str(e)),
+            info = self.engine.extract(
+                url,
+                fmt,
+                lambda playlist: self._open_playlist(
+                    playlist, dest, fmt, ffmpeg_loc, jobs, since
+                ),
             )
-            self.root.after(0, self._stop_indeterminate)
+        except Exception as e:
+            self._ui.call(messagebox.showerror, self._t("error_title"), str(e))
+            self._ui.call(self._stop_indeterminate)
+            self._ui.call(self._close_log_file)
+            return
+        if info is None:
             return
 
-        entries = info.get("entries")
-        if entries is not None:
-            entries = [e for e in entries if e is not None]
-
-        if entries:
-            # 재생목록 → 서브 윈도우
-            playlist_title = info.get("title", self._t("playlist_title"))
-
-            def show_playlist():
-                self._stop_indeterminate()
-                self._log(
-                    self._t(
-                        "playlist_detected",
-                        title=playlist_title,
-                        count=len(entries),
-                    )
-                )
-
-                def on_selected(urls):
-                    self.downloading = True
-                    self.download_btn.configure(state="disabled")
-                    self._set_progress(0)
-                    thread = threading.Thread(
-                        target=self._download,
-                        args=(urls, dest, fmt, ffmpeg_loc),
-                        daemon=True,
-                    )
-                    thread.start()
+        # 단일 영상 → 바로 다운로드
+        self._ui.call(self._stop_indeterminate)
+        self.downloading = True
+        self._run_download([info], dest, fmt, ffmpeg_loc, jobs, since=since)
+
+    def _open_playlist(self, info, dest, fmt, ffmpeg_loc, jobs, since=None):
+        """재생목록 창을 띄우고, 엔진이 항목을 넘길 수신자를 반환한다 (작업 스레드에서 호출됨)."""
+        playlist_title = info.get("title") or self._t("playlist_title")
+        intake = queue.Queue()
+        ready = threading.Event()
+        state = {"started": False}
+
+        def on_selected(selected):
+            # 첫 선택은 다운로드 작업을 시작하고, 이후 선택은 같은 작업에 이어 붙인다
+            if state["started"]:
+                intake.put(selected)
+                return
+            state["started"] = True
+            self.downloading = True
+            self.download_btn.configure(state="disabled")
+            self._set_progress(0)
+            thread = threading.Thread(
+                target=self._run_download,
+                args=(selected, dest, fmt, ffmpeg_loc, jobs, intake, since),
+                daemon=True,
+            )
+            thread.start()
 
-                PlaylistWindow(
-                    self.root, playlist_title, entries, on_selected, lang=self.lang
-                )
+        def on_closed():
+            if state["started"]:
+                intake.put(None)
+            else:
+                self._close_log_file()
+
+        def show_playlist():
+            self._stop_indeterminate()
+            state["win"] = PlaylistWindow(
+                self.root,
+                playlist_title,
+                [],
+                on_selected,
+                lang=self.lang,
+                loading=True,
+                on_closed=on_closed,
+                expected=info.get("playlist_count"),
+            )
+            ready.set()
 
-            self.root.after(0, show_playlist)
-        else:
-            # 단일 영상 → 바로 다운로드
-            self.root.after(0, self._stop_indeterminate)
-            self.downloading = True
-            self._download([url], dest, fmt, ffmpeg_loc)
+        self._ui.call(show_playlist)
+        ready.wait()
+        return _UiPlaylistSink(state["win"], self._ui)
 
     def _stop_indeterminate(self):
         self.progress.stop()
@@ -1072,23 +4798,6 @@ class YtMp3App:
         self._set_progress(0)
         self.download_btn.configure(state="normal")
 
-    def _progress_hook(self, d):
-        if d["status"] == "downloading":
-            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-            downloaded = d.get("downloaded_bytes", 0)
-            if total > 0:
-                pct = downloaded / total * 100
-                self.root.after(0, self._set_progress, pct)
-            info = d.get("_default_template", d.get("_percent_str", ""))
-            if info:
-                self.root.after(0, self._log, f"  {info.strip()}")
-        elif d["status"] == "finished":
-            self.root.after(0, self._set_progress, 100)
-            filename = os.path.basename(d.get("filename", ""))
-            self.root.after(
-                0, self._log, self._t("converting", filename=filename)
-            )
-
     def _show_overall(self, show):
         if show:
             self.overall_frame.pack(fill="x", pady=(4, 0), before=self.file_frame)
@@ -1101,85 +4810,372 @@ class YtMp3App:
         )
         self.overall_progress["value"] = current / total * 100 if total else 0
 
-    def _download(self, urls, dest, fmt, ffmpeg_loc):
-        metadata_pps = [
-            {"key": "FFmpegThumbnailsConvertor", "format": "png"},
-            {"key": "FFmpegMetadata"},
-            {"key": "EmbedThumbnail"},
-        ]
-
-        ydl_opts = {
-            "format": "bestaudio/best",
-            "outtmpl": os.path.join(dest, "%(title)s.%(ext)s"),
-            "progress_hooks": [self._progress_hook],
-            "writethumbnail": True,
-            "noplaylist": True,
-            "ignoreerrors": True,
-        }
-
-        if ffmpeg_loc:
-            ydl_opts["ffmpeg_location"] = ffmpeg_loc
-
-        if fmt["codec"] == "opus":
-            ydl_opts["format"] = "bestaudio[acodec=opus]/bestaudio/best"
-            ydl_opts["postprocessors"] = metadata_pps
-        else:
-            ydl_opts["postprocessors"] = [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": fmt["codec"],
-                    "preferredquality": "192",
-                },
-                *metadata_pps,
-            ]
+    def _offer_resume(self):
+        """지난 실행에서 끝나지 않은 작업이 있으면 이어받을지 묻는다."""
+        pending = self.engine.job_queue.unfinished()
+        if not pending or self.downloading:
+            return
+        count = sum(len(job["entries"]) for job in pending)
+        if not messagebox.askyesno(
+            self._t("resume_title"), self._t("resume_msg", count=count)
+        ):
+            for job in pending:
+                self.engine.job_queue.finish(job["id"], "abandoned")
+            return
+        self._open_log_file(pending[0]["dest"])
+        self.downloading = True
+        self.download_btn.configure(state="disabled")
+        self._set_progress(0)
+        jobs = self._get_jobs()
+        thread = threading.Thread(
+            target=self._run_engine,
+            args=(lambda: self.engine.resume(pending, jobs=jobs), count > 1),
+            daemon=True,
+        )
+        thread.start()
 
-        total = len(urls)
-        is_multi = total > 1
+    def _run_download(self, entries, dest, fmt, ffmpeg_loc, jobs, intake=None, since=None):
+        self._run_engine(
+            lambda: self.engine.download(
+                entries, dest, fmt, ffmpeg_loc, jobs=jobs, intake=intake, since=since
+            ),
+            intake is not None or len(entries) > 1,
+        )
 
+    def _run_engine(self, work, is_multi):
+        """엔진 작업을 실행하고 끝나면 결과 대화상자와 버튼 상태를 정리한다 (작업 스레드)."""
         if is_multi:
-            self.root.after(0, self._show_overall, True)
-            self.root.after(0, self._update_overall, 0, total)
-
+            self._ui.call(self._show_overall, True)
         try:
-            self.root.after(
-                0, self._log, self._t("download_start", count=total)
-            )
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                for i, url in enumerate(urls):
-                    self.root.after(0, self._set_progress, 0)
-                    if is_multi:
-                        self.root.after(
-                            0, self._log, f"--- ({i + 1}/{total}) ---"
-                        )
-                    ydl.download([url])
-                    if is_multi:
-                        self.root.after(
-                            0, self._update_overall, i + 1, total
-                        )
-            self.root.after(0, self._log, self._t("download_done"))
-            self.root.after(
-                0,
-                lambda: messagebox.showinfo(
-                    self._t("done_title"), self._t("done_msg")
-                ),
+            work()
+            self._ui.call(
+                messagebox.showinfo, self._t("done_title"), self._t("done_msg")
             )
         except Exception as e:
-            self.root.after(
-                0, self._log, self._t("error_download", error=e)
-            )
-            self.root.after(
-                0,
-                lambda: messagebox.showerror(self._t("error_title"), str(e)),
-            )
+            self._ui.call(messagebox.showerror, self._t("error_title"), str(e))
         finally:
-            self._save_log(dest)
+            # 남은 로그가 기록된 뒤 닫히도록 UI 스레드에서 실행한다
+            self._ui.call(self._close_log_file)
+            self._ui.call(self.status_line.configure, text="")
             self.downloading = False
-            self.root.after(0, lambda: self.download_btn.configure(state="normal"))
+            self._ui.call(self.download_btn.configure, state="normal")
             if is_multi:
-                self.root.after(0, self._show_overall, False)
+                self._ui.call(self._show_overall, False)
+
+
+class JsonLinesWriter:
+    """엔진 이벤트를 한 줄에 하나씩 JSON으로 쓴다 (--batch 모드)."""
+
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._last = {}
+
+    def __call__(self, event):
+        kind = event["event"]
+        now = time.monotonic()
+        with self._lock:
+            if kind in ("progress", "status"):
+                key = (kind, event["index"])
+                final = kind == "progress" and event.get("percent") in (None, 0, 100)
+                if not final and now - self._last.get(key, 0) < self.PROGRESS_INTERVAL:
+                    return
+                self._last[key] = now
+            line = json.dumps(
+                {"time": round(time.time(), 3), **event},
+                ensure_ascii=False,
+                default=str,
+            )
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class MetricsExporter:
+    """엔진의 누적 측정값을 Prometheus 텍스트로 내보낸다 (--metrics-file / --metrics-port)."""
+
+    INTERVAL = 5.0
+
+    def __init__(self, metrics, path=None, port=None):
+        self.metrics = metrics
+        self.path = path
+        self._stop = threading.Event()
+        self._server = None
+        if port is not None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = exporter.metrics.prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            # 바인드 실패(OSError)는 호출한 쪽에서 처리한다
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        if path:
+            threading.Thread(target=self._write_loop, daemon=True).start()
 
+    def _write_loop(self):
+        while not self._stop.wait(self.INTERVAL):
+            self.write()
 
-if __name__ == "__main__":
+    def write(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.metrics.prometheus())
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        self._stop.set()
+        if self.path:
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class _IntakeSink:
+    """재생목록 항목을 고르지 않고 전부 다운로드 대기열에 넣는다 (--batch 모드)."""
+
+    closed = False
+
+    def __init__(self, intake):
+        self.intake = intake
+
+    def add_entries(self, entries, archived=()):
+        # 이미 받은 항목은 DownloadEngine.download가 다시 걸러 낸다
+        self.intake.put(entries)
+
+    def finish_loading(self):
+        pass
+
+
+def run_batch(args):
+    """--batch / --resume 모드: Tk 없이 처리하고 JSON-lines 이벤트를 stdout에 쓴다."""
+    config = load_config()
+    emit = JsonLinesWriter(sys.stdout)
+    lang = args.lang or config.get("language", "ko")
+    fmt = DownloadEngine.FORMATS[args.format or _config_format(config)]
+    dest = args.output or config.get("save_path") or DEFAULT_SAVE_PATH
+    jobs = min(max(args.jobs, 1), MAX_JOBS) if args.jobs else _config_jobs(config)
+    custom = args.ffmpeg if args.ffmpeg is not None else config.get("ffmpeg_path", "")
+    ffmpeg_loc = find_ffmpeg(custom.strip())
+    if ffmpeg_loc is None and custom.strip():
+        # 설정의 경로가 사라졌으면 PATH에서 다시 찾는다
+        ffmpeg_loc = find_ffmpeg()
+
+    urls = []
+    if args.batch:
+        if fmt["codec"] != "opus" and ffmpeg_loc is None:
+            emit({
+                "event": "error",
+                "error": "ffmpeg not found",
+                "message": STRINGS.get(lang, STRINGS["ko"])["warn_ffmpeg"],
+            })
+            return 2
+        try:
+            if args.batch == "-":
+                lines = sys.stdin.read().splitlines()
+            else:
+                with open(args.batch, "r", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+        except OSError as e:
+            emit({"event": "error", "error": str(e)})
+            return 2
+        urls = [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+    engine = DownloadEngine(emit, lang=lang, config=config)
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        try:
+            exporter = MetricsExporter(engine.metrics, args.metrics_file, args.metrics_port)
+        except OSError as e:
+            emit({"event": "error", "error": f"metrics port {args.metrics_port}: {e}"})
+            engine.close()
+            return 2
+    if args.limit_rate is not None or args.per_host is not None:
+        engine.set_limits(args.limit_rate, args.per_host)
+    if args.replaygain is not None:
+        engine.replaygain = args.replaygain
+    if args.duplicates is not None:
+        engine.duplicates = args.duplicates
+    if args.control:
+        threading.Thread(
+            target=_read_commands, args=(engine, sys.stdin), daemon=True
+        ).start()
+    failed = 0
+    try:
+        if args.resume:
+            try:
+                failed += engine.resume(engine.job_queue.unfinished(), jobs=jobs)["failed"]
+            except Exception:
+                failed += 1
+        if urls:
+            failed += _run_urls(engine, urls, dest, fmt, ffmpeg_loc, jobs)
+    finally:
+        if exporter is not None:
+            exporter.close()
+        engine.close()
+    return 1 if failed else 0
+
+
+def _read_commands(engine, stream):
+    """--control: 표준 입력의 JSON-lines 명령으로 실행 중 설정을 바꾼다."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            command = json.loads(line)
+            if command.get("cmd") != "limits":
+                raise ValueError(f"unknown command: {command.get('cmd')}")
+            engine.set_limits(command.get("rate_kbps"), command.get("per_host"))
+        except (ValueError, TypeError, AttributeError) as e:
+            engine.emit({"event": "error", "error": f"bad command {line!r}: {e}"})
+
+
+def _run_urls(engine, urls, dest, fmt, ffmpeg_loc, jobs):
+    """URL 목록을 한 작업으로 받는다. 실패한 URL/항목 수를 반환한다."""
+    os.makedirs(dest, exist_ok=True)
+    intake = queue.Queue()
+    extract_failed = []
+    since = engine.metrics.copy()
+
+    def produce():
+        # 추출과 다운로드를 겹쳐서 진행한다: 영상/재생목록 묶음을 받는 대로 대기열에 넣는다
+        try:
+            for url in urls:
+                try:
+                    info = engine.extract(url, fmt, lambda _info: _IntakeSink(intake))
+                except Exception:
+                    extract_failed.append(url)
+                    continue
+                if info is not None:
+                    intake.put([info])
+        finally:
+            intake.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        counts = engine.download(
+            [], dest, fmt, ffmpeg_loc, jobs=jobs, intake=intake, since=since
+        )
+    except Exception:
+        return len(urls)
+    return counts["failed"] + len(extract_failed)
+
+
+def _report_startup(root, app, imported):
+    """--startup-time: 첫 창과 warm-up이 끝난 시각(모듈 import 기준 초)을 JSON으로 출력한다."""
+    root.update_idletasks()
+    window = time.perf_counter() - _MODULE_START
+    app.warm_up_thread.join()
+    warm = time.perf_counter() - _MODULE_START
+    print(json.dumps({
+        "import_s": round(imported, 4),
+        "first_window_s": round(window, 4),
+        "warm_up_done_s": round(warm, 4),
+    }))
+    root.destroy()
+
+
+def main(argv=None):
+    imported = time.perf_counter() - _MODULE_START
+    parser = argparse.ArgumentParser(
+        prog="yt_mp3", description="YouTube audio downloader"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="download every URL in FILE (one per line, '-' for stdin) without the GUI "
+        "and print JSON-lines progress events",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="first resume unfinished items left by an interrupted run",
+    )
+    parser.add_argument("--format", choices=sorted(DownloadEngine.FORMATS))
+    parser.add_argument("--jobs", type=int, help=f"concurrent downloads (1-{MAX_JOBS})")
+    parser.add_argument("-o", "--output", metavar="DIR", help="destination folder")
+    parser.add_argument(
+        "--limit-rate", type=int, metavar="KBPS", help="total bandwidth cap in KB/s (0 = unlimited)"
+    )
+    parser.add_argument(
+        "--per-host", type=int, metavar="N", help="concurrent downloads per host (0 = unlimited)"
+    )
+    parser.add_argument(
+        "--replaygain",
+        action=argparse.BooleanOptionalAction,
+        help="measure loudness after conversion and write ReplayGain tags (needs ffmpeg)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=DownloadEngine.DUPLICATE_MODES,
+        help="compare each download with an acoustic fingerprint index of the output folder "
+        "and flag, skip or hard-link tracks that are already there (needs numpy and ffmpeg)",
+    )
+    parser.add_argument(
+        "--control",
+        action="store_true",
+        help='read JSON-lines commands on stdin while running, e.g. {"cmd": "limits", "rate_kbps": 500}',
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write per-phase timing histograms to PATH in Prometheus text format "
+        f"(refreshed every {MetricsExporter.INTERVAL:g}s and at exit)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve the same metrics at http://127.0.0.1:PORT/metrics while running",
+    )
+    parser.add_argument("--ffmpeg", metavar="DIR", help="folder containing ffmpeg")
+    parser.add_argument("--lang", choices=sorted(STRINGS))
+    parser.add_argument(
+        "--startup-time",
+        action="store_true",
+        help="open the window, print time to first window and to background warm-up "
+        "as JSON, then exit",
+    )
+    args = parser.parse_args(argv)
+    if args.control and args.batch == "-":
+        parser.error("--control reads stdin; pass the URL list as a file")
+
+    if args.batch or args.resume:
+        return run_batch(args)
+    if tk is None:
+        parser.error("tkinter is not available; use --batch")
     root = tk.Tk()
-    YtMp3App(root)
+    app = YtMp3App(root)
+    if args.startup_time:
+        # YtMp3App이 예약한 warm-up 시작 뒤에 실행된다 (after_idle은 등록 순서대로)
+        root.after_idle(_report_startup, root, app, imported)
     root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    # PyInstaller 단일 실행 파일에서 변환 프로세스 풀을 쓰기 위해 필요
+    multiprocessing.freeze_support()
+    sys.exit(main())